@@ -0,0 +1,97 @@
+"""
+Fault-injection check of the LLM gateway against benchmarks.fake_openai.
+
+Starts the fake API in-process, points the gateway's client at it and runs
+mock-interview feedback calls through four phases:
+
+    healthy   every call answered by the model
+    failing   upstream returns 500s → bounded retries, then the circuit opens
+              and calls get the fallback immediately
+    hanging   upstream never answers → calls end at the request budget, not
+              the SDK's 10-minute default
+    recovered after the reset timeout one probe closes the circuit again
+
+Prints latency per phase and exits non-zero if a phase misbehaves. Run from
+backend/:
+
+    python -m benchmarks.bench_llm_gateway --calls 20 --budget 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-stub")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from openai import AsyncOpenAI  # noqa: E402
+from benchmarks import fake_openai  # noqa: E402
+from services import ai_engine  # noqa: E402
+from services.llm_gateway import CircuitBreaker, gateway, llm_budget  # noqa: E402
+
+FALLBACK_PREFIX = "Mock interview AI failed"
+
+
+async def call(i, budget):
+    start = time.perf_counter()
+    with llm_budget(budget):
+        # Distinct answers so single-flight does not coalesce the calls
+        feedback = await ai_engine.mock_interview(f"Answer {i}: I used Redis as a cache.", "Backend Developer")
+    return time.perf_counter() - start, feedback.startswith(FALLBACK_PREFIX)
+
+
+async def phase(name, calls, budget, expect):
+    before = dict(gateway.stats)
+    results = await asyncio.gather(*(call(i, budget) for i in range(calls)))
+    latencies = sorted(r[0] for r in results)
+    fallbacks = sum(r[1] for r in results)
+    delta = {k: gateway.stats[k] - before[k] for k in before}
+    ok = expect(fallbacks, latencies, gateway.breaker.state)
+    print(f"{name:>10}: {'OK ' if ok else 'FAIL'} fallbacks {fallbacks}/{calls}  "
+          f"p50 {statistics.median(latencies):.3f}s  max {latencies[-1]:.3f}s  "
+          f"circuit {gateway.breaker.state}  {delta}")
+    return ok
+
+
+async def main(args):
+    server = await fake_openai.start_server(port=args.port)
+    gateway.client = AsyncOpenAI(
+        api_key="bench-stub", base_url=f"http://127.0.0.1:{args.port}/v1", max_retries=0)
+    gateway.breaker = CircuitBreaker(failure_threshold=5, reset_timeout=args.reset)
+
+    results = []
+    fake_openai.FAULTS.update(latency=0.05, error_rate=0.0, hang_rate=0.0)
+    results.append(await phase("healthy", args.calls, args.budget,
+                               lambda fb, lat, state: fb == 0 and state == "closed"))
+
+    fake_openai.FAULTS.update(error_rate=1.0)
+    results.append(await phase("failing", args.calls, args.budget,
+                               lambda fb, lat, state: fb == args.calls and state == "open"))
+    results.append(await phase("open", args.calls, args.budget,
+                               lambda fb, lat, state: fb == args.calls and lat[-1] < 0.05))
+
+    await asyncio.sleep(args.reset)
+    fake_openai.FAULTS.update(error_rate=0.0, hang_rate=1.0)
+    results.append(await phase("hanging", 1, args.budget,
+                               lambda fb, lat, state: fb == 1 and lat[-1] < args.budget + 0.5))
+
+    await asyncio.sleep(args.reset)
+    fake_openai.FAULTS.update(hang_rate=0.0)
+    results.append(await phase("recovered", args.calls, args.budget,
+                               lambda fb, lat, state: state == "closed" and fb < args.calls))
+
+    print(f"fake upstream saw: {fake_openai.STATS}")
+    server.should_exit = server.force_exit = True
+    await server.task
+    return all(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM gateway fault-injection check")
+    parser.add_argument("--port", type=int, default=8911)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=2.0)
+    parser.add_argument("--reset", type=float, default=1.0)
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
@@ -0,0 +1,113 @@
+"""
+Benchmark: LLM scheduler priorities, admission control and cross-worker limits.
+
+1. Priorities: with a small concurrency cap, a burst of roadmap/projects
+   ("planning") calls is queued first, then interview turns arrive. Interview
+   turns should wait far less despite arriving last; planning calls beyond
+   their max wait are rejected (→ 503 + Retry-After in the API).
+2. Cross-worker: several processes share one SQLite state file under an RPM
+   limit; the combined admitted rate must stay within it.
+
+The upstream is a stub with fixed latency. Run from backend/:
+
+    python -m benchmarks.bench_llm_scheduler --concurrency 4 --planning 60 --interview 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-stub")
+
+from services import llm_scheduler  # noqa: E402
+from services.llm_scheduler import (  # noqa: E402
+    LLMSaturated, LLMScheduler, SqliteBucketStore, llm_priority
+)
+
+
+async def fake_call(scheduler, latency, priority, results):
+    start = time.perf_counter()
+    with llm_priority(priority):
+        try:
+            async with scheduler.slot(500):
+                waited = time.perf_counter() - start
+                await asyncio.sleep(latency)
+        except LLMSaturated as e:
+            results.append((priority, None, e.retry_after))
+            return
+    results.append((priority, waited, None))
+
+
+async def priorities(args):
+    store = SqliteBucketStore(":memory:", rpm=100000, tpm=10 ** 9, max_concurrency=args.concurrency)
+    scheduler = LLMScheduler(store)
+    results = []
+
+    calls = [asyncio.create_task(fake_call(scheduler, args.latency, "planning", results))
+             for _ in range(args.planning)]
+    await asyncio.sleep(0.05)
+    calls += [asyncio.create_task(fake_call(scheduler, args.latency, "interview", results))
+              for _ in range(args.interview)]
+    await asyncio.gather(*calls)
+
+    for name in ("interview", "planning"):
+        waits = [w for p, w, _ in results if p == name and w is not None]
+        rejected = [r for p, w, r in results if p == name and w is None]
+        line = f"{name:>10}: admitted {len(waits):>3}  rejected {len(rejected):>3}"
+        if waits:
+            line += f"  wait p50 {statistics.median(waits):.3f}s  max {max(waits):.3f}s"
+        if rejected:
+            line += f"  retry_after {rejected[0]}s"
+        print(line)
+
+
+def _worker(path, rpm, seconds, counter):
+    async def run():
+        scheduler = LLMScheduler(SqliteBucketStore(path, rpm=rpm, tpm=10 ** 9, max_concurrency=1000))
+        ends = time.monotonic() + seconds
+        admitted = 0
+        while time.monotonic() < ends:
+            try:
+                with llm_priority("resume"):
+                    async with scheduler.slot(100, max_wait=ends - time.monotonic()):
+                        admitted += 1
+            except LLMSaturated:
+                break
+        with counter.get_lock():
+            counter.value += admitted
+
+    asyncio.run(run())
+
+
+def cross_worker(args):
+    path = os.path.join(tempfile.mkdtemp(), "scheduler.sqlite3")
+    counter = multiprocessing.Value("i", 0)
+    procs = [multiprocessing.Process(target=_worker, args=(path, args.rpm, args.seconds, counter))
+             for _ in range(args.workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    # Full bucket (rpm) up front, then rpm/60 per second
+    allowed = args.rpm + args.rpm / 60 * args.seconds
+    print(f"{args.workers} workers admitted {counter.value} calls in {args.seconds}s "
+          f"(limit {allowed:.0f} for RPM {args.rpm})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM scheduler benchmark")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--planning", type=int, default=60)
+    parser.add_argument("--interview", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    llm_scheduler.PRIORITY_CLASSES["planning"].max_wait = 2.0
+    asyncio.run(priorities(args))
+    cross_worker(args)
@@ -0,0 +1,84 @@
+"""
+Benchmark: resume-analysis prompt tokens before and after section budgeting.
+
+For each resume, prints the tokens of the analysis prompt with the whole
+text (before) and as budgeted_resume_prompt builds it (after), the time
+spent segmenting + budgeting, and whether the skills section survives in
+the stored resume_text (old: first 1500 characters, new: compact_resume).
+Uses --corpus (real .pdf/.docx/.txt resumes) when given, otherwise
+synthetic CVs of 1 to --pages pages with the skills section at the end.
+Run from backend/:
+
+    python -m benchmarks.bench_prompt_budget --corpus ~/resumes
+    RESUME_PROMPT_TOKENS=800 python -m benchmarks.bench_prompt_budget --pages 6
+"""
+import argparse
+import os
+import random
+import time
+
+from services import resume_parser
+from services.ai_engine import budgeted_resume_prompt, extract_skills, resume_prompt
+from services.resume_sections import RESUME_PROMPT_TOKENS, compact_resume, segment_resume
+from services.token_budget import count_tokens, tokenizer_name
+
+BULLET = ("Designed and shipped {tool} services handling {n}k requests per day; cut latency by {p}% "
+          "through caching and query tuning; mentored two interns and ran code reviews.")
+TOOLS = ["Python", "FastAPI", "React", "Docker", "Kubernetes", "PostgreSQL", "Spark", "AWS", "Kafka"]
+
+
+def synthetic_resume(pages, rng):
+    lines = ["Jane Doe", "jane@example.com | +1 555 0100 | github.com/jane", "", "PROFESSIONAL SUMMARY",
+             "Backend engineer focused on data-heavy web services.", "", "WORK EXPERIENCE"]
+    for job in range(pages * 3):
+        lines.append(f"Software Engineer, Company {job} (20{10 + job % 14})")
+        lines += [f"- {BULLET.format(tool=rng.choice(TOOLS), n=rng.randint(5, 900), p=rng.randint(5, 60))}"
+                  for _ in range(5)]
+    lines += ["", "PROJECTS"] + [f"- Project {i}: {BULLET.format(tool=rng.choice(TOOLS), n=3, p=20)}"
+                                 for i in range(pages * 2)]
+    lines += ["", "EDUCATION", "B.Tech Computer Science, 2014", "", "CERTIFICATIONS",
+              "AWS Certified Developer", "", "TECHNICAL SKILLS",
+              "Python | SQL | Docker | Kubernetes | React | Machine Learning | Spark"]
+    return "\n".join(lines)
+
+
+def load_texts(args):
+    if not args.corpus:
+        rng = random.Random(args.seed)
+        return [(f"synthetic-{pages}p", synthetic_resume(pages, rng)) for pages in range(1, args.pages + 1)]
+    texts = []
+    for name in sorted(os.listdir(args.corpus)):
+        if name.lower().endswith((".pdf", ".docx", ".txt")):
+            with open(os.path.join(args.corpus, name), "rb") as f:
+                texts.append((name, resume_parser.extract_text(f.read(), name)))
+    return texts
+
+
+def main(args):
+    texts = load_texts(args)
+    print(f"tokenizer {tokenizer_name()}, budget {RESUME_PROMPT_TOKENS} tokens, {len(texts)} resumes\n")
+    print(f"{'resume':>24} {'before':>8} {'after':>8} {'saved':>7} {'budget ms':>10}  skills kept (old/new)")
+    total_before = total_after = 0
+    for name, text in texts:
+        before = count_tokens(resume_prompt(text, "general"))
+        start = time.perf_counter()
+        sections = segment_resume(text)
+        prompt = budgeted_resume_prompt(text, "general", sections)
+        elapsed = (time.perf_counter() - start) * 1000
+        after = count_tokens(prompt)
+        total_before, total_after = total_before + before, total_after + after
+
+        skills = set(extract_skills(sections.get("skills", "")))
+        kept_old = skills <= set(extract_skills(text[:1500]))
+        kept_new = skills <= set(extract_skills(compact_resume(sections)))
+        print(f"{name[:24]:>24} {before:8d} {after:8d} {1 - after / before:7.0%} {elapsed:10.2f}  "
+              f"{'yes' if kept_old else 'no'}/{'yes' if kept_new else 'no'}")
+    print(f"\ntotal prompt tokens: {total_before} → {total_after} ({1 - total_after / max(total_before, 1):.0%} saved)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="directory of real resumes")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    main(parser.parse_args())
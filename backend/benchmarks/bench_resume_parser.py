@@ -0,0 +1,61 @@
+"""
+Benchmark: resume parsing throughput, inline vs the parser process pool.
+
+Point --corpus at a directory of real resumes (.pdf/.docx/.txt). Every file is
+parsed once inline (one core) and then --rounds times through
+extract_text_async with RESUME_PARSER_PROCESSES workers. Run from backend/:
+
+    RESUME_PARSER_PROCESSES=4 python -m benchmarks.bench_resume_parser --corpus ~/resumes
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from services import resume_parser
+
+
+def load_corpus(path):
+    docs = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith((".pdf", ".docx", ".txt")):
+            with open(os.path.join(path, name), "rb") as f:
+                docs.append((name, f.read()))
+    return docs
+
+
+async def pooled(docs, rounds):
+    jobs = [resume_parser.extract_text_async(content, name) for _ in range(rounds) for name, content in docs]
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    return sum(isinstance(r, Exception) for r in results)
+
+
+def main(args):
+    docs = load_corpus(args.corpus)
+    if not docs:
+        raise SystemExit(f"No .pdf/.docx/.txt files in {args.corpus}")
+    total_mb = sum(len(c) for _, c in docs) / 1e6
+    print(f"{len(docs)} documents, {total_mb:.1f} MB")
+
+    start = time.perf_counter()
+    for name, content in docs:
+        resume_parser.extract_text(content, name)
+    inline = time.perf_counter() - start
+    print(f"inline (1 core): {len(docs) / inline:.1f} docs/s")
+
+    processes = max(resume_parser.PARSER_PROCESSES, 1)
+    asyncio.run(pooled(docs[:1], 1))  # warm up the spawned workers
+    start = time.perf_counter()
+    errors = asyncio.run(pooled(docs, args.rounds))
+    elapsed = time.perf_counter() - start
+    rate = len(docs) * args.rounds / elapsed
+    print(f"pool ({processes} processes): {rate:.1f} docs/s, {rate / processes:.1f} docs/s/core, "
+          f"{errors} errors/timeouts")
+    resume_parser.shutdown_parser_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", required=True)
+    parser.add_argument("--rounds", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+"""
+Benchmark: batch role scoring with the sparse role × skill matrix.
+
+Builds a synthetic catalogue of --roles roles over a --skills-vocabulary, then
+scores --profiles random skill profiles in one product and takes the top-5.
+The legacy dict/set loop is timed on a sample and extrapolated. Run from backend/:
+
+    python -m benchmarks.bench_role_scoring --profiles 100000 --roles 500
+"""
+import argparse
+import random
+import time
+
+from services.role_engine import RoleEngine
+
+
+def synthetic_roles(rng, n_roles, vocabulary):
+    return [
+        {
+            "name": f"Role {r}",
+            "skills": {s: rng.choice([0.5, 1, 1.5, 2]) for s in rng.sample(vocabulary, rng.randint(5, 15))}
+        }
+        for r in range(n_roles)
+    ]
+
+
+def legacy_top5(role_map, skills):
+    """The pre-engine scoring: set intersection per role, per profile."""
+    scores = {}
+    for role, required in role_map.items():
+        overlap = len(set(required) & set(skills))
+        if overlap > 0:
+            scores[role] = overlap
+    return sorted(scores, key=scores.get, reverse=True)[:5]
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    vocabulary = [f"skill-{i}" for i in range(args.skills_vocabulary)]
+    roles = synthetic_roles(rng, args.roles, vocabulary)
+    profiles = [rng.sample(vocabulary, rng.randint(3, 20)) for _ in range(args.profiles)]
+
+    start = time.perf_counter()
+    engine = RoleEngine(roles)
+    print(f"build matrix {engine.weights.shape}: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    matrix = engine.vectorize(profiles)
+    vectorized = time.perf_counter() - start
+    start = time.perf_counter()
+    for lo in range(0, matrix.shape[0], args.chunk):
+        engine.top_k_batch(matrix[lo:lo + args.chunk], k=5)
+    scored = time.perf_counter() - start
+    print(f"vectorize {args.profiles} profiles: {vectorized:.3f}s, score + top-5: {scored:.3f}s")
+
+    role_map = {r["name"]: list(r["skills"]) for r in roles}
+    sample = profiles[:args.legacy_sample]
+    start = time.perf_counter()
+    for skills in sample:
+        legacy_top5(role_map, skills)
+    legacy = (time.perf_counter() - start) / len(sample) * args.profiles
+    print(f"legacy loop (extrapolated from {len(sample)}): {legacy:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=100000)
+    parser.add_argument("--roles", type=int, default=500)
+    parser.add_argument("--skills-vocabulary", type=int, default=3000)
+    parser.add_argument("--chunk", type=int, default=20000)
+    parser.add_argument("--legacy-sample", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=11)
+    main(parser.parse_args())
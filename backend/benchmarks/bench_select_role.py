@@ -0,0 +1,88 @@
+"""
+Benchmark: sequential vs concurrent roadmap + projects generation.
+
+Swaps the OpenAI client behind services.llm_gateway for a stub that sleeps for a
+configurable delay, then times the old back-to-back flow against
+generate_role_plan. The response cache and single-flight are bypassed, so
+every run reaches the stub and no MongoDB is needed. Run from backend/:
+
+    python -m benchmarks.bench_select_role --roadmap-delay 2.0 --projects-delay 1.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-stub")
+
+from services import ai_engine  # noqa: E402
+from services.llm_gateway import gateway  # noqa: E402
+
+ROADMAP_JSON = json.dumps({
+    "target_role": "Data Scientist",
+    "timeline_weeks": 12,
+    "roadmap": [{"phase": "Phase 1: Basics", "objective": "", "focus": ["Python"],
+                 "projects": [], "duration_weeks": 12}],
+})
+PROJECTS_JSON = json.dumps([
+    {"title": "Churn model", "description": "", "tech_stack": ["Python"], "difficulty": "Intermediate"},
+])
+
+
+class DelayedCompletions:
+    """Stands in for client.chat.completions with a fixed latency per prompt type."""
+
+    def __init__(self, roadmap_delay, projects_delay):
+        self.roadmap_delay = roadmap_delay
+        self.projects_delay = projects_delay
+
+    async def create(self, model, messages, **kwargs):
+        is_roadmap = "roadmap" in messages[-1]["content"].lower()
+        await asyncio.sleep(self.roadmap_delay if is_roadmap else self.projects_delay)
+        content = ROADMAP_JSON if is_roadmap else PROJECTS_JSON
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class NoCoalescing:
+    """Stands in for ai_engine.inflight: every call runs on its own."""
+
+    async def do(self, key, fn):
+        return await fn()
+
+
+async def sequential(skills, role):
+    roadmap = await ai_engine.generate_roadmap(skills, role)
+    projects = await ai_engine.generate_projects(role)
+    return roadmap, projects
+
+
+async def main(args):
+    ai_engine.LLM_CACHE_ENABLED = False
+    ai_engine.inflight = NoCoalescing()
+    gateway.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=DelayedCompletions(args.roadmap_delay, args.projects_delay)))
+    skills, role = ["Python", "SQL"], "Data Scientist"
+
+    for label, run in (
+        ("sequential", lambda: sequential(skills, role)),
+        ("concurrent", lambda: ai_engine.generate_role_plan(skills, role, deadline=args.deadline)),
+    ):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await run()
+            timings.append(time.perf_counter() - start)
+        print(f"{label:>10}: mean {sum(timings) / len(timings):.3f}s over {args.repeat} runs")
+
+    print(f"{'ideal':>10}: max(roadmap, projects) = {max(args.roadmap_delay, args.projects_delay):.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--roadmap-delay", type=float, default=2.0)
+    parser.add_argument("--projects-delay", type=float, default=1.5)
+    parser.add_argument("--deadline", type=float, default=20.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,86 @@
+"""
+Benchmark: legacy per-keyword regex loop vs the compiled taxonomy matcher.
+
+Generates synthetic resumes and times both extractors. --synthetic-skills adds
+N made-up taxonomy entries to show the matcher stays linear in text length as
+the taxonomy grows. Run from backend/:
+
+    python -m benchmarks.bench_skill_extraction --resumes 10000
+"""
+import argparse
+import random
+import re
+import time
+
+from services.skill_taxonomy import SKILLS_PATH, SkillMatcher
+
+LEGACY_KEYWORDS = [
+    "Python", "Java", "C++", "C#", "SQL", "HTML", "CSS", "JavaScript",
+    "React", "Node.js", "Express", "Django", "Flask", "TensorFlow",
+    "PyTorch", "AWS", "Azure", "Docker", "Kubernetes", "Pandas",
+    "NumPy", "Power BI", "Tableau", "Excel", "Machine Learning",
+    "Deep Learning", "Data Analysis", "FastAPI", "NLP", "DevOps", "Git"
+]
+
+FILLER = (
+    "responsible for delivering features across the team worked with stakeholders "
+    "designed implemented and maintained services improved performance by 30 percent "
+    "led code reviews mentored interns built dashboards for reporting"
+).split()
+
+MENTIONS = LEGACY_KEYWORDS + ["ReactJS", "k8s", "sklearn", "Postgres", "golang", "CI/CD"]
+
+
+def legacy_extract_skills(text):
+    """The pre-taxonomy implementation: one fresh regex per keyword per call."""
+    found = [
+        kw for kw in LEGACY_KEYWORDS
+        if re.search(rf"\b{re.escape(kw.lower())}\b", text.lower())
+    ]
+    return list(set(found))
+
+
+def make_resume(rng, words=600):
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for _ in range(rng.randint(5, 25)):
+        tokens.insert(rng.randrange(len(tokens)), rng.choice(MENTIONS) + ",")
+    return " ".join(tokens)
+
+
+def timed(label, fn, resumes):
+    start = time.perf_counter()
+    for text in resumes:
+        fn(text)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>28}: {elapsed:.3f}s total, {elapsed / len(resumes) * 1e6:.1f}µs/resume")
+    return elapsed
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    resumes = [make_resume(rng) for _ in range(args.resumes)]
+    print(f"{len(resumes)} resumes, ~{sum(map(len, resumes)) // len(resumes)} chars each")
+
+    legacy = timed("legacy (31 regexes)", legacy_extract_skills, resumes)
+    matcher = SkillMatcher.from_file(SKILLS_PATH)
+    compiled = timed(f"taxonomy ({len(matcher.canonical)} aliases)", matcher.extract, resumes)
+    print(f"{'speed-up':>28}: {legacy / compiled:.1f}x")
+
+    if args.synthetic_skills:
+        import json
+        with open(SKILLS_PATH, encoding="utf-8") as f:
+            skills = json.load(f)["skills"]
+        skills += [
+            {"name": f"Tool{i}", "aliases": [f"tool-{i}", f"tool {i} framework"]}
+            for i in range(args.synthetic_skills)
+        ]
+        big = SkillMatcher(skills)
+        timed(f"taxonomy ({len(big.canonical)} aliases)", big.extract, resumes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--synthetic-skills", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,137 @@
+"""
+Benchmark + consistency check: skill-gap rollups maintained by deltas.
+
+Seeds --users synthetic students (cohorts, selected roles, skills, some
+messy: duplicates, padding, non-strings) into a scratch database on
+MONGO_URI and builds the rollups with one aggregation. Then runs --updates
+random resume updates and role selections concurrently through the same
+delta path the API uses, checks that the rollups still equal a full
+recompute, and measures skill-gap query latency against the old approach
+(scanning the cohort's user documents). Exits non-zero on any mismatch.
+Run from backend/ against a disposable Mongo:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.bench_skill_rollups --users 500000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from pymongo import AsyncMongoClient
+
+from services.role_engine import role_engine
+from services.skill_analytics import SkillRollups
+
+COHORTS = [f"batch-{year}-{branch}" for year in (2025, 2026) for branch in ("cse", "ece", "it", "mech")]
+ROLES = role_engine.role_names + ["Undecided Role", None]
+SKILLS = role_engine.skill_names + ["Excel", "Communication", "Leadership"]
+
+
+def random_skills(rng):
+    skills = rng.sample(SKILLS, rng.randint(0, 12))
+    if skills and rng.random() < 0.1:
+        skills += [skills[0], f"  {skills[-1]} ", "", 42]     # messy GPT output
+    return skills
+
+
+def make_user(i, rng):
+    user = {
+        "name": f"Student {i}",
+        "email": f"student{i}@example.edu",
+        "selected_role": rng.choice(ROLES),
+        "ai_analysis": {"skills": random_skills(rng)} if rng.random() < 0.95 else {},
+    }
+    if rng.random() < 0.9:
+        user["cohort"] = rng.choice(COHORTS)
+    return user
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def scan_gaps(users, cohort, role):
+    """The pre-rollup way: read every matching user and count in Python."""
+    members, have = 0, Counter()
+    async for doc in users.find({"cohort": cohort, "selected_role": role}, {"_id": 0, "ai_analysis.skills": 1}):
+        members += 1
+        skills = (doc.get("ai_analysis") or {}).get("skills") or []
+        have.update({s.strip() for s in skills if isinstance(s, str) and s.strip()})
+    return [(skill, members - have[skill]) for skill in role_engine.role_skills(role)]
+
+
+async def measure(label, samples, query):
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await query()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:>28}: p50 {percentile(timings, 0.5):9.2f} ms   p99 {percentile(timings, 0.99):9.2f} ms")
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    client = AsyncMongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    database = client[args.database]
+    users, rollups = database["users"], database["skill_rollups"]
+    analytics = SkillRollups(users, rollups)
+
+    await users.drop()
+    await users.create_index("email", unique=True)
+    await users.create_index([("cohort", 1), ("selected_role", 1)])
+    for lo in range(0, args.users, args.batch):
+        await users.insert_many([make_user(i, rng) for i in range(lo, min(lo + args.batch, args.users))],
+                                ordered=False)
+    print(f"seeded {args.users} users")
+
+    start = time.perf_counter()
+    result = await analytics.rebuild()
+    print(f"rebuild: {result['rows']} rows in {time.perf_counter() - start:.1f}s")
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def change(i):
+        email = f"student{rng.randrange(args.users)}@example.edu"
+        roll = rng.random()
+        if roll < 0.45:
+            fields = {"ai_analysis": {"skills": random_skills(rng), "ai_summary": "..."}}
+        elif roll < 0.9:
+            fields = {"selected_role": rng.choice(ROLES), "roadmap_data": None}
+        else:
+            fields = {"cohort": rng.choice(COHORTS), "ai_analysis.skills": random_skills(rng)}
+        async with semaphore:
+            await analytics.set_fields({"email": email}, fields)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(change(i) for i in range(args.updates)))
+    print(f"{args.updates} updates with deltas in {time.perf_counter() - start:.1f}s")
+
+    report = await analytics.verify()
+    print(f"verify: {report['checked']} rows, {len(report['mismatches'])} mismatched")
+    for mismatch in report["mismatches"][:10]:
+        print(f"  {mismatch}")
+
+    cohort, role = COHORTS[0], role_engine.role_names[0]
+    await measure("rollups skill_gaps", args.samples, lambda: analytics.skill_gaps(cohort, role))
+    await measure("rollups cohort_roles", args.samples, lambda: analytics.cohort_roles(cohort))
+    await measure("scan users (before)", args.scan_samples, lambda: scan_gaps(users, cohort, role))
+    await client.close()
+    if report["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--database", default="edubridge_bench")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--scan-samples", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Benchmark: p50/p99 user lookups before and after the email index + projections.
+
+Seeds --users synthetic user documents (with realistic heavy fields) into a
+scratch database on MONGO_URI, then measures random find_one-by-email latency:
+full document without index, full document with index, and the projection the
+interview endpoints use. Run from backend/ against a disposable Mongo:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.bench_user_reads --users 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from pymongo import AsyncMongoClient
+
+FILLER = "Built data pipelines and dashboards; mentored interns; shipped features. " * 20
+
+
+def make_user(i):
+    return {
+        "name": f"Student {i}",
+        "email": f"student{i}@example.edu",
+        "password": "$2b$12$" + "x" * 53,
+        "resume_text": FILLER[:1500],
+        "ai_analysis": {"ai_summary": FILLER[:800], "skills": ["Python", "SQL", "React"]},
+        "suggested_roles": ["Data Analyst", "Data Scientist"],
+        "selected_role": "Data Analyst",
+        "roadmap_data": {"roadmap": [{"phase": f"Phase {p}", "focus": ["SQL"]} for p in range(6)]},
+        "projects": [{"title": "Dashboard", "description": FILLER[:200]}] * 3,
+        "mock_interview_history": [{"answer": FILLER[:300], "feedback": FILLER[:300]}] * 10,
+    }
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def measure(col, label, n_users, samples, projection=None):
+    timings = []
+    for _ in range(samples):
+        email = f"student{random.randrange(n_users)}@example.edu"
+        start = time.perf_counter()
+        await col.find_one({"email": email}, projection)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:>34}: p50 {percentile(timings, 0.5):8.2f} ms   p99 {percentile(timings, 0.99):8.2f} ms")
+
+
+async def main(args):
+    client = AsyncMongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    col = client[args.database]["users"]
+
+    if args.seed:
+        await col.drop()
+        for lo in range(0, args.users, args.batch):
+            await col.insert_many([make_user(i) for i in range(lo, min(lo + args.batch, args.users))],
+                                  ordered=False)
+        print(f"seeded {args.users} users")
+
+    await col.drop_indexes()
+    await measure(col, "full doc, no index", args.users, args.unindexed_samples)
+    await col.create_index("email", unique=True)
+    await measure(col, "full doc, email index", args.users, args.samples)
+    await measure(col, "selected_role projection, index", args.users, args.samples,
+                  {"_id": 0, "selected_role": 1})
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--database", default="edubridge_bench")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--unindexed-samples", type=int, default=50)
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    asyncio.run(main(parser.parse_args()))
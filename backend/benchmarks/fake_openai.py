@@ -0,0 +1,196 @@
+"""
+Fault-injecting stand-in for the OpenAI chat completions API.
+
+Serves POST /v1/chat/completions (plain and stream=True) with canned JSON
+that matches what each of our prompts asks for. Faults are set on the
+command line or changed at runtime with POST /_faults:
+
+    latency       seconds before answering (time to first token)
+    token_rate    completion tokens generated per second (0 = instant)
+    error_rate    share of requests answered with `error_status` (500/429/503)
+    hang_rate     share of requests that never answer (client timeout path)
+
+Run from backend/ and point the app at it with OPENAI_BASE_URL:
+
+    python -m benchmarks.fake_openai --port 8900 --error-rate 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+import uvicorn
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake OpenAI")
+
+FAULTS = {
+    "latency": 0.05,
+    "error_rate": 0.0,
+    "error_status": 500,
+    "hang_rate": 0.0,
+    "token_rate": 0.0,
+}
+STATS = {"requests": 0, "errors": 0, "hangs": 0}
+
+# ======================================================
+# Canned replies (shaped like the real prompts expect)
+# ======================================================
+
+ROADMAP = {
+    "target_role": "",
+    "timeline_weeks": 12,
+    "roadmap": [
+        {"phase": f"Phase {i}: Step {i}", "objective": "Practice the core tools.",
+         "focus": ["Python", "SQL", "Git"], "projects": [f"Mini project {i}"], "duration_weeks": 3}
+        for i in range(1, 5)
+    ],
+}
+PROJECTS = {"projects": [
+    {"title": f"Project {i}", "description": "A realistic portfolio project.",
+     "tech_stack": ["Python", "FastAPI", "MongoDB"], "difficulty": "Advanced"}
+    for i in range(1, 4)
+]}
+QUESTIONS = {"questions": [{"id": i, "question": f"Interview question {i}?"} for i in range(1, 6)]}
+EVALUATION = {"score": 82, "feedback": {"strengths": ["Clear structure"],
+                                        "weaknesses": ["Few metrics"],
+                                        "suggestions": "Quantify your impact."}}
+
+
+def reply_for(messages):
+    prompt = messages[-1]["content"].lower() if messages else ""
+    if "analyze this resume" in prompt:
+        return "- Top skills: Python, SQL\n- Missing: Docker, CI/CD\n- Next: ship one deployed project"
+    if "updating one phase" in prompt:
+        return json.dumps({**ROADMAP["roadmap"][1], "phase": "Phase 2: Updated Focus", "focus": ["Docker", "CI/CD"]})
+    if '"roadmap": [' in prompt:
+        return json.dumps(ROADMAP)
+    if "project ideas" in prompt:
+        return json.dumps(PROJECTS)
+    if "interview questions" in prompt:
+        return json.dumps(QUESTIONS)
+    if "evaluate this single answer" in prompt:
+        return json.dumps({"score": random.randint(60, 95), "strengths": ["Relevant example"],
+                           "weaknesses": ["No numbers"], "suggestion": "Quantify the result."})
+    if "evaluate" in prompt:
+        return json.dumps(EVALUATION)
+    return "Solid answer. Add a concrete example and the measurable result next time."
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _usage(messages, content):
+    prompt = sum(_tokens(m.get("content") or "") for m in messages)
+    completion = _tokens(content)
+    return {"prompt_tokens": prompt, "completion_tokens": completion,
+            "total_tokens": prompt + completion}
+
+
+def _completion(content, model, usage):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": usage,
+    }
+
+
+def _chunk(delta, model, finish_reason=None, usage=None):
+    chunk = {
+        "id": "chatcmpl-stream",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    if usage:
+        chunk["usage"] = usage
+    return chunk
+
+# ======================================================
+# Endpoints
+# ======================================================
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: dict = Body(...)):
+    STATS["requests"] += 1
+    await asyncio.sleep(FAULTS["latency"])
+
+    roll = random.random()
+    if roll < FAULTS["hang_rate"]:
+        STATS["hangs"] += 1
+        await asyncio.sleep(3600)
+    if roll < FAULTS["hang_rate"] + FAULTS["error_rate"]:
+        STATS["errors"] += 1
+        return JSONResponse(
+            {"error": {"message": "injected fault", "type": "server_error"}},
+            status_code=FAULTS["error_status"],
+            headers={"retry-after": "1"} if FAULTS["error_status"] == 429 else None
+        )
+
+    model = body.get("model", "gpt-4o-mini")
+    messages = body.get("messages", [])
+    content = reply_for(messages)
+    usage = _usage(messages, content)
+    rate = FAULTS["token_rate"]
+    if not body.get("stream"):
+        if rate:
+            await asyncio.sleep(usage["completion_tokens"] / rate)
+        return _completion(content, model, usage)
+
+    async def events():
+        # 16 characters ≈ 4 tokens per chunk
+        for i in range(0, len(content), 16):
+            if rate:
+                await asyncio.sleep(4 / rate)
+            yield f"data: {json.dumps(_chunk({'content': content[i:i + 16]}, model))}\n\n"
+        yield f"data: {json.dumps(_chunk({}, model, 'stop'))}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield f"data: {json.dumps(_chunk({}, model, usage=usage))}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/_faults")
+async def set_faults(body: dict = Body(...)):
+    FAULTS.update({k: v for k, v in body.items() if k in FAULTS})
+    return {"faults": FAULTS, "stats": STATS}
+
+
+@app.get("/_faults")
+async def get_faults():
+    return {"faults": FAULTS, "stats": STATS}
+
+
+async def start_server(host="127.0.0.1", port=8900):
+    """Run the fake API inside the current event loop; returns the uvicorn server."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=FAULTS["latency"])
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    FAULTS.update(latency=args.latency, error_rate=args.error_rate, error_status=args.error_status,
+                  hang_rate=args.hang_rate, token_rate=args.token_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,419 @@
+"""
+Load test: the real app against a fake OpenAI and a seeded scratch database.
+
+Starts benchmarks.fake_openai in-process (latency, token rate and error
+injection from the flags below), launches the app with uvicorn in a
+subprocess pointed at it, seeds --users users into a throwaway database on
+MONGO_URI, then drives scenarios with --concurrency virtual users:
+
+    signup      register_with_resume with a DOCX, then poll /jobs until done
+    login       login storm against the seeded users
+    select_role select_role burst (roadmap + projects generation)
+    interview   start_interview, 5x mock_interview, evaluate_interview
+
+Reports requests, errors, RPS and p50/p95/p99 per endpoint plus the app's
+event loop lag (from /metrics) per scenario, and writes everything to
+benchmarks/results/loadtest-<commit>-<time>.json so runs can be compared:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.loadtest --users 200 --concurrency 50
+    python -m benchmarks.loadtest --compare results/old.json results/new.json
+
+--app-url skips launching the app (the app must already use the fake API
+and the same database).
+"""
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+import httpx
+from pymongo import AsyncMongoClient
+
+from benchmarks import fake_openai
+from services.auth import create_token, hash_password
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+SCENARIOS = ["signup", "login", "select_role", "interview"]
+PASSWORD = "loadtest-password"
+ROLES = ["Data Analyst", "Data Scientist", "Backend Developer", "Frontend Developer", "ML Engineer"]
+SKILLS = ["Python", "SQL", "React", "Docker", "AWS", "Machine Learning", "Java", "Git", "Excel",
+          "Node.js", "Pandas", "Kubernetes", "TypeScript", "Tableau"]
+ANSWER = ("I led the migration of our reporting jobs to a queue-based pipeline, cut the "
+          "nightly run from four hours to forty minutes and documented the rollout.")
+LAG_METRIC = "edubridge_event_loop_lag_seconds"
+
+# ======================================================
+# Fixtures: seeded users and a generated resume
+# ======================================================
+
+
+def user_email(i):
+    return f"loadtest{i}@example.edu"
+
+
+def make_user(i, rng, hashed):
+    return {
+        "name": f"Load Test {i}",
+        "email": user_email(i),
+        "password": hashed,
+        "resume_text": "Python developer with SQL and dashboard experience.",
+        "ai_analysis": {"skills": rng.sample(SKILLS, 4)},
+        "suggested_roles": rng.sample(ROLES, 2),
+        "selected_role": rng.choice(ROLES),
+        "roadmap_data": None,
+        "projects": [],
+    }
+
+
+async def seed(mongo_uri, database, n_users, seed_value):
+    """Fresh copy of the scratch database with n_users ready-to-use users."""
+    if database == "edubridge":
+        raise SystemExit("refusing to seed the production database; pick another --database")
+    client = AsyncMongoClient(mongo_uri)
+    await client.drop_database(database)
+    rng = random.Random(seed_value)
+    hashed = hash_password(PASSWORD)   # bcrypt once, not per user
+    users = [make_user(i, rng, hashed) for i in range(n_users)]
+    for lo in range(0, n_users, 1000):
+        await client[database]["users"].insert_many(users[lo:lo + 1000])
+    await client.close()
+    print(f"🌱 seeded {n_users} users into {database}")
+
+
+def make_docx(i):
+    """Smallest DOCX docx2txt reads: a zip with word/document.xml."""
+    body = "".join(
+        f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>"
+        for line in [f"Candidate {i}", "Skills: Python, SQL, Docker, React",
+                     "Built ETL pipelines and dashboards for 3 teams.", ANSWER]
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as docx:
+        docx.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w='
+            '"http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{body}</w:body></w:document>"))
+    return buffer.getvalue()
+
+# ======================================================
+# Measurement
+# ======================================================
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else None
+
+
+class Recorder:
+    """Client-side latency samples per endpoint for one scenario."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    async def call(self, client, name, method, url, ok=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        if response is None or response.status_code not in ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        return response
+
+    def add(self, name, seconds, failed=False):
+        self.samples.setdefault(name, []).append(seconds)
+        if failed:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, elapsed):
+        report = {}
+        for name, values in sorted(self.samples.items()):
+            report[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+            }
+        return report
+
+
+async def scrape_lag(client):
+    """Cumulative event loop lag buckets {le: count} plus sum, from /metrics."""
+    try:
+        text = (await client.get("/metrics")).text
+    except httpx.HTTPError:
+        return None
+    buckets, total = {}, 0.0
+    for line in text.splitlines():
+        match = re.match(rf'{LAG_METRIC}_bucket{{le="([^"]+)"}} (\S+)', line)
+        if match:
+            buckets[match.group(1)] = float(match.group(2))
+        elif line.startswith(f"{LAG_METRIC}_sum"):
+            total = float(line.split()[-1])
+    return {"buckets": buckets, "sum": total}
+
+
+def lag_between(before, after):
+    """p50/p99 (bucket upper bounds) and mean of the lag samples taken in between."""
+    if not before or not after or not after["buckets"]:
+        return None
+    counts = {le: after["buckets"][le] - before["buckets"].get(le, 0) for le in after["buckets"]}
+    samples = counts.get("+Inf", 0)
+    if not samples:
+        return None
+
+    def quantile(q):
+        for le, count in counts.items():   # cumulative, ascending
+            if count >= q * samples:
+                return le if le == "+Inf" else round(float(le) * 1000, 1)
+        return "+Inf"
+
+    return {
+        "samples": int(samples),
+        "mean_ms": round((after["sum"] - before["sum"]) / samples * 1000, 2),
+        "p50_ms_le": quantile(0.50),
+        "p99_ms_le": quantile(0.99),
+        "max_ms_le": quantile(1.0),
+    }
+
+# ======================================================
+# Scenarios (one virtual user each; run --concurrency at a time)
+# ======================================================
+
+
+async def signup_flow(client, rec, i, run_id):
+    email = f"signup-{run_id}-{i}@example.edu"
+    response = await rec.call(
+        client, "POST /register_with_resume", "POST", "/register_with_resume",
+        data={"name": f"Signup {i}", "email": email, "password": PASSWORD},
+        files={"file": (f"resume-{i}.docx", make_docx(i), "application/octet-stream")})
+    if response is None or not response.json().get("job_id"):
+        return
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    job_url = f"/jobs/{response.json()['job_id']}"
+
+    started = time.perf_counter()
+    while time.perf_counter() - started < 60:
+        job = await rec.call(client, "GET /jobs/{job_id}", "GET", job_url, headers=headers)
+        status = job.json().get("status") if job is not None else None
+        if status in ("done", "failed"):
+            rec.add("job: resume analysis", time.perf_counter() - started, status == "failed")
+            return
+        await asyncio.sleep(0.25)
+    rec.add("job: resume analysis", time.perf_counter() - started, failed=True)
+
+
+async def login_flow(client, rec, i, run_id):
+    await rec.call(client, "POST /login", "POST", "/login",
+                   data={"email": user_email(i), "password": PASSWORD})
+
+
+async def select_role_flow(client, rec, i, run_id):
+    headers = {"Authorization": f"Bearer {create_token(user_email(i))}"}
+    await rec.call(client, "POST /select_role", "POST", "/select_role",
+                   data={"role": ROLES[i % len(ROLES)]}, headers=headers)
+
+
+async def interview_flow(client, rec, i, run_id):
+    headers = {"Authorization": f"Bearer {create_token(user_email(i))}"}
+    started = await rec.call(client, "POST /start_interview", "POST", "/start_interview",
+                             headers=headers)
+    if started is None:
+        return
+    session_id = started.json()["session_id"]
+    qa_pairs = []
+    for q in started.json()["questions"][:5]:
+        # Distinct answers so identical prompts are not coalesced or cached
+        answer = f"{ANSWER} (user {i}, run {run_id}, question {q.get('id')})"
+        await rec.call(client, "POST /mock_interview", "POST", "/mock_interview",
+                       data={"answer": answer, "session_id": session_id}, headers=headers)
+        qa_pairs.append({"question": q.get("question"), "answer": answer})
+    await rec.call(client, "POST /evaluate_interview", "POST", "/evaluate_interview",
+                   data={"qa_pairs": json.dumps(qa_pairs), "session_id": session_id},
+                   headers=headers)
+
+
+FLOWS = {
+    "signup": signup_flow,
+    "login": login_flow,
+    "select_role": select_role_flow,
+    "interview": interview_flow,
+}
+
+
+async def run_scenario(client, name, args, run_id):
+    rec = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await FLOWS[name](client, rec, i, run_id)
+
+    lag_before = await scrape_lag(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.users)))
+    elapsed = time.perf_counter() - started
+    lag_after = await scrape_lag(client)
+
+    result = {"seconds": round(elapsed, 2), "endpoints": rec.summary(elapsed),
+              "event_loop_lag": lag_between(lag_before, lag_after)}
+    print_scenario(name, result)
+    return result
+
+# ======================================================
+# App process, reporting, comparison
+# ======================================================
+
+
+async def launch_app(args, fake_url):
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": fake_url,
+        "OPENAI_API_KEY": "loadtest",
+        "MONGO_URI": args.mongo_uri,
+        "MONGO_DB": args.database,
+        "LLM_SCHEDULER_DB": os.path.join(tempfile.mkdtemp(), "scheduler.sqlite3"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.app_port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env)
+    url = f"http://127.0.0.1:{args.app_port}"
+    async with httpx.AsyncClient(base_url=url) as client:
+        for _ in range(200):
+            if process.poll() is not None:
+                raise SystemExit("app exited during startup")
+            try:
+                await client.get("/metrics")
+                return process, url
+            except httpx.HTTPError:
+                await asyncio.sleep(0.1)
+    process.terminate()
+    raise SystemExit("app did not start within 20s")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_scenario(name, result):
+    print(f"\n▶ {name} ({result['seconds']}s)")
+    print(f"  {'endpoint':<28}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, s in result["endpoints"].items():
+        print(f"  {endpoint:<28}{s['requests']:>7}{s['errors']:>6}{s['rps']:>9}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+    lag = result["event_loop_lag"]
+    if lag:
+        print(f"  event loop lag: mean {lag['mean_ms']} ms, p50 ≤ {lag['p50_ms_le']} ms, "
+              f"p99 ≤ {lag['p99_ms_le']} ms, max ≤ {lag['max_ms_le']} ms")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} → {new['meta']['commit']}")
+    for name, scenario in new["scenarios"].items():
+        before = old["scenarios"].get(name, {}).get("endpoints", {})
+        print(f"\n▶ {name}")
+        for endpoint, s in scenario["endpoints"].items():
+            if endpoint not in before:
+                continue
+            cells = []
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                a, b = before[endpoint][key], s[key]
+                change = f"{(b - a) / a * 100:+.0f}%" if a else "n/a"
+                cells.append(f"{key} {a} → {b} ({change})")
+            print(f"  {endpoint:<28}" + "   ".join(cells))
+
+
+async def main(args):
+    fake_openai.FAULTS.update(latency=args.latency, token_rate=args.token_rate,
+                              error_rate=args.error_rate, error_status=args.error_status)
+    fake = await fake_openai.start_server(port=args.fake_port)
+    process = None
+    try:
+        if args.seed:
+            await seed(args.mongo_uri, args.database, args.users, args.random_seed)
+        if args.app_url:
+            url = args.app_url
+        else:
+            process, url = await launch_app(args, f"http://127.0.0.1:{args.fake_port}/v1")
+
+        run_id = datetime.datetime.now().strftime("%H%M%S")
+        limits = httpx.Limits(max_connections=args.concurrency * 2)
+        async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+            scenarios = {name: await run_scenario(client, name, args, run_id)
+                         for name in args.scenarios}
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        fake.should_exit = True
+        await fake.task
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "users": args.users, "concurrency": args.concurrency, "workers": args.workers,
+            "faults": dict(fake_openai.FAULTS), "fake_openai_stats": dict(fake_openai.STATS),
+        },
+        "scenarios": scenarios,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(
+        args.output_dir, f"loadtest-{commit}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 results saved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn workers (event loop lag is scraped from one of them)")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="edubridge_loadtest")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--no-seed", dest="seed", action="store_false")
+    parser.add_argument("--app-url", help="test an already running app instead of launching one")
+    parser.add_argument("--app-port", type=int, default=8910)
+    parser.add_argument("--fake-port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake OpenAI time to first token")
+    parser.add_argument("--token-rate", type=float, default=400, help="fake OpenAI tokens/second")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="print the differences between two result files and exit")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        asyncio.run(main(args))
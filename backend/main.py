@@ -1,26 +1,56 @@
-from fastapi import Body, Form, Header, HTTPException
-from fastapi import FastAPI, UploadFile, Form, Header, HTTPException
+from fastapi import Body, FastAPI, Form, Header, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from models.user_model import UserCreate, UserLogin
-from services.auth import hash_password, verify_password, create_token, verify_token
-from services.db import db, users_col
-from services.resume_parser import extract_text
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pymongo.errors import DuplicateKeyError
+from services.auth import hash_password_async, verify_password_async, create_token, verify_token
+from services.db import users_col
+from services.indexes import ensure_indexes
+from services import interviews
+from services.users_repo import get_dashboard, get_selected_role, get_user, update_user
+from services.profile_cache import profile_cache
+from services.interviews import SessionNotFound
+from services.live_interviews import MAX_ANSWER_CHARS, live_interviews
+from services.interview_evaluation import EVALUATION_MODE, evaluate_all, evaluate_per_question
+from services.cohort_onboarding import RosterError, get_import, import_cohort, read_roster
+from services.skill_analytics import skill_rollups
+from services.plan_catalog import plan_catalog
+from services.jobs import job_queue
+from services.resume_parser import (
+    ResumeTooLarge, extract_text_async, read_upload, shutdown_parser_pool, spool_digest, spool_upload
+)
+from services.resume_sections import segment_resume
+from services.resume_pipeline import (
+    enqueue_resume_analysis,
+    find_resume_job,
+    reuse_known_resume,
+    store_resume_analysis,
+)
+from services.sse import sse_response
+from services.ai_streaming import stream_evaluation, stream_role_plan, stream_text
 import json
-import re
-from openai import OpenAI
 from dotenv import load_dotenv
+from services.llm_cache import response_cache
+from services.llm_gateway import LLMBudgetMiddleware, gateway
+from services.llm_scheduler import LLMPriorityMiddleware, LLMSaturated
+from services.telemetry import TELEMETRY_ENABLED, TimingMiddleware, monitor_event_loop_lag, render_metrics, span
+from services.structured_output import schema_stats
 from services.ai_engine import (
-    analyze_resume,
-    suggest_roles_from_skills,
-    generate_roadmap,
-    generate_projects,
+    analysis_unavailable,
+    budgeted_resume_prompt,
+    evaluate_interview_answers,
+    extract_skills,
+    generate_interview_questions,
+    generate_role_plan,
+    inflight,
+    interview_feedback_prompt,
+    normalize_projects,
     mock_interview,
 )
+import asyncio
+import hmac
 import os
-import uuid
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 # ======================================================
 # APP INITIALIZATION
 # ======================================================
@@ -45,6 +75,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ⏱️ Per-endpoint deadline and scheduling priority for the LLM calls of a request
+app.add_middleware(LLMBudgetMiddleware)
+app.add_middleware(LLMPriorityMiddleware)
+
+# 📊 Outermost: per-stage timings → Server-Timing header + /metrics histograms
+app.add_middleware(TimingMiddleware)
+
+
+@app.exception_handler(LLMSaturated)
+async def llm_saturated_handler(request, exc: LLMSaturated):
+    """LLM capacity is exhausted for this priority class → ask the client to retry."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "AI service is busy. Please retry shortly.", "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+
+@app.on_event("startup")
+async def bootstrap_indexes():
+    """Unique email index + indexes of the cache, job and resume collections."""
+    await ensure_indexes()
 
 # ======================================================
 # REGISTER WITH RESUME
@@ -56,43 +109,74 @@ async def register_with_resume(
     name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
-    file: UploadFile = None
+    file: UploadFile = None,
+    idempotency_key: str = Header(None)
 ):
     """
-    Signup + upload resume → analyze skills + suggest roles using AI.
+    Signup + upload resume → queue skill analysis + role suggestion.
+    Returns immediately with a job id; poll /jobs/{job_id} for the result.
     """
-    if users_col.find_one({"email": email.lower()}):
-        raise HTTPException(status_code=400, detail="User already exists")
+    try:
+        with span("upload"):
+            spool = await spool_upload(file) if file else None
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        return await _register(name, email, password, spool, file.filename if file else None,
+                               idempotency_key)
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+async def _register(name, email, password, spool, filename, idempotency_key):
+    digest = spool_digest(spool) if spool is not None else None
+    existing = await get_user(email.lower(), "password", "suggested_roles")
+    if existing:
+        # 🔁 A retried signup (same password + same upload) gets its original job back
+        job = await find_resume_job(email.lower(), digest, "register", idempotency_key) \
+            if digest else None
+        if not job or not await verify_password_async(password, existing["password"]):
+            raise HTTPException(status_code=400, detail="User already exists")
+        return {
+            "message": "Signup already received. Resume analysis in progress.",
+            "token": create_token(email.lower()),
+            "job_id": job["_id"],
+            "suggested_roles": existing.get("suggested_roles", [])
+        }
 
-    hashed = hash_password(password)
-    resume_text, ai_output, suggested_roles = "", {}, []
+    hashed = await hash_password_async(password)
+
+    # Store user (analysis fields are filled in by the background job)
+    try:
+        await users_col.insert_one({
+            "name": name,
+            "email": email.lower(),
+            "password": hashed,
+            "resume_text": "",
+            "ai_analysis": {},
+            "suggested_roles": [],
+            "selected_role": None,
+            "roadmap_data": None,
+            "projects": []
+        })
+    except DuplicateKeyError:
+        # A concurrent signup with the same email got in first
+        raise HTTPException(status_code=400, detail="User already exists")
 
     # Resume analysis
-    if file:
-        content = await file.read()
-        resume_text = extract_text(content, file.filename)
-        ai_output = analyze_resume(resume_text, "general")
-        suggested_roles = suggest_roles_from_skills(resume_text)
-
-    # Store user
-    users_col.insert_one({
-        "name": name,
-        "email": email.lower(),
-        "password": hashed,
-        "resume_text": resume_text[:1500],
-        "ai_analysis": ai_output,
-        "suggested_roles": suggested_roles,
-        "selected_role": None,
-        "roadmap_data": None,
-        "projects": [],
-        "mock_interview_history": []
-    })
+    job_id = None
+    if spool is not None:
+        job = await enqueue_resume_analysis(
+            email.lower(), spool, digest, filename, "register", idempotency_key)
+        job_id = job["_id"]
 
     token = create_token(email.lower())
     return {
-        "message": "Signup successful. Roles suggested.",
+        "message": "Signup successful. Resume analysis queued." if job_id else "Signup successful.",
         "token": token,
-        "suggested_roles": suggested_roles
+        "job_id": job_id,
+        "suggested_roles": []
     }
 
 # ======================================================
@@ -109,13 +193,18 @@ async def login(
     Authenticate user using form data (supports multipart/form-data or x-www-form-urlencoded)
     and return a JWT token.
     """
-    db_user = users_col.find_one({"email": email.lower()})
+    db_user = await get_user(email.lower(), "name", "email", "password", "selected_role",
+                             "password_is_temporary")
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not verify_password(password, db_user["password"]):
+    if not await verify_password_async(password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    if db_user.get("password_is_temporary"):
+        # Onboarded with a generated password: it has reached the student now
+        await update_user(email.lower(), {"password_is_temporary": False})
+
     token = create_token(email.lower())
 
     # ✅ Optional: Include more profile details
@@ -130,6 +219,32 @@ async def login(
 # SELECT ROLE → GENERATE ROADMAP + PROJECTS
 # ======================================================
 
+# Strong references to fire-and-forget saves so they are not garbage collected
+_background_tasks = set()
+
+
+def _persist_when_ready(task, email, role, name):
+    """
+    Save a roadmap/projects generation that missed the request deadline once it
+    completes, unless the user has switched to another role in the meantime.
+    """
+    async def _save():
+        try:
+            value = await task
+        except Exception as e:
+            print(f"⚠️ Late {name} for {email} not saved: {e}")
+            return
+        if name == "projects":
+            field, value = "projects", normalize_projects(value)
+        else:
+            field = "roadmap_data"
+        await update_user(email, {field: value}, match={"selected_role": role})
+        print(f"✅ Late {name} saved for {email} ({role})")
+
+    saver = asyncio.create_task(_save())
+    _background_tasks.add(saver)
+    saver.add_done_callback(_background_tasks.discard)
+
 
 @app.post("/select_role")
 async def select_role(
@@ -146,8 +261,8 @@ async def select_role(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    # 🔍 Fetch user
-    user = users_col.find_one({"email": email})
+    # 🔍 Fetch user (skills only)
+    user = await get_user(email, "ai_analysis.skills")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -155,57 +270,77 @@ async def select_role(
     skills = user.get("ai_analysis", {}).get(
         "skills", ["Python", "SQL", "React", "Machine Learning"])
 
-    # 1️⃣ Generate AI-based roadmap
-    roadmap = generate_roadmap(skills, role)
-
-    # 2️⃣ Generate AI-based structured projects
-    projects = generate_projects(role)
-
-    # ✅ Normalize to JSON list of dicts
-    if isinstance(projects, str):
-        try:
-            projects = json.loads(projects)
-        except Exception:
-            match = re.search(r"\[.*\]", projects, re.S)
-            if match:
-                try:
-                    projects = json.loads(match.group(0))
-                except Exception:
-                    projects = [{"title": projects}]
-            else:
-                projects = [{"title": projects}]
-    elif not isinstance(projects, list):
-        projects = [projects]
-
-    formatted_projects = []
-    for p in projects:
-        if isinstance(p, dict):
-            formatted_projects.append({
-                "title": p.get("title", "Untitled Project"),
-                "description": p.get("description", ""),
-                "tech_stack": p.get("tech_stack", []),
-                "difficulty": p.get("difficulty", "Intermediate")
-            })
-        elif isinstance(p, str):
-            formatted_projects.append({"title": p, "description": ""})
+    # 1️⃣ + 2️⃣ Pre-generated plan from the catalog; whatever it lacks is generated concurrently
+    known = plan_catalog.lookup(skills, role)
+    with span("role_plan"):
+        roadmap, formatted_projects, pending = await generate_role_plan(skills, role, known=known)
 
     # 3️⃣ Save updates to DB
-    users_col.update_one(
-        {"email": email},
-        {"$set": {
-            "selected_role": role,
-            "roadmap_data": roadmap,
-            "projects": formatted_projects
-        }}
-    )
+    await update_user(email, {
+        "selected_role": role,
+        "roadmap_data": roadmap,
+        "projects": formatted_projects
+    })
+
+    # ⏳ Anything that missed the deadline is saved once it finishes
+    for name, task in pending.items():
+        _persist_when_ready(task, email, role, name)
 
     return {
         "message": "✅ Role, roadmap, and project ideas saved successfully.",
         "selected_role": role,
         "roadmap": roadmap,
-        "projects": formatted_projects
+        "projects": formatted_projects,
+        "pending": list(pending)
     }
 
+
+@app.post("/select_role/stream")
+async def select_role_stream(
+    role: str = Form(...),
+    authorization: str = Header(None)
+):
+    """
+    Streaming variant of /select_role (text/event-stream).
+    Events: `phase` / `project` as each one is generated, then the full
+    `roadmap` and `projects`, then `done` once both are saved. A `reset`
+    ({part}) means the phases or projects sent so far are discarded and the
+    default ones follow; `error` (with retry_after) if the AI service is busy.
+    """
+    try:
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    user = await get_user(email, "ai_analysis.skills")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    skills = user.get("ai_analysis", {}).get(
+        "skills", ["Python", "SQL", "React", "Machine Learning"])
+
+    known = plan_catalog.lookup(skills, role)
+
+    async def produce(emit):
+        plan = {}
+        async for kind, payload in stream_role_plan(skills, role, known=known):
+            if kind in ("roadmap", "projects"):
+                plan[kind] = payload
+            await emit(kind, payload)
+
+        await update_user(email, {
+            "selected_role": role,
+            "roadmap_data": plan["roadmap"],
+            "projects": plan["projects"]
+        })
+        await emit("done", {
+            "message": "✅ Role, roadmap, and project ideas saved successfully.",
+            "selected_role": role
+        })
+
+    return sse_response(produce)
+
 # ======================================================
 # USER DATA FETCH
 # ======================================================
@@ -222,10 +357,12 @@ async def get_user_data(authorization: str = Header(None)):
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    user = users_col.find_one({"email": email}, {"_id": 0, "password": 0})
+    user = await get_dashboard(email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # 🗂️ Interview history is paginated via /interviews; only a summary here
+    user["interview_summary"] = await interviews.recent_summary(email)
     return user
 
 # ======================================================
@@ -236,10 +373,12 @@ async def get_user_data(authorization: str = Header(None)):
 @app.post("/update_resume")
 async def update_resume(
     file: UploadFile,
-    authorization: str = Header(None)
+    authorization: str = Header(None),
+    idempotency_key: str = Header(None)
 ):
     """
     Re-upload resume for updated AI skill analysis (without role change).
+    Returns immediately with a job id; poll /jobs/{job_id} for the result.
     """
     try:
         token = authorization.split(" ")[1]
@@ -247,19 +386,130 @@ async def update_resume(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    content = await file.read()
-    text = extract_text(content, file.filename)
-    ai_output = analyze_resume(text, "general")
+    try:
+        with span("upload"):
+            spool = await spool_upload(file)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    with spool:
+        # ♻️ Same file as before → stored analysis, no parsing or GPT call
+        digest = spool_digest(spool)
+        reused = await reuse_known_resume(email, digest)
+        if reused:
+            return {
+                "message": "Resume unchanged. Previous analysis reused.",
+                "job_id": None,
+                "status": "done",
+                **reused
+            }
 
-    users_col.update_one(
-        {"email": email},
-        {"$set": {
-            "resume_text": text[:1500],
-            "ai_analysis": ai_output
-        }}
-    )
+        job = await enqueue_resume_analysis(
+            email, spool, digest, file.filename, "update", idempotency_key)
+
+    return {
+        "message": "Resume received. Analysis queued.",
+        "job_id": job["_id"],
+        "status": job["status"]
+    }
 
-    return {"message": "Resume updated successfully.", "ai_output": ai_output}
+
+@app.post("/update_resume/stream")
+async def update_resume_stream(
+    file: UploadFile,
+    authorization: str = Header(None)
+):
+    """
+    Streaming variant of /update_resume (text/event-stream): runs the analysis
+    inline and sends `skills`, then the AI summary as `token` deltas, then
+    `done` with the saved result.
+    """
+    try:
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    try:
+        with span("upload"):
+            spool = await spool_upload(file)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    filename = file.filename
+
+    async def produce(emit):
+        # The bytes are only read into memory for the parser, not held by the request
+        with spool:
+            reused = await reuse_known_resume(email, spool_digest(spool))
+            if reused:
+                await emit("done", reused)
+                return
+            content = spool.read()
+
+        await emit("stage", {"stage": "extracting"})
+        text = await extract_text_async(content, filename)
+        skills = extract_skills(text)
+        sections = segment_resume(text)
+        await emit("skills", skills)
+
+        await emit("stage", {"stage": "analyzing"})
+        ai_output = {"skills": skills}
+        async for kind, payload in stream_text(
+            budgeted_resume_prompt(text, "general", sections),
+            analysis_unavailable,
+            purpose="resume_analysis"
+        ):
+            if kind == "token":
+                await emit("token", {"delta": payload})
+            else:
+                ai_output["ai_summary"] = payload
+                if kind == "fallback":
+                    ai_output["fallback"] = True
+
+        result = await store_resume_analysis(email, content, text, ai_output, sections=sections)
+        await emit("done", result)
+
+    return sse_response(produce)
+
+# ======================================================
+# BACKGROUND JOBS
+# ======================================================
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    """Start the resume-analysis workers (jobs left over from a restart resume)."""
+    await job_queue.start()
+    await profile_cache.start()
+    await plan_catalog.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+    await profile_cache.stop()
+    await plan_catalog.stop()
+    shutdown_parser_pool()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, authorization: str = Header(None)):
+    """
+    Status of a background job: queued | running | done | failed, the current
+    stage, and the result once done.
+    """
+    try:
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    job = await job_queue.get(job_id, email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job["job_id"] = job.pop("_id")
+    return job
 
 # ======================================================
 # MOCK INTERVIEW
@@ -269,6 +519,7 @@ async def update_resume(
 @app.post("/mock_interview")
 async def ai_mock_interview(
     answer: str = Form(...),
+    session_id: str = Form(None),
     authorization: str = Header(None)
 ):
     """
@@ -280,25 +531,382 @@ async def ai_mock_interview(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    user = users_col.find_one({"email": email})
-    role = user.get("selected_role", "General")
+    role = await get_selected_role(email)
+    if role is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    feedback = mock_interview(answer, role)
-    users_col.update_one(
-        {"email": email},
-        {"$push": {"mock_interview_history": {"answer": answer, "feedback": feedback}}}
-    )
-    return {"feedback": feedback}
+    try:
+        session_id = await interviews.resolve_session(email, session_id, role)
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    feedback = await mock_interview(answer, role)
+    await interviews.add_turn(email, session_id, answer, feedback)
+    return {"feedback": feedback, "session_id": session_id}
+
+
+@app.post("/mock_interview/stream")
+async def ai_mock_interview_stream(
+    answer: str = Form(...),
+    session_id: str = Form(None),
+    authorization: str = Header(None)
+):
+    """
+    Streaming variant of /mock_interview: feedback arrives as `token` deltas,
+    then `done` once the turn is saved.
+    """
+    try:
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    role = await get_selected_role(email)
+    if role is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    try:
+        session_id = await interviews.resolve_session(email, session_id, role)
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def produce(emit):
+        feedback = None
+        async for kind, payload in stream_text(
+            interview_feedback_prompt(answer, role),
+            lambda e: f"Mock interview AI failed ({e}). Try again later.",
+            purpose="interview_feedback"
+        ):
+            if kind == "token":
+                await emit("token", {"delta": payload})
+            else:
+                feedback = payload
+
+        await interviews.add_turn(email, session_id, answer, feedback)
+        await emit("done", {"feedback": feedback, "session_id": session_id})
+
+    return sse_response(produce)
+
+# ======================================================
+# COHORT ONBOARDING (bulk, admin only)
+# ======================================================
+
+ONBOARDING_ADMIN_KEY = os.getenv("ONBOARDING_ADMIN_KEY")
+ONBOARDING_MAX_ZIP_BYTES = int(os.getenv("ONBOARDING_MAX_ZIP_BYTES", str(1024 * 1024 * 1024)))
+
+
+def _require_admin(admin_key):
+    # Disabled unless a key is configured
+    if not ONBOARDING_ADMIN_KEY or not admin_key or \
+            not hmac.compare_digest(admin_key.encode(), ONBOARDING_ADMIN_KEY.encode()):
+        raise HTTPException(status_code=403, detail="Admin key required")
+
+
+@app.post("/cohorts/{cohort}/import")
+async def import_cohort_endpoint(
+    cohort: str,
+    roster: UploadFile,
+    resumes: UploadFile = None,
+    import_id: str = Form(None),
+    x_admin_key: str = Header(None)
+):
+    """
+    Register a whole cohort from a CSV roster (name, email[, resume, password])
+    and a ZIP of resumes. Streams a `row` event per student (created,
+    already_imported, exists, invalid or failed; generated passwords are only
+    sent here), `progress` after each batch and `done` with the totals.
+    Re-posting the same roster resumes an interrupted import and sends new
+    passwords for imported students who have not logged in yet.
+    """
+    _require_admin(x_admin_key)
+    try:
+        roster_bytes = await read_upload(roster)
+        archive = await spool_upload(resumes, ONBOARDING_MAX_ZIP_BYTES) if resumes else None
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    try:
+        read_roster(roster_bytes)
+    except RosterError as e:
+        if archive is not None:
+            archive.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def produce(emit):
+        try:
+            summary = await import_cohort(cohort, roster_bytes, archive, emit, import_id)
+        except RosterError as e:
+            await emit("error", {"detail": str(e), "retry_after": None})
+            return
+        finally:
+            if archive is not None:
+                archive.close()
+        await emit("done", summary)
+
+    return sse_response(produce)
+
+
+@app.get("/cohorts/imports/{import_id}")
+async def cohort_import_status(import_id: str, x_admin_key: str = Header(None)):
+    """Status, counts and failed rows of a cohort import."""
+    _require_admin(x_admin_key)
+    record = await get_import(import_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return record
+
+# ======================================================
+# COHORT ANALYTICS (skill gaps from the rollups, admin only)
+# ======================================================
+
+
+@app.get("/analytics/cohorts/{cohort}/roles")
+async def cohort_roles(cohort: str, x_admin_key: str = Header(None)):
+    """How many students of the cohort target each role."""
+    _require_admin(x_admin_key)
+    return await skill_rollups.cohort_roles(cohort)
+
+
+@app.get("/analytics/cohorts/{cohort}/skill_gaps")
+async def cohort_skill_gaps(cohort: str, role: str, limit: int = 10, x_admin_key: str = Header(None)):
+    """
+    Top missing skills of the cohort's students targeting `role` (how many
+    lack each of the role's skills), plus the skills they have most often.
+    """
+    _require_admin(x_admin_key)
+    return await skill_rollups.skill_gaps(cohort, role, limit=max(1, min(limit, 50)))
+
+
+@app.post("/analytics/rollups/rebuild")
+async def rebuild_skill_rollups(x_admin_key: str = Header(None)):
+    """Recompute all rollups from the users collection."""
+    _require_admin(x_admin_key)
+    return await skill_rollups.rebuild()
+
+# ======================================================
+# LIVE INTERVIEW (WebSocket)
+# ======================================================
+
+
+@app.websocket("/ws/interview")
+async def interview_socket(websocket: WebSocket, token: str = None, session_id: str = None):
+    """
+    A whole interview over one connection, authenticated once
+    (`?token=...`, plus `&session_id=...` to resume). JSON messages:
+
+        server → {"type": "session", session_id, role, questions, turns, next_question, resumed}
+        client → {"type": "answer", "answer": "..."}
+        server → {"type": "token", "delta"}...  then {"type": "turn", question, answer, feedback, next_question}
+        client → {"type": "end"}
+        server → {"type": "question", index, score, ...} per answer  then {"type": "evaluation", score, feedback, questions, session_id}
+
+    Problems are sent as {"type": "error", "detail", "retry_after"}; the
+    connection stays open unless the session itself cannot be opened or its
+    evaluation fails for a reason other than a busy AI service (then the
+    session is checkpointed and the socket closed with 1011).
+    """
+    await websocket.accept()
+    try:
+        email = verify_token(token)
+    except Exception:
+        await websocket.close(code=4401, reason="Invalid or missing token")
+        return
+
+    async def emit(kind, data):
+        await websocket.send_json({"type": kind, **data})
+
+    role = await get_selected_role(email)
+    if role is None:
+        await websocket.close(code=4404, reason="User not found")
+        return
+    try:
+        live, source = await live_interviews.open(email, role, session_id)
+    except SessionNotFound as e:
+        await emit("error", {"detail": str(e), "retry_after": None})
+        await websocket.close(code=4404, reason=str(e))
+        return
+    except LLMSaturated as e:
+        await emit("error", {"detail": "AI service is busy. Please retry shortly.",
+                             "retry_after": e.retry_after})
+        await websocket.close(code=1013, reason="Try again later")
+        return
+
+    await emit("session", {**live.state(), "resumed": source != "new"})
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "answer":
+                answer = str(message.get("answer") or "").strip()[:MAX_ANSWER_CHARS]
+                if not answer:
+                    await emit("error", {"detail": "Empty answer", "retry_after": None})
+                    continue
+                try:
+                    await live.answer(answer, emit)
+                except LLMSaturated as e:
+                    await emit("error", {"detail": "AI service is busy. Please resend your answer.",
+                                         "retry_after": e.retry_after})
+            elif kind == "end":
+                try:
+                    await live_interviews.finish(live, emit)
+                except LLMSaturated as e:
+                    # The session stays live; the client sends "end" again
+                    await emit("error", {"detail": "AI service is busy. Please end the interview again.",
+                                         "retry_after": e.retry_after})
+                    continue
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:
+                    print(f"⚠️ Interview {live.session_id} evaluation failed: {e}")
+                    await live_interviews.detach(live)
+                    await emit("error", {"detail": "Evaluation failed. Your answers are saved; "
+                                                   "reconnect with this session_id to end it again.",
+                                         "retry_after": None})
+                    await websocket.close(code=1011, reason="Evaluation failed")
+                    return
+                await websocket.close()
+                return
+            elif kind == "ping":
+                await emit("pong", {})
+            else:
+                detail = f"Unknown message type: {kind}" if kind else "Expected a JSON object with a type"
+                await emit("error", {"detail": detail, "retry_after": None})
+    except WebSocketDisconnect:
+        await live_interviews.detach(live)
+
+# ======================================================
+# INTERVIEW HISTORY (cursor-paginated)
+# ======================================================
+
+
+@app.get("/interviews")
+async def list_interviews(
+    limit: int = 20,
+    cursor: str = None,
+    authorization: str = Header(None)
+):
+    """
+    The user's interview sessions, newest first. Pass `next_cursor` back as
+    `cursor` to fetch the next page.
+    """
+    try:
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    try:
+        page = await interviews.list_sessions(email, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for item in page["items"]:
+        item["session_id"] = item.pop("_id")
+    return page
+
+
+@app.get("/interviews/{session_id}/turns")
+async def list_interview_turns(
+    session_id: str,
+    limit: int = 20,
+    cursor: str = None,
+    authorization: str = Header(None)
+):
+    """
+    Answers and feedback of one session, newest first, cursor-paginated.
+    """
+    try:
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+    try:
+        page = await interviews.list_turns(email, session_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    for item in page["items"]:
+        item["turn_id"] = item.pop("_id")
+    return page
 
 # ======================================================
 # HEALTH CHECK
 # ======================================================
 
 
+@app.get("/llm_cache/stats")
+async def llm_cache_stats():
+    """
+    Hit/miss counters of the LLM response cache on this worker, per policy,
+    plus how many callers were coalesced onto an in-flight request and how
+    often each response schema needed repair or a retry.
+    """
+    return {
+        **response_cache.snapshot(),
+        "singleflight": inflight.stats,
+        "structured_output": schema_stats()
+    }
+
+
+@app.get("/llm_gateway/stats")
+async def llm_gateway_stats():
+    """
+    Circuit-breaker state of this worker plus call, retry, short-circuit and
+    deadline counters of the LLM gateway.
+    """
+    return gateway.snapshot()
+
+
+@app.get("/profile_cache/stats")
+async def profile_cache_stats():
+    """Hit rate, size and sync mode (change_stream | polling) of this worker's profile cache."""
+    return profile_cache.snapshot()
+
+
+@app.get("/catalog/stats")
+async def plan_catalog_stats():
+    """Entries held by this worker and how often /select_role was served from them."""
+    return plan_catalog.snapshot()
+
+
+@app.post("/catalog/refresh")
+async def refresh_plan_catalog(x_admin_key: str = Header(None)):
+    """Queue an immediate regeneration of the whole catalog."""
+    _require_admin(x_admin_key)
+    job = await plan_catalog.schedule_refresh(manual=True)
+    return {"job_id": job["_id"], "status": job["status"]}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus scrape endpoint: request latency by route, stage spans (auth,
+    bcrypt, mongo, extract, llm.*), Mongo commands, LLM token counts and
+    event loop lag. Numbers are per worker process.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+_lag_monitor = None
+
+
+@app.on_event("startup")
+async def start_lag_monitor():
+    global _lag_monitor
+    if TELEMETRY_ENABLED:
+        _lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+
+
+@app.on_event("shutdown")
+async def stop_lag_monitor():
+    if _lag_monitor is not None:
+        _lag_monitor.cancel()
+
+
 @app.get("/test_db")
 async def test_db():
     try:
-        count = users_col.count_documents({})
+        count = await users_col.estimated_document_count()
         return {"message": f"✅ Connected to MongoDB. {count} users found."}
     except Exception as e:
         return {"error": str(e)}
@@ -317,61 +925,16 @@ async def start_interview(authorization: str = Header(None)):
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    # 🧠 Fetch user from DB
-    user = users_col.find_one({"email": email})
-    if not user:
+    # 🧠 Fetch the user's role from DB
+    role = await get_selected_role(email)
+    if role is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    role = user.get("selected_role", "General")
+    # 🗣️ GPT-generated questions (response-cached per role)
+    questions = await generate_interview_questions(role)
 
-    # 🗣️ GPT prompt for generating questions
-    prompt = f"""
-    You are an expert technical interviewer for the role of {role}.
-    Generate exactly 5 unique, challenging, and realistic interview questions.
-    Return ONLY a valid JSON array in the following format:
-    [
-        {{ "id": 1, "question": "Explain the concept of microservices and their benefits." }},
-        {{ "id": 2, "question": "How do you ensure scalability in a large web application?" }}
-    ]
-    Do NOT include any text, explanation, or markdown before or after the JSON.
-    """
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-        )
-
-        raw = response.choices[0].message.content.strip()
-
-        # 🧩 Extract and safely parse JSON
-        match = re.search(r"\[.*\]", raw, re.S)
-        if match:
-            questions = json.loads(match.group(0))
-        else:
-            raise ValueError("GPT did not return valid JSON")
-
-        # 🧹 Validate structure
-        if not isinstance(questions, list) or not all("question" in q for q in questions):
-            raise ValueError("Invalid question format")
-
-    except Exception as e:
-        print("⚠️ Error parsing GPT response:", e)
-        # Fallback questions
-        questions = [
-            {"id": 1, "question": "Tell me about yourself."},
-            {"id": 2, "question": "What are your strengths and weaknesses?"},
-            {"id": 3, "question": "Describe a project you’re proud of."},
-            {"id": 4, "question": "How do you handle challenging deadlines?"},
-            {"id": 5, "question": "Why should we hire you for this position?"},
-        ]
-
-    # 🗃️ Save the questions in MongoDB for tracking
-    users_col.update_one(
-        {"email": email},
-        {"$set": {"current_interview_questions": questions}}
-    )
+    # 🗃️ Open a session in the interviews collection for tracking
+    session_id = await interviews.start_session(email, role, questions)
 
     print(
         f"✅ Mock interview generated for {email} ({role}) with {len(questions)} questions")
@@ -379,23 +942,40 @@ async def start_interview(authorization: str = Header(None)):
     # 🚀 Return structured response
     return {
         "message": f"Mock interview for role '{role}' started successfully.",
+        "session_id": session_id,
         "questions": questions
     }
 
 
+def _parse_qa_data(qa_pairs, body):
+    """Q&A list from a raw JSON body or the `qa_pairs` form field."""
+    qa_data = None
+    if body and "qa_pairs" in body:
+        qa_data = body["qa_pairs"]
+    elif qa_pairs:
+        try:
+            qa_data = json.loads(qa_pairs)
+        except Exception:
+            raise HTTPException(
+                status_code=400, detail="Invalid JSON in qa_pairs")
+
+    if not qa_data or not isinstance(qa_data, list):
+        raise HTTPException(
+            status_code=400, detail="Missing or invalid Q&A data")
+    return qa_data
+
+
 @app.post("/evaluate_interview")
 async def evaluate_interview(
     authorization: str = Header(None),
     qa_pairs: str = Form(None),
+    session_id: str = Form(None),
     body: dict = Body(None)
 ):
     """
     Evaluate completed mock interview Q&A.
     Accepts both FormData (qa_pairs) and raw JSON body.
     """
-    import json
-    import re
-
     # ✅ Step 1: Verify token
     try:
         token = authorization.split(" ")[1]
@@ -403,71 +983,89 @@ async def evaluate_interview(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-    # ✅ Step 2: Fetch user
-    user = users_col.find_one({"email": email})
-    if not user:
+    # ✅ Step 2: Fetch the user's role
+    role = await get_selected_role(email)
+    if role is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    role = user.get("selected_role", "General")
-
     # ✅ Step 3: Parse Q&A from FormData or JSON body
-    qa_data = None
-    if body and "qa_pairs" in body:
-        qa_data = body["qa_pairs"]
-    elif qa_pairs:
-        try:
-            qa_data = json.loads(qa_pairs)
-        except Exception:
-            raise HTTPException(
-                status_code=400, detail="Invalid JSON in qa_pairs")
+    qa_data = _parse_qa_data(qa_pairs, body)
 
-    if not qa_data or not isinstance(qa_data, list):
-        raise HTTPException(
-            status_code=400, detail="Missing or invalid Q&A data")
+    if body and body.get("session_id"):
+        session_id = body["session_id"]
+    try:
+        session_id = await interviews.resolve_session(email, session_id)
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    # ✅ Step 4–5: Evaluate with GPT (per answer, reusing scores already on
+    # the session; generic fallback on failure)
+    scores = None
+    with span("evaluate"):
+        if EVALUATION_MODE == "per_question":
+            known = await interviews.get_scores(email, session_id)
+            result = await evaluate_all(role, qa_data, known)
+            scores = result.pop("scores")
+        else:
+            result = await evaluate_interview_answers(role, qa_data)
+
+    # ✅ Step 6: Save evaluation on the interview session
+    result["session_id"] = await interviews.complete_session(
+        email, session_id, role, qa_data, result, scores)
 
-    # ✅ Step 4: Build GPT prompt
-    prompt = f"""
-    You are a senior interviewer evaluating a {role} candidate.
-    Evaluate the following answers and return ONLY valid JSON:
-    {{
-        "score": 0-100,
-        "feedback": {{
-            "strengths": ["..."],
-            "weaknesses": ["..."],
-            "suggestions": "..."
-        }}
-    }}
-    Q&A: {json.dumps(qa_data, indent=2)}
-    """
-
-    # ✅ Step 5: Evaluate with GPT
+    return result
+
+
+@app.post("/evaluate_interview/stream")
+async def evaluate_interview_stream(
+    authorization: str = Header(None),
+    qa_pairs: str = Form(None),
+    session_id: str = Form(None),
+    body: dict = Body(None)
+):
+    """
+    Streaming variant of /evaluate_interview: each answer's result arrives as
+    a `question` event as soon as it is scored (or, in single-prompt mode,
+    the raw evaluation as `token` deltas), then `done` with the merged (and
+    saved) result.
+    """
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-        )
+        token = authorization.split(" ")[1]
+        email = verify_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid or missing token")
 
-        raw = response.choices[0].message.content.strip()
-        match = re.search(r"\{.*\}", raw, re.S)
-        result = json.loads(match.group(0)) if match else None
-        if not result:
-            raise ValueError("No valid JSON found in GPT response")
+    role = await get_selected_role(email)
+    if role is None:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    except Exception as e:
-        print("⚠️ GPT evaluation error:", e)
-        result = {
-            "score": 78,
-            "feedback": {
-                "strengths": ["Good clarity", "Relevant answers"],
-                "weaknesses": ["Needs deeper technical explanations"],
-                "suggestions": "Give more practical examples next time."
-            }
-        }
+    qa_data = _parse_qa_data(qa_pairs, body)
+    if body and body.get("session_id"):
+        session_id = body["session_id"]
+    try:
+        resolved = await interviews.resolve_session(email, session_id)
+    except SessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def produce(emit):
+        result, scores = None, None
+        if EVALUATION_MODE == "per_question":
+            known = await interviews.get_scores(email, resolved)
+            async for kind, payload in evaluate_per_question(role, qa_data, known):
+                if kind == "question":
+                    await emit("question", payload)
+                else:
+                    result = payload
+            scores = result.pop("scores")
+        else:
+            async for kind, payload in stream_evaluation(role, qa_data):
+                if kind == "token":
+                    await emit("token", {"delta": payload})
+                else:
+                    result = payload
 
-    # ✅ Step 6: Save evaluation to DB
-    users_col.update_one(
-        {"email": email},
-        {"$push": {"mock_interview_history": {"qa": qa_data, "evaluation": result}}}
-    )
+        result["session_id"] = await interviews.complete_session(
+            email, resolved, role, qa_data, result, scores)
+        await emit("done", result)
 
-    return result
+    return sse_response(produce)
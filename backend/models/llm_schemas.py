@@ -0,0 +1,131 @@
+import math
+from typing import List
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+# ======================================================
+# Response schemas for GPT output
+# ======================================================
+# Fields default generously so a partially correct reply is salvaged instead of
+# discarded; only a reply with no usable structure fails validation.
+
+
+def _as_list(value):
+    """Accept "a, b, c" or a single string where a list of strings is expected."""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return value
+
+
+class RoadmapPhase(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    phase: str
+    objective: str = ""
+    focus: List[str] = []
+    projects: List[str] = []
+    duration_weeks: int = Field(default=3, ge=1, le=52)
+
+    _lists = field_validator("focus", "projects", mode="before")(_as_list)
+
+
+class Roadmap(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    target_role: str = ""
+    timeline_weeks: int = 0
+    roadmap: List[RoadmapPhase] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def fill_timeline(self):
+        # The timeline is the sum of its phases when GPT leaves it out
+        if self.timeline_weeks <= 0:
+            self.timeline_weeks = sum(p.duration_weeks for p in self.roadmap)
+        return self
+
+
+class Project(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    title: str = "Untitled Project"
+    description: str = ""
+    tech_stack: List[str] = []
+    difficulty: str = "Intermediate"
+
+    _lists = field_validator("tech_stack", mode="before")(_as_list)
+
+
+class ProjectList(BaseModel):
+    projects: List[Project] = Field(min_length=1)
+
+
+class InterviewQuestion(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    id: int = 0
+    question: str = Field(min_length=1)
+
+
+class InterviewQuestionList(BaseModel):
+    questions: List[InterviewQuestion] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def number_questions(self):
+        for i, q in enumerate(self.questions, start=1):
+            q.id = q.id or i
+        return self
+
+
+class EvaluationFeedback(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    suggestions: str = ""
+
+    _lists = field_validator("strengths", "weaknesses", mode="before")(_as_list)
+
+    @field_validator("suggestions", mode="before")
+    @classmethod
+    def join_suggestions(cls, value):
+        return " ".join(value) if isinstance(value, list) else value
+
+
+def _clamp_score(value):
+    # Only ValueError becomes a ValidationError (and a schema retry); a bare
+    # float() of null or an object would raise TypeError past it
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"score must be a number, got {type(value).__name__}")
+    try:
+        score = float(value)
+    except ValueError:
+        raise ValueError(f"score must be a number, got {value!r}")
+    if not math.isfinite(score):
+        raise ValueError("score must be finite")
+    return max(0, min(100, round(score)))
+
+
+class Evaluation(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    score: int
+    feedback: EvaluationFeedback = EvaluationFeedback()
+
+    _score = field_validator("score", mode="before")(_clamp_score)
+
+
+class QuestionEvaluation(BaseModel):
+    """Score and notes for one answer (map step of the per-question evaluation)."""
+    model_config = ConfigDict(extra="ignore")
+
+    score: int
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    suggestion: str = ""
+
+    _score = field_validator("score", mode="before")(_clamp_score)
+    _lists = field_validator("strengths", "weaknesses", mode="before")(_as_list)
+
+    @field_validator("suggestion", mode="before")
+    @classmethod
+    def join_suggestion(cls, value):
+        return " ".join(value) if isinstance(value, list) else value
@@ -0,0 +1,126 @@
+"""
+Move embedded `mock_interview_history` arrays out of user documents into the
+`interviews` collection.
+
+Users are streamed with a cursor (only email + history are loaded), their
+entries are converted into session/turn documents and written with bulk
+inserts of --batch documents. Ids are deterministic, so re-running after an
+interruption skips what was already copied. With --unset, the embedded arrays
+are removed once a user's entries are safely written. Run from backend/:
+
+    python -m scripts.migrate_interview_history --batch 1000 --unset
+"""
+import argparse
+import asyncio
+import datetime
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from services.db import interviews_col, users_col
+
+
+def convert(user):
+    """
+    Legacy entries are either {"answer", "feedback"} (one /mock_interview turn)
+    or {"qa", "evaluation"} (one /evaluate_interview call). Turns are grouped
+    into a single "legacy" session per user; each evaluation becomes its own
+    completed session.
+    """
+    email = user["email"]
+    migrated_at = datetime.datetime.utcnow()
+    legacy_session = f"legacy:{user['_id']}"
+    docs, has_turns = [], False
+
+    for i, entry in enumerate(user.get("mock_interview_history") or []):
+        # Preserve the original order within the user's history
+        created_at = migrated_at - datetime.timedelta(seconds=len(user["mock_interview_history"]) - i)
+        if "evaluation" in entry:
+            docs.append({
+                "_id": f"legacy:{user['_id']}:{i}",
+                "kind": "session",
+                "email": email,
+                "role": user.get("selected_role"),
+                "questions": [],
+                "status": "completed",
+                "qa": entry.get("qa"),
+                "evaluation": entry.get("evaluation"),
+                "created_at": created_at,
+                "ended_at": created_at,
+                "migrated": True,
+            })
+        else:
+            has_turns = True
+            docs.append({
+                "_id": f"legacy:{user['_id']}:{i}",
+                "kind": "turn",
+                "email": email,
+                "session_id": legacy_session,
+                "question": None,
+                "answer": entry.get("answer"),
+                "feedback": entry.get("feedback"),
+                "created_at": created_at,
+                "migrated": True,
+            })
+
+    if has_turns:
+        docs.append({
+            "_id": legacy_session,
+            "kind": "session",
+            "email": email,
+            "role": user.get("selected_role"),
+            "questions": [],
+            "status": "completed",
+            "created_at": migrated_at - datetime.timedelta(seconds=len(docs) + 1),
+            "ended_at": migrated_at,
+            "migrated": True,
+        })
+    return docs
+
+
+async def flush(ops, user_ids, unset):
+    if ops:
+        try:
+            await interviews_col.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate ids are documents copied by an earlier run
+            others = [err for err in e.details["writeErrors"] if err["code"] != 11000]
+            if others:
+                raise
+    if unset and user_ids:
+        await users_col.bulk_write(
+            [UpdateOne({"_id": uid}, {"$unset": {"mock_interview_history": ""}}) for uid in user_ids],
+            ordered=False
+        )
+
+
+async def main(args):
+    cursor = users_col.find(
+        {"mock_interview_history.0": {"$exists": True}},
+        {"email": 1, "selected_role": 1, "mock_interview_history": 1},
+        batch_size=args.user_batch
+    )
+
+    ops, user_ids, users, entries = [], [], 0, 0
+    async for user in cursor:
+        docs = convert(user)
+        ops.extend(InsertOne(d) for d in docs)
+        user_ids.append(user["_id"])
+        users += 1
+        entries += len(user["mock_interview_history"])
+
+        if len(ops) >= args.batch:
+            await flush(ops, user_ids, args.unset)
+            ops, user_ids = [], []
+            print(f"… {users} users, {entries} entries migrated")
+
+    await flush(ops, user_ids, args.unset)
+    print(f"✅ Migrated {entries} history entries from {users} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch", type=int, default=1000, help="documents per bulk write")
+    parser.add_argument("--user-batch", type=int, default=200, help="users per cursor batch")
+    parser.add_argument("--unset", action="store_true", help="remove embedded arrays after copying")
+    asyncio.run(main(parser.parse_args()))
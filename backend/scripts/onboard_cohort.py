@@ -0,0 +1,64 @@
+"""
+Onboard a cohort from a CSV roster and a ZIP of resumes, straight to Mongo.
+
+Same pipeline as POST /cohorts/{cohort}/import (batched inserts, parsing in
+the process pool, deduplicated and rate-capped GPT analysis) without the
+HTTP upload. Per-row results are written to --output as CSV, including the
+generated passwords of rows without one. Re-running with the same cohort and
+roster resumes an interrupted import and writes new passwords for students
+who have not logged in yet, so a lost output file can be recovered. Run
+from backend/:
+
+    python -m scripts.onboard_cohort --cohort cse-2026 --roster roster.csv --resumes resumes.zip
+"""
+import argparse
+import asyncio
+import csv
+import sys
+import time
+
+from services.cohort_onboarding import RosterError, import_cohort
+from services.resume_parser import shutdown_parser_pool
+
+FIELDS = ["row", "email", "status", "analysis", "suggested_roles", "temporary_password", "error"]
+
+
+async def main(args):
+    with open(args.roster, "rb") as f:
+        roster_bytes = f.read()
+    resumes = open(args.resumes, "rb") if args.resumes else None
+    started = time.perf_counter()
+
+    with open(args.output, "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+
+        async def emit(event, data):
+            if event == "row":
+                writer.writerow({**data, "suggested_roles": "; ".join(data.get("suggested_roles") or [])})
+                if data["status"] in ("failed", "invalid"):
+                    print(f"⚠️ row {data['row']} ({data['email']}): {data['status']} — {data.get('error')}")
+            elif event == "progress":
+                print(f"… {data['processed']}/{data['total']} rows {data['counts']}")
+
+        try:
+            summary = await import_cohort(args.cohort, roster_bytes, resumes, emit, args.import_id)
+        except RosterError as e:
+            sys.exit(f"❌ {e}")
+        finally:
+            if resumes is not None:
+                resumes.close()
+            shutdown_parser_pool()
+
+    print(f"✅ Import {summary['import_id']} {summary['status']} in {time.perf_counter() - started:.1f}s: "
+          f"{summary['counts']} → {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cohort", required=True)
+    parser.add_argument("--roster", required=True, help="CSV with name, email[, resume, password]")
+    parser.add_argument("--resumes", help="ZIP of the resume files named in the roster")
+    parser.add_argument("--import-id", help="defaults to a hash of cohort + roster")
+    parser.add_argument("--output", default="onboarding-results.csv")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,42 @@
+"""
+Recompute the cohort × role × skill rollups from the users collection, or
+check them against a full recompute.
+
+Needed once after deploying the rollups (existing users have no rows yet),
+and to repair drift after an outage. The rebuild runs as one server-side
+aggregation into a scratch collection that then replaces the live one.
+--verify streams the same aggregation and reports rows that differ,
+without writing anything. Run from backend/:
+
+    python -m scripts.rebuild_skill_rollups
+    python -m scripts.rebuild_skill_rollups --verify
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from services.skill_analytics import skill_rollups
+
+
+async def main(args):
+    started = time.perf_counter()
+    if args.verify:
+        report = await skill_rollups.verify()
+        for mismatch in report["mismatches"][:args.show]:
+            print(f"⚠️ {mismatch}")
+        print(f"{'✅' if not report['mismatches'] else '❌'} {report['checked']} rows checked, "
+              f"{len(report['mismatches'])} mismatched ({time.perf_counter() - started:.1f}s)")
+        if report["mismatches"]:
+            sys.exit(1)
+    else:
+        await skill_rollups.ensure_indexes()
+        result = await skill_rollups.rebuild()
+        print(f"✅ Rebuilt {result['rows']} rollup rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verify", action="store_true", help="compare instead of rebuilding")
+    parser.add_argument("--show", type=int, default=20, help="mismatches to print")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,37 @@
+"""
+Pre-generate the plan catalog (roadmaps per role × skill bucket, projects
+per role) outside the API, e.g. before the first deploy or after bumping
+CATALOG_SCHEMA.
+
+Same warmer the scheduled catalog_refresh job runs: entries are validated
+before they replace the stored ones, and re-running with the same --version
+skips what that version already generated. Workers pick the new entries up
+within CATALOG_RELOAD_SECONDS. Run from backend/:
+
+    python -m scripts.warm_catalog
+    python -m scripts.warm_catalog --roles "Data Scientist" "Data Analyst" --version manual-1
+"""
+import argparse
+import asyncio
+import datetime
+import time
+
+from services.plan_catalog import plan_catalog
+
+
+async def main(args):
+    started = time.perf_counter()
+
+    async def report(stage):
+        print(f"… {stage}")
+
+    result = await plan_catalog.warm(args.version, report, args.roles)
+    print(f"✅ Catalog {result['version']}: {result['generated']} generated, {result['skipped']} skipped, "
+          f"{result['failed']} failed of {result['entries']} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--roles", nargs="*", help="defaults to every role in data/roles.json")
+    parser.add_argument("--version", default=f"offline-{datetime.datetime.utcnow():%Y%m%d%H%M%S}")
+    asyncio.run(main(parser.parse_args()))
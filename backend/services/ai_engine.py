@@ -1,51 +1,168 @@
+import asyncio
+import json
 import os
-import re
-import random
-from collections import Counter
-from openai import OpenAI
+from openai import BadRequestError
+from pydantic import ValidationError
 from dotenv import load_dotenv
+from models.llm_schemas import Project
+from services.llm_cache import LLM_CACHE_ENABLED, POLICIES, cache_key, response_cache
+from services.llm_gateway import gateway
+from services.llm_scheduler import LLMSaturated
+from services.singleflight import SingleFlight
+from services import structured_output
+from services.structured_output import (
+    EVALUATION, INTERVIEW_QUESTIONS, PROJECTS, QUESTION_EVALUATION, ROADMAP, ROADMAP_PHASE, SchemaError
+)
+from services.resume_sections import RESUME_PROMPT_TOKENS, analysis_text, segment_resume
+from services.skill_taxonomy import skill_matcher
+from services.token_budget import count_tokens, record_prompt
+from services.role_engine import role_engine
 
 # ======================================================
 # Initialization
 # ======================================================
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+MODEL = "gpt-4o-mini"
+
+# Identical cacheable prompts that are already in flight share one upstream call
+inflight = SingleFlight()
 
 # ======================================================
-# Helper: Extract Skills (Safe Version)
+# Helper: Chat Completion (response-cached, coalesced)
 # ======================================================
 
 
-def extract_skills(text: str):
+async def chat_completion(messages, temperature=None, cache_policy=None, validate=None,
+                          response_format=None, purpose="chat"):
     """
-    Extracts known technical skills from text safely using escaped regex.
-    Prevents regex errors with special characters like +, #, and .
+    Single entry point for chat completions; returns the message text.
+    When `cache_policy` names an entry in llm_cache.POLICIES, the response is
+    served from (and stored in) the shared response cache. `validate(text)` must
+    not raise for a fresh response to be cached.
+    `purpose` labels the call in Server-Timing and /metrics (llm.<purpose>).
+
+    Concurrent calls with a `cache_policy` and the same prompt key are
+    coalesced into one request, which runs in the first caller's context
+    (its llm_budget, llm_priority and spans); they would share the cached
+    answer anyway. Calls without one always go upstream on their own.
     """
-    keywords = [
-        "Python", "Java", "C++", "C#", "SQL", "HTML", "CSS", "JavaScript",
-        "React", "Node.js", "Express", "Django", "Flask", "TensorFlow",
-        "PyTorch", "AWS", "Azure", "Docker", "Kubernetes", "Pandas",
-        "NumPy", "Power BI", "Tableau", "Excel", "Machine Learning",
-        "Deep Learning", "Data Analysis", "FastAPI", "NLP", "DevOps", "Git"
-    ]
+    kwargs = {"model": MODEL, "messages": messages}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+
+    async def _call():
+        response = await gateway.create(purpose=purpose, **kwargs)
+        return response.choices[0].message.content
+
+    if not cache_policy:
+        return await _call()
+
+    key = cache_key(messages, MODEL, temperature)
+    if not LLM_CACHE_ENABLED:
+        return await inflight.do(key, _call)
+
+    return await inflight.do(
+        key,
+        lambda: response_cache.get_or_generate(key, POLICIES[cache_policy], _call, validate)
+    )
 
-    found = [
-        kw for kw in keywords
-        if re.search(rf"\b{re.escape(kw.lower())}\b", text.lower())
-    ]
-    return list(set(found))
 
 # ======================================================
-# AI: Resume Analyzer (GPT-4o)
+# Helper: Structured Output (schema-validated JSON replies)
 # ======================================================
 
 
-def analyze_resume(text, target_role):
+def response_format_for(schema):
+    return schema.response_format() if structured_output.STRUCTURED_OUTPUT else None
+
+
+async def resolve_structured(schema, messages, raw, constrained=True):
     """
-    Uses GPT to analyze a resume: extracts skills, missing areas, and suggests improvement steps.
+    Validated value of `raw` for `schema`. Plain JSON and locally repairable
+    replies cost nothing extra; otherwise one targeted correction call is made
+    (temperature 0, not cached). Raises SchemaError if that fails too.
+    `constrained=False` leaves the response_format off the correction call.
     """
-    prompt = f"""
+    try:
+        value, repaired = schema.parse_detailed(raw)
+        schema.record("repaired" if repaired else "direct")
+        return value
+    except SchemaError as e:
+        error = e
+
+    schema.record("retried")
+    print(f"⚠️ {schema.name} reply unusable ({error}); retrying once")
+    try:
+        fixed = await chat_completion(
+            schema.retry_messages(messages, raw, error),
+            temperature=0,
+            response_format=response_format_for(schema) if constrained else None,
+            purpose=f"{schema.name}_retry"
+        )
+        value = schema.parse(fixed)
+    except Exception:
+        schema.record("failed")
+        raise
+    schema.record("recovered")
+    return value
+
+
+async def structured_completion(messages, schema, temperature=None, cache_policy=None):
+    """
+    chat_completion constrained to `schema` (json_schema response_format when
+    enabled), returning the validated value instead of text. Only replies that
+    validate are cached.
+
+    If the API says structured outputs are unsupported, every later call
+    uses prompt-only JSON; if it only refuses this schema, just this call
+    does. Any other 400 is raised.
+    """
+    try:
+        raw = await chat_completion(
+            messages, temperature, cache_policy,
+            validate=schema.parse,
+            response_format=response_format_for(schema),
+            purpose=schema.name
+        )
+    except BadRequestError as e:
+        rejected = structured_output.STRUCTURED_OUTPUT and structured_output.rejected_response_format(e)
+        if not rejected:
+            raise
+        if rejected == "unsupported":
+            # Model/deployment without structured outputs → prompt-only JSON from now on
+            print(f"⚠️ Structured output unsupported ({e}); falling back to prompt-only JSON")
+            structured_output.STRUCTURED_OUTPUT = False
+        else:
+            print(f"⚠️ {schema.name} schema rejected ({e}); prompt-only JSON for this call")
+        raw = await chat_completion(
+            messages, temperature, cache_policy, validate=schema.parse, purpose=schema.name)
+        return await resolve_structured(schema, messages, raw, constrained=False)
+
+    return await resolve_structured(schema, messages, raw)
+
+# ======================================================
+# Helper: Extract Skills (taxonomy matcher)
+# ======================================================
+
+
+def extract_skills(text: str):
+    """
+    Extracts canonical technical skills from text in a single pass.
+    Aliases ("ReactJS", "k8s", "sklearn", "Postgres") map to canonical names via
+    the taxonomy in data/skills.json, compiled once by services.skill_taxonomy.
+    """
+    return skill_matcher.extract(text)
+
+# ======================================================
+# AI: Resume Analyzer (GPT-4o)
+# ======================================================
+
+
+def resume_prompt(text, target_role):
+    return f"""
     You are an expert AI career mentor. Analyze this resume:
     {text}
 
@@ -56,16 +173,44 @@ def analyze_resume(text, target_role):
     3. A short 3-step learning roadmap.
     Return your response in a clear bullet list format.
     """
+
+
+def budgeted_resume_prompt(text, target_role, sections=None):
+    """
+    resume_prompt with a long resume cut to RESUME_PROMPT_TOKENS by section
+    priority (skills and experience before education and contact details).
+    Resumes that fit are sent unchanged. Both sizes are recorded in /metrics.
+    """
+    body = text
+    if count_tokens(text) > RESUME_PROMPT_TOKENS:
+        body, _ = analysis_text(sections if sections is not None else segment_resume(text))
+    prompt = resume_prompt(body, target_role)
+    record_prompt("resume_analysis", resume_prompt(text, target_role), prompt)
+    return prompt
+
+
+def analysis_unavailable(error):
+    return f"⚠️ AI analysis unavailable ({error}). Using fallback."
+
+
+async def analyze_resume(text, target_role, skills=None, sections=None):
+    """
+    Uses GPT to analyze a resume: extracts skills, missing areas, and suggests improvement steps.
+    Pass `skills` when they were already extracted to skip a second pass, and
+    `sections` (segment_resume) when the resume was already segmented.
+    When GPT fails the summary is a placeholder and the output has
+    `"fallback": True`; such outputs must not be stored for reuse.
+    """
+    prompt = budgeted_resume_prompt(text, target_role, sections)
+    extracted_skills = skills if skills is not None else extract_skills(text)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        ai_text = response.choices[0].message.content
+        ai_text = await chat_completion(
+            [{"role": "user", "content": prompt}], purpose="resume_analysis")
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
     except Exception as e:
-        ai_text = f"⚠️ AI analysis unavailable ({e}). Using fallback."
+        return {"ai_summary": analysis_unavailable(e), "skills": extracted_skills, "fallback": True}
 
-    extracted_skills = extract_skills(text)
     return {"ai_summary": ai_text, "skills": extracted_skills}
 
 # ======================================================
@@ -73,42 +218,177 @@ def analyze_resume(text, target_role):
 # ======================================================
 
 
-def mock_interview(answer, role):
-    """
-    Generates dynamic feedback from AI for mock interview answers.
-    """
-    prompt = f"""
+def interview_feedback_prompt(answer, role):
+    return f"""
     You are a professional interviewer for the role: {role}.
     Candidate's last answer:
     "{answer}"
     
     Provide constructive feedback and one follow-up question.
     """
+
+
+def interview_turn_messages(role, questions, history, question, answer):
+    """
+    Conversation for one turn of a live interview: the plan, the last few
+    turns (already bounded by the caller) and the new answer.
+    """
+    plan = "\n".join(f"{i}. {q.get('question')}" for i, q in enumerate(questions, 1))
+    messages = [{"role": "system", "content": (
+        f"You are a professional interviewer for the role: {role}. "
+        f"The interview covers these questions:\n{plan}\n"
+        "After each answer give short constructive feedback that builds on the "
+        "earlier answers, then one follow-up question."
+    )}]
+    for turn in history:
+        messages.append({"role": "user", "content": f"Q: {turn.get('question')}\nA: {turn['answer']}"})
+        messages.append({"role": "assistant", "content": turn["feedback"]})
+    messages.append({"role": "user", "content": f"Q: {question}\nA: {answer}"})
+    return messages
+
+
+async def mock_interview(answer, role):
+    """
+    Generates dynamic feedback from AI for mock interview answers.
+    """
+    prompt = interview_feedback_prompt(answer, role)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
+        return await chat_completion(
+            [{"role": "user", "content": prompt}], purpose="interview_feedback")
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
     except Exception as e:
         return f"Mock interview AI failed ({e}). Try again later."
 
 # ======================================================
-# AI: Generate Projects (GPT-4o)
+# AI: Interview Questions (GPT-4o)
 # ======================================================
 
 
-def generate_projects(role: str):
+async def generate_interview_questions(role):
     """
-    Generates 3 advanced, structured project ideas in JSON format 
-    tailored to the user's selected role.
-    Each project includes:
-      - title
-      - description
-      - tech_stack
-      - difficulty
+    Generates 5 structured, role-based interview questions.
+    Depends only on the role, so responses are served from the response cache.
     """
     prompt = f"""
+    You are an expert technical interviewer for the role of {role}.
+    Generate exactly 5 unique, challenging, and realistic interview questions.
+    Return ONLY a valid JSON array in the following format:
+    [
+        {{ "id": 1, "question": "Explain the concept of microservices and their benefits." }},
+        {{ "id": 2, "question": "How do you ensure scalability in a large web application?" }}
+    ]
+    Do NOT include any text, explanation, or markdown before or after the JSON.
+    """
+
+    try:
+        return await structured_completion(
+            [{"role": "user", "content": prompt}],
+            INTERVIEW_QUESTIONS,
+            temperature=0.7,
+            cache_policy="interview_questions"
+        )
+
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
+    except Exception as e:
+        print("⚠️ Error parsing GPT response:", e)
+        # Fallback questions
+        return [
+            {"id": 1, "question": "Tell me about yourself."},
+            {"id": 2, "question": "What are your strengths and weaknesses?"},
+            {"id": 3, "question": "Describe a project you’re proud of."},
+            {"id": 4, "question": "How do you handle challenging deadlines?"},
+            {"id": 5, "question": "Why should we hire you for this position?"},
+        ]
+
+# ======================================================
+# AI: Interview Evaluation (GPT-4o)
+# ======================================================
+
+
+def evaluation_prompt(role, qa_data):
+    return f"""
+    You are a senior interviewer evaluating a {role} candidate.
+    Evaluate the following answers and return ONLY valid JSON:
+    {{
+        "score": 0-100,
+        "feedback": {{
+            "strengths": ["..."],
+            "weaknesses": ["..."],
+            "suggestions": "..."
+        }}
+    }}
+    Q&A: {json.dumps(qa_data, indent=2)}
+    """
+
+
+def fallback_evaluation():
+    return {
+        "score": 78,
+        "feedback": {
+            "strengths": ["Good clarity", "Relevant answers"],
+            "weaknesses": ["Needs deeper technical explanations"],
+            "suggestions": "Give more practical examples next time."
+        }
+    }
+
+
+def evaluation_messages(role, qa_data):
+    return [{"role": "user", "content": evaluation_prompt(role, qa_data)}]
+
+
+async def evaluate_interview_answers(role, qa_data):
+    """
+    Scores a completed mock interview: {"score", "feedback": {strengths,
+    weaknesses, suggestions}}. Falls back to a generic evaluation on failure.
+    """
+    try:
+        return await structured_completion(evaluation_messages(role, qa_data), EVALUATION)
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
+    except Exception as e:
+        print("⚠️ GPT evaluation error:", e)
+        return fallback_evaluation()
+
+
+MAX_EVAL_QUESTION_CHARS = 500
+MAX_EVAL_ANSWER_CHARS = 2000
+
+
+def question_evaluation_prompt(role, question, answer):
+    """One answer only, both sides truncated: the prompt size does not grow with the interview."""
+    return f"""
+    You are a senior interviewer for the role: {role}.
+    Evaluate this single answer and return ONLY valid JSON:
+    {{"score": 0-100, "strengths": ["..."], "weaknesses": ["..."], "suggestion": "..."}}
+    Question: {(question or "Follow-up")[:MAX_EVAL_QUESTION_CHARS]}
+    Answer: {(answer or "")[:MAX_EVAL_ANSWER_CHARS]}
+    """
+
+
+async def evaluate_answer(role, question, answer):
+    """
+    {"score", "strengths", "weaknesses", "suggestion"} for one answer, or
+    None when it could not be scored (the merge leaves it out).
+    """
+    try:
+        return await structured_completion(
+            [{"role": "user", "content": question_evaluation_prompt(role, question, answer)}],
+            QUESTION_EVALUATION, temperature=0.2)
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
+    except Exception as e:
+        print("⚠️ GPT answer evaluation error:", e)
+        return None
+
+# ======================================================
+# AI: Generate Projects (GPT-4o)
+# ======================================================
+
+
+def projects_prompt(role):
+    return f"""
     You are an expert mentor for the role of {role}.
     Suggest 3 advanced, resume-worthy project ideas suitable for professionals aiming to master this role.
 
@@ -127,81 +407,92 @@ def generate_projects(role: str):
     Do not include any additional text or explanation outside the JSON.
     """
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        import json
-        raw_output = response.choices[0].message.content.strip()
 
-        # Try parsing JSON safely
-        try:
-            projects_json = json.loads(raw_output)
-        except json.JSONDecodeError:
-            # If GPT returns slightly malformed JSON, fix it gracefully
-            import re
-            cleaned = re.sub(r"```json|```", "", raw_output).strip()
-            projects_json = json.loads(cleaned)
+async def generate_projects(role: str, fallback=True):
+    """
+    Generates 3 advanced, structured project ideas in JSON format 
+    tailored to the user's selected role.
+    Each project includes:
+      - title
+      - description
+      - tech_stack
+      - difficulty
+    With fallback=False a failure raises instead of returning the static ideas.
+    """
+    prompt = projects_prompt(role)
 
-        return projects_json
+    try:
+        return await structured_completion(
+            [{"role": "user", "content": prompt}],
+            PROJECTS,
+            temperature=0.7,
+            cache_policy="projects"
+        )
 
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
     except Exception as e:
+        if not fallback:
+            raise
         print(f"[⚠️ Fallback Project Generation Triggered]: {e}")
+        return fallback_projects(role)
 
-        # Fallback sample structured data
-        fallback_projects = {
-            "Data Scientist": [
-                {
-                    "title": "ML Pipeline for Customer Churn Prediction",
-                    "description": "Develop a machine learning pipeline using Python and scikit-learn to predict customer churn from real-world telecom datasets.",
-                    "tech_stack": ["Python", "scikit-learn", "Pandas", "Flask", "Docker"],
-                    "difficulty": "Intermediate"
-                },
-                {
-                    "title": "Sentiment Analysis Dashboard",
-                    "description": "Create a live dashboard that visualizes sentiment analysis of Twitter data using NLP and Plotly Dash.",
-                    "tech_stack": ["Python", "NLTK", "Plotly", "Dash", "API Integration"],
-                    "difficulty": "Advanced"
-                },
-                {
-                    "title": "AI-Powered Fraud Detection System",
-                    "description": "Build a fraud detection model using anomaly detection algorithms and deploy it as a real-time API service.",
-                    "tech_stack": ["Python", "TensorFlow", "FastAPI", "MongoDB"],
-                    "difficulty": "Advanced"
-                }
-            ],
-            "Full Stack Developer": [
-                {
-                    "title": "MERN Stack Project Management Tool",
-                    "description": "Develop a task tracking and collaboration app with authentication, Kanban boards, and analytics.",
-                    "tech_stack": ["MongoDB", "Express.js", "React", "Node.js", "JWT"],
-                    "difficulty": "Advanced"
-                },
-                {
-                    "title": "AI Resume Builder Platform",
-                    "description": "Create a resume builder powered by GPT suggestions, with PDF export and user authentication.",
-                    "tech_stack": ["React", "Flask", "OpenAI API", "MongoDB"],
-                    "difficulty": "Intermediate"
-                },
-                {
-                    "title": "E-Commerce Platform with ML Recommendations",
-                    "description": "Design a complete e-commerce platform with personalized product recommendations and Stripe payments.",
-                    "tech_stack": ["Next.js", "Node.js", "MongoDB", "Machine Learning"],
-                    "difficulty": "Advanced"
-                }
-            ]
-        }
 
-        return fallback_projects.get(role, [
+def fallback_projects(role: str):
+    """
+    Static project ideas used whenever GPT is unavailable or too slow.
+    """
+    samples = {
+        "Data Scientist": [
+            {
+                "title": "ML Pipeline for Customer Churn Prediction",
+                "description": "Develop a machine learning pipeline using Python and scikit-learn to predict customer churn from real-world telecom datasets.",
+                "tech_stack": ["Python", "scikit-learn", "Pandas", "Flask", "Docker"],
+                "difficulty": "Intermediate"
+            },
+            {
+                "title": "Sentiment Analysis Dashboard",
+                "description": "Create a live dashboard that visualizes sentiment analysis of Twitter data using NLP and Plotly Dash.",
+                "tech_stack": ["Python", "NLTK", "Plotly", "Dash", "API Integration"],
+                "difficulty": "Advanced"
+            },
             {
-                "title": "AI Innovation Hub",
-                "description": "Create a web-based AI experimentation platform for deploying and testing AI models.",
-                "tech_stack": ["Python", "FastAPI", "React", "TensorFlow"],
+                "title": "AI-Powered Fraud Detection System",
+                "description": "Build a fraud detection model using anomaly detection algorithms and deploy it as a real-time API service.",
+                "tech_stack": ["Python", "TensorFlow", "FastAPI", "MongoDB"],
                 "difficulty": "Advanced"
             }
-        ])
+        ],
+        "Full Stack Developer": [
+            {
+                "title": "MERN Stack Project Management Tool",
+                "description": "Develop a task tracking and collaboration app with authentication, Kanban boards, and analytics.",
+                "tech_stack": ["MongoDB", "Express.js", "React", "Node.js", "JWT"],
+                "difficulty": "Advanced"
+            },
+            {
+                "title": "AI Resume Builder Platform",
+                "description": "Create a resume builder powered by GPT suggestions, with PDF export and user authentication.",
+                "tech_stack": ["React", "Flask", "OpenAI API", "MongoDB"],
+                "difficulty": "Intermediate"
+            },
+            {
+                "title": "E-Commerce Platform with ML Recommendations",
+                "description": "Design a complete e-commerce platform with personalized product recommendations and Stripe payments.",
+                "tech_stack": ["Next.js", "Node.js", "MongoDB", "Machine Learning"],
+                "difficulty": "Advanced"
+            }
+        ]
+    }
+
+    return samples.get(role, [
+        {
+            "title": "AI Innovation Hub",
+            "description": "Create a web-based AI experimentation platform for deploying and testing AI models.",
+            "tech_stack": ["Python", "FastAPI", "React", "TensorFlow"],
+            "difficulty": "Advanced"
+        }
+    ])
 
 
 # ======================================================
@@ -209,27 +500,16 @@ def generate_projects(role: str):
 # ======================================================
 
 
-def suggest_roles_from_skills(text):
-    """Suggest trending tech roles based on keywords extracted from resume text."""
-    skills = extract_skills(text)
-    role_map = {
-        "Data Scientist": ["Python", "Pandas", "Machine Learning", "Deep Learning", "SQL", "Power BI"],
-        "AI Engineer": ["Python", "TensorFlow", "PyTorch", "NLP", "Deep Learning", "AI"],
-        "Frontend Developer": ["JavaScript", "React", "HTML", "CSS"],
-        "Backend Developer": ["Node.js", "Express", "Flask", "Django", "FastAPI", "SQL", "MongoDB"],
-        "DevOps Engineer": ["Docker", "Kubernetes", "AWS", "Git", "CI", "Cloud"],
-        "Cybersecurity Analyst": ["Network", "Security", "Firewall", "Cybersecurity", "Encryption"],
-        "Full Stack Developer": ["React", "Node.js", "Flask", "MongoDB", "HTML", "CSS"],
-        "Data Analyst": ["Excel", "Power BI", "Python", "SQL", "Data Analysis"]
-    }
-
-    role_scores = {}
-    for role, required in role_map.items():
-        overlap = len(set(required) & set(skills))
-        if overlap > 0:
-            role_scores[role] = overlap
+def suggest_roles_from_skills(skills):
+    """
+    Suggest up to 5 tech roles from extracted skills, best match first.
+    Also accepts raw resume text, which is run through extract_skills first.
+    """
+    if isinstance(skills, str):
+        skills = extract_skills(skills)
 
-    suggested_roles = [r for r, _ in Counter(role_scores).most_common(5)]
+    # Weighted coverage against every role in data/roles.json (one sparse product)
+    suggested_roles = [m["role"] for m in role_engine.rank(skills, k=5)]
     if not suggested_roles:
         suggested_roles = ["AI Engineer",
                            "Data Scientist", "Full Stack Developer"]
@@ -241,27 +521,12 @@ def suggest_roles_from_skills(text):
 # ======================================================
 
 
-def generate_roadmap(skills, target_role):
-    """
-    Uses GPT to generate a *detailed, structured, and multi-phase learning roadmap*
-    based on the user's current skills and target career role.
-    """
-
-    from openai import OpenAI
-    import os
-    import json
-    import random
-    from dotenv import load_dotenv
-
-    load_dotenv()
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    # 🔍 Construct a richer and more directive prompt
-    prompt = f"""
+def roadmap_prompt(skills, target_role):
+    return f"""
     You are an expert AI career coach.
 
     The user has these current skills:
-    {skills}
+    {sorted(skills)}
 
     The user wants to become a **{target_role}**.
 
@@ -295,96 +560,176 @@ def generate_roadmap(skills, target_role):
     }}
     """
 
+
+def roadmap_messages(skills, target_role):
+    return [
+        {"role": "system",
+            "content": "You are a precise and structured AI roadmap generator."},
+        {"role": "user", "content": roadmap_prompt(skills, target_role)}
+    ]
+
+
+async def generate_roadmap(skills, target_role, fallback=True):
+    """
+    Uses GPT to generate a *detailed, structured, and multi-phase learning roadmap*
+    based on the user's current skills and target career role.
+    With fallback=False a failure raises instead of returning the static roadmap.
+    """
+
+    # 🔍 Construct a richer and more directive prompt
+    messages = roadmap_messages(skills, target_role)
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system",
-                    "content": "You are a precise and structured AI roadmap generator."},
-                {"role": "user", "content": prompt}
-            ],
+        # ✅ Schema-validated (repaired or retried once if GPT's JSON is off)
+        roadmap = await structured_completion(
+            messages,
+            ROADMAP,
             temperature=0.75,
+            cache_policy="roadmap"
         )
+        return {**roadmap, "target_role": roadmap["target_role"] or target_role}
+
+    except LLMSaturated:
+        raise  # → 503 + Retry-After, not a fallback
+    except Exception as e:
+        if not fallback:
+            raise
+        print("❌ GPT Roadmap Generation Failed:", e)
 
-        ai_text = response.choices[0].message.content.strip()
+        # 🔁 Static fallback
+        return fallback_roadmap(target_role)
 
-        # ✅ Parse GPT output safely
-        try:
-            roadmap_json = json.loads(ai_text)
-        except json.JSONDecodeError:
-            print("⚠️ GPT returned non-JSON text, fallback applied.")
-            roadmap_json = {
-                "target_role": target_role,
-                "timeline_weeks": random.randint(12, 24),
-                "roadmap": [
-                    {
-                        "phase": "Phase 1: Foundations",
-                        "objective": "Learn core concepts and tools for the role.",
-                        "focus": ["Core Programming", "Version Control", "Linux Basics"],
-                        "projects": ["CLI-based utility project"],
-                        "duration_weeks": 3
-                    },
-                    {
-                        "phase": "Phase 2: Intermediate Practice",
-                        "objective": "Work on key role-specific tools and frameworks.",
-                        "focus": ["Cloud Basics", "Automation", "APIs"],
-                        "projects": ["Deploy a small app on AWS"],
-                        "duration_weeks": 4
-                    },
-                    {
-                        "phase": "Phase 3: Advanced Topics",
-                        "objective": "Focus on scalability and performance.",
-                        "focus": ["CI/CD", "Monitoring", "Kubernetes"],
-                        "projects": ["Implement a CI/CD pipeline"],
-                        "duration_weeks": 5
-                    },
-                    {
-                        "phase": "Phase 4: Capstone Project",
-                        "objective": "Integrate all skills into a final project.",
-                        "focus": ["Integration", "Testing", "Documentation"],
-                        "projects": ["Full deployment automation project"],
-                        "duration_weeks": 4
-                    }
-                ]
-            }
 
-        return roadmap_json
+MAX_PHASE_PROMPT_SKILLS = 30
+
 
+def phase_update_prompt(role, phase, skills, covered, missing):
+    """One phase plus the skill change only: a fraction of the full roadmap prompt."""
+    return f"""
+    You are an expert AI career coach updating ONE phase of a {role} learning roadmap.
+    The learner now has: {covered or "nothing new"}; no longer shows: {missing or "nothing"}.
+    Their current skills: {sorted(skills)[:MAX_PHASE_PROMPT_SKILLS]}
+    Current phase: {json.dumps(phase, ensure_ascii=False)}
+    Rewrite this phase for them: drop topics they already cover, add what they now lack,
+    keep its number and place in the roadmap. Return ONLY valid JSON:
+    {{"phase": "Phase N: <title>", "objective": "...", "focus": ["..."], "projects": ["..."], "duration_weeks": <int>}}
+    """
+
+
+async def regenerate_phase(role, phase, skills, covered, missing):
+    """The updated phase, or None if GPT failed (the caller keeps the old one)."""
+    try:
+        return await structured_completion(
+            [{"role": "user", "content": phase_update_prompt(role, phase, skills, covered, missing)}],
+            ROADMAP_PHASE, temperature=0.5)
+    except LLMSaturated:
+        raise
     except Exception as e:
-        print("❌ GPT Roadmap Generation Failed:", e)
+        print("⚠️ GPT roadmap phase update failed:", e)
+        return None
 
-        # 🔁 Static fallback
-        return {
-            "target_role": target_role,
-            "timeline_weeks": random.randint(10, 20),
-            "roadmap": [
-                {
-                    "phase": "Phase 1: Strengthen Fundamentals",
-                    "objective": "Revisit key foundational skills.",
-                    "focus": ["Python", "Git", "Networking Basics"],
-                    "projects": ["Build CLI monitoring tool"],
-                    "duration_weeks": 3
-                },
-                {
-                    "phase": "Phase 2: Intermediate Concepts",
-                    "objective": "Develop core technical and practical experience.",
-                    "focus": ["Docker", "CI/CD", "APIs"],
-                    "projects": ["Automate app deployment with Docker"],
-                    "duration_weeks": 4
-                },
-                {
-                    "phase": "Phase 3: Advanced Topics",
-                    "objective": "Dive deep into cloud and scaling.",
-                    "focus": ["AWS", "Kubernetes", "Security"],
-                    "projects": ["Kubernetes deployment pipeline"],
-                    "duration_weeks": 4
-                },
-                {
-                    "phase": "Phase 4: Capstone Project",
-                    "objective": "Combine all knowledge into a major final project.",
-                    "focus": ["Integration", "Optimization"],
-                    "projects": ["Full DevOps system automation"],
-                    "duration_weeks": 3
-                }
-            ]
-        }
+
+def fallback_roadmap(target_role):
+    """
+    Static roadmap used whenever GPT is unavailable or too slow.
+    """
+    return {
+        "target_role": target_role,
+        "timeline_weeks": 14,      # sum of the phases below
+        "roadmap": [
+            {
+                "phase": "Phase 1: Strengthen Fundamentals",
+                "objective": "Revisit key foundational skills.",
+                "focus": ["Python", "Git", "Networking Basics"],
+                "projects": ["Build CLI monitoring tool"],
+                "duration_weeks": 3
+            },
+            {
+                "phase": "Phase 2: Intermediate Concepts",
+                "objective": "Develop core technical and practical experience.",
+                "focus": ["Docker", "CI/CD", "APIs"],
+                "projects": ["Automate app deployment with Docker"],
+                "duration_weeks": 4
+            },
+            {
+                "phase": "Phase 3: Advanced Topics",
+                "objective": "Dive deep into cloud and scaling.",
+                "focus": ["AWS", "Kubernetes", "Security"],
+                "projects": ["Kubernetes deployment pipeline"],
+                "duration_weeks": 4
+            },
+            {
+                "phase": "Phase 4: Capstone Project",
+                "objective": "Combine all knowledge into a major final project.",
+                "focus": ["Integration", "Optimization"],
+                "projects": ["Full DevOps system automation"],
+                "duration_weeks": 3
+            }
+        ]
+    }
+
+
+# ======================================================
+# Logic: Roadmap + Projects (concurrent, shared deadline)
+# ======================================================
+
+SELECT_ROLE_DEADLINE = float(os.getenv("SELECT_ROLE_DEADLINE", "20"))
+
+
+def normalize_projects(projects):
+    """
+    Coerces whatever generate_projects returned (list, dict or raw string)
+    into a list of {title, description, tech_stack, difficulty} dicts.
+    """
+    if isinstance(projects, str):
+        try:
+            return PROJECTS.parse(projects)
+        except SchemaError:
+            projects = [projects]
+    elif not isinstance(projects, list):
+        projects = [projects]
+
+    formatted_projects = []
+    for p in projects:
+        if isinstance(p, str):
+            p = {"title": p}
+        try:
+            formatted_projects.append(Project.model_validate(p).model_dump())
+        except ValidationError:
+            continue
+    return formatted_projects
+
+
+async def generate_role_plan(skills, target_role, deadline=None, known=None):
+    """
+    Runs generate_roadmap and generate_projects concurrently under one shared
+    deadline (SELECT_ROLE_DEADLINE seconds by default). Parts already in
+    `known` ({"roadmap" | "projects": value}, e.g. from the plan catalog)
+    are used as-is and not generated.
+
+    Returns (roadmap, projects, pending). A generation that misses the deadline
+    is replaced by its static fallback and left running in `pending`
+    ({"roadmap" | "projects": task}) so the caller can persist it later.
+    """
+    deadline = SELECT_ROLE_DEADLINE if deadline is None else deadline
+    known = known or {}
+    tasks = {}
+    if "roadmap" not in known:
+        tasks["roadmap"] = asyncio.create_task(generate_roadmap(skills, target_role))
+    if "projects" not in known:
+        tasks["projects"] = asyncio.create_task(generate_projects(target_role))
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+    pending = {name: task for name, task in tasks.items() if not task.done()}
+    if pending:
+        print(f"⏱️ {', '.join(pending)} missed the {deadline}s deadline for {target_role}")
+
+    def result(name, fallback):
+        if name in known:
+            return known[name]
+        return fallback(target_role) if name in pending else tasks[name].result()
+
+    roadmap = result("roadmap", fallback_roadmap)
+    projects = result("projects", fallback_projects)
+    return roadmap, normalize_projects(projects), pending
@@ -0,0 +1,236 @@
+import asyncio
+from services import ai_engine
+from services.json_stream import JsonArrayStream
+from services.llm_gateway import gateway
+from services.llm_scheduler import LLMSaturated
+from services.llm_cache import LLM_CACHE_ENABLED, POLICIES, cache_key, response_cache
+from services.structured_output import EVALUATION, PROJECTS, ROADMAP
+
+# ======================================================
+# Streaming Completions (token deltas)
+# ======================================================
+
+
+async def stream_completion(messages, temperature=None, response_format=None, purpose="chat"):
+    """Yields text deltas straight from the OpenAI stream."""
+    kwargs = {"model": ai_engine.MODEL, "messages": messages}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+
+    async for chunk in gateway.stream(purpose=purpose, **kwargs):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def stream_cached(messages, temperature=None, cache_policy=None, validate=None,
+                        response_format=None, purpose="chat"):
+    """
+    Like stream_completion, but a response-cache hit is yielded as one chunk and
+    a fresh completion is added to the cache once it validates.
+    """
+    use_cache = cache_policy and LLM_CACHE_ENABLED
+    if use_cache:
+        policy = POLICIES[cache_policy]
+        key = cache_key(messages, ai_engine.MODEL, temperature)
+        cached = await response_cache.lookup(key, policy)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    async for delta in stream_completion(messages, temperature, response_format, purpose):
+        parts.append(delta)
+        yield delta
+
+    if use_cache:
+        await response_cache.store(key, policy, "".join(parts), validate)
+
+# ======================================================
+# Streaming JSON Generators (one event per parsed element)
+# ======================================================
+#
+# When a part fails or times out after some of its elements were sent, a
+# ("reset", {"part", "detail"}) event comes before the fallback, so the
+# client drops those elements instead of mixing them with static ones.
+
+
+def _reset(part, detail):
+    return "reset", {"part": part, "detail": detail}
+
+
+async def stream_roadmap(skills, target_role):
+    """
+    Yields ("phase", phase) as each roadmap phase becomes parseable, then
+    ("roadmap", full_roadmap). Falls back to the static roadmap on failure,
+    except when the LLM is saturated (the caller reports that).
+    """
+    messages = ai_engine.roadmap_messages(skills, target_role)
+    parser = JsonArrayStream("roadmap")
+    sent = 0
+    try:
+        async for delta in stream_cached(
+            messages, temperature=0.75, cache_policy="roadmap", validate=ROADMAP.parse,
+            response_format=ai_engine.response_format_for(ROADMAP), purpose="roadmap"
+        ):
+            for phase in parser.feed(delta):
+                sent += 1
+                yield "phase", phase
+        roadmap = await ai_engine.resolve_structured(ROADMAP, messages, parser.text())
+        roadmap["target_role"] = roadmap["target_role"] or target_role
+    except LLMSaturated:
+        raise
+    except Exception as e:
+        print("❌ Streaming roadmap failed:", e)
+        if sent:
+            yield _reset("roadmap", "Roadmap generation failed; using the default roadmap")
+        roadmap = ai_engine.fallback_roadmap(target_role)
+    yield "roadmap", roadmap
+
+
+async def stream_projects(role):
+    """
+    Yields ("project", project) per completed project, then ("projects",
+    normalized_list). Falls back to the static project ideas on failure,
+    except when the LLM is saturated (the caller reports that).
+    """
+    messages = [{"role": "user", "content": ai_engine.projects_prompt(role)}]
+    parser = JsonArrayStream("projects")
+    sent = 0
+    try:
+        async for delta in stream_cached(
+            messages, temperature=0.7, cache_policy="projects", validate=PROJECTS.parse,
+            response_format=ai_engine.response_format_for(PROJECTS), purpose="projects"
+        ):
+            for project in ai_engine.normalize_projects(parser.feed(delta)):
+                sent += 1
+                yield "project", project
+        projects = await ai_engine.resolve_structured(PROJECTS, messages, parser.text())
+    except LLMSaturated:
+        raise
+    except Exception as e:
+        print(f"[⚠️ Streaming Project Generation Failed]: {e}")
+        if sent:
+            yield _reset("projects", "Project generation failed; using the default project ideas")
+        projects = ai_engine.fallback_projects(role)
+    yield "projects", ai_engine.normalize_projects(projects)
+
+
+async def _replay_roadmap(roadmap):
+    for phase in roadmap["roadmap"]:
+        yield "phase", phase
+    yield "roadmap", roadmap
+
+
+async def _replay_projects(projects):
+    for project in projects:
+        yield "project", project
+    yield "projects", projects
+
+
+async def stream_role_plan(skills, target_role, deadline=None, known=None):
+    """
+    Interleaves stream_roadmap and stream_projects events as they arrive, under
+    the same shared deadline as generate_role_plan. A generator still running at
+    the deadline is cancelled and its static fallback is sent instead (after
+    a `reset` if it had sent elements). Parts in `known` are replayed as the
+    same events without calling GPT. LLMSaturated from either part is raised.
+    """
+    deadline = ai_engine.SELECT_ROLE_DEADLINE if deadline is None else deadline
+    known = known or {}
+    queue = asyncio.Queue()
+
+    async def pump(name, events):
+        try:
+            async for event in events:
+                await queue.put(event)
+        except LLMSaturated as e:
+            await queue.put((LLMSaturated, e))
+        finally:
+            await queue.put((None, name))
+
+    roadmap_events = _replay_roadmap(known["roadmap"]) if "roadmap" in known \
+        else stream_roadmap(skills, target_role)
+    project_events = _replay_projects(known["projects"]) if "projects" in known \
+        else stream_projects(target_role)
+    producers = {
+        "roadmap": asyncio.create_task(pump("roadmap", roadmap_events)),
+        "projects": asyncio.create_task(pump("projects", project_events)),
+    }
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline
+    finished, streamed = set(), set()
+    try:
+        while len(finished) < len(producers):
+            remaining = ends_at - loop.time()
+            try:
+                kind, payload = await asyncio.wait_for(queue.get(), max(remaining, 0))
+            except asyncio.TimeoutError:
+                break
+            if kind is None:
+                finished.add(payload)
+            elif kind is LLMSaturated:
+                raise payload
+            else:
+                if kind in ("phase", "project"):
+                    streamed.add("roadmap" if kind == "phase" else "projects")
+                yield kind, payload
+    finally:
+        for name, task in producers.items():
+            if name not in finished:
+                task.cancel()
+
+    if "roadmap" not in finished:
+        if "roadmap" in streamed:
+            yield _reset("roadmap", "Roadmap generation timed out; using the default roadmap")
+        yield "roadmap", ai_engine.fallback_roadmap(target_role)
+    if "projects" not in finished:
+        if "projects" in streamed:
+            yield _reset("projects", "Project generation timed out; using the default project ideas")
+        yield "projects", ai_engine.normalize_projects(ai_engine.fallback_projects(target_role))
+
+
+async def stream_text(prompt, fallback, response_format=None, purpose="chat"):
+    """
+    Yields ("token", delta) for a free-text completion, then ("text", full_text).
+    On failure the fallback message is sent as ("fallback", text) instead.
+    """
+    parts = []
+    try:
+        async for delta in stream_completion(
+            [{"role": "user", "content": prompt}], response_format=response_format, purpose=purpose
+        ):
+            parts.append(delta)
+            yield "token", delta
+        yield "text", "".join(parts)
+    except LLMSaturated:
+        raise
+    except Exception as e:
+        print("⚠️ Streaming completion failed:", e)
+        yield "fallback", fallback(e)
+
+
+async def stream_evaluation(role, qa_data):
+    """
+    Yields ("token", delta) for the raw evaluation JSON, then ("evaluation",
+    result) validated against the Evaluation schema (one correction call if
+    needed, the generic evaluation if that fails too).
+    """
+    raw = ""
+    async for kind, payload in stream_text(
+        ai_engine.evaluation_prompt(role, qa_data), lambda e: "",
+        response_format=ai_engine.response_format_for(EVALUATION), purpose="evaluation"
+    ):
+        if kind == "token":
+            yield kind, payload
+        else:
+            raw = payload
+
+    try:
+        result = await ai_engine.resolve_structured(
+            EVALUATION, ai_engine.evaluation_messages(role, qa_data), raw)
+    except Exception as e:
+        print("⚠️ GPT evaluation error:", e)
+        result = ai_engine.fallback_evaluation()
+    yield "evaluation", result
@@ -1,8 +1,10 @@
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 from jose import jwt, JWTError
 import os
 import datetime
 from dotenv import load_dotenv
+from services.telemetry import span
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +34,23 @@ def verify_password(plain: str, hashed: str):
     return pwd_context.verify(plain, hashed)
 
 
+async def hash_password_async(password: str):
+    """
+    Hash a password on the bounded worker thread pool.
+    bcrypt is deliberately slow (~100-300 ms) and must not run on the event loop.
+    """
+    with span("bcrypt"):
+        return await run_in_threadpool(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str):
+    """
+    Verify a password on the bounded worker thread pool.
+    """
+    with span("bcrypt"):
+        return await run_in_threadpool(verify_password, plain, hashed)
+
+
 def create_token(email: str):
     """
     Generate a JWT token for a given email with 3-hour expiry.
@@ -46,11 +65,12 @@ def verify_token(token: str):
     Verify and decode JWT token; returns user email if valid.
     Raises ValueError if invalid or expired.
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if not email:
-            raise ValueError("Invalid token payload")
-        return email
-    except JWTError as e:
-        raise ValueError(f"Invalid or expired token: {e}")
+    with span("auth"):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email = payload.get("sub")
+            if not email:
+                raise ValueError("Invalid token payload")
+            return email
+        except JWTError as e:
+            raise ValueError(f"Invalid or expired token: {e}")
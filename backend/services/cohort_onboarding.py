@@ -0,0 +1,350 @@
+import asyncio
+import codecs
+import csv
+import datetime
+import hashlib
+import os
+import posixpath
+import secrets
+import zipfile
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+from services import resume_dedupe
+from services.ai_engine import analyze_resume, extract_skills, suggest_roles_from_skills
+from services.auth import hash_password
+from services.db import cohort_imports_col, resumes_col, users_col
+from services.llm_gateway import llm_budget
+from services.llm_scheduler import LLMSaturated, llm_priority
+from services.resume_parser import MAX_UPLOAD_BYTES, PARSER_PROCESSES, extract_text_async
+from services.resume_sections import compact_resume, saved_sections, segment_resume
+from services.resume_pipeline import RESUME_LLM_BUDGET
+
+# ======================================================
+# Cohort Onboarding: CSV roster + ZIP of resumes → users
+# ======================================================
+
+ONBOARDING_BATCH_SIZE = int(os.getenv("ONBOARDING_BATCH_SIZE", "200"))
+ONBOARDING_LLM_CONCURRENCY = int(os.getenv("ONBOARDING_LLM_CONCURRENCY", "8"))
+ONBOARDING_MAX_ROWS = int(os.getenv("ONBOARDING_MAX_ROWS", "5000"))
+ONBOARDING_LLM_WAIT = 300      # seconds a row keeps retrying while the LLM is saturated
+PARSE_CONCURRENCY = max(1, PARSER_PROCESSES) * 2
+HASH_CONCURRENCY = 8           # bcrypt threads; the thread pool serves requests too
+REQUIRED_COLUMNS = ("name", "email")
+
+
+class RosterError(ValueError):
+    """The roster or archive cannot be imported at all."""
+
+
+def temporary_password():
+    return secrets.token_urlsafe(9)
+
+
+def import_key(cohort, roster_bytes):
+    """Same cohort + same roster → same import, so a rerun resumes it."""
+    return hashlib.sha256(cohort.encode("utf-8") + b"\x00" + roster_bytes).hexdigest()[:16]
+
+
+def read_roster(roster_bytes):
+    """
+    Rows of the CSV roster as dicts with lower-cased headers. Needs `name`
+    and `email`; `resume` (file name inside the ZIP) and `password` are
+    optional.
+    """
+    text = codecs.decode(roster_bytes, "utf-8-sig", errors="replace")
+    reader = csv.DictReader(text.splitlines())
+    headers = [h.strip().lower() for h in reader.fieldnames or []]
+    missing = [c for c in REQUIRED_COLUMNS if c not in headers]
+    if missing:
+        raise RosterError(f"Roster is missing column(s): {', '.join(missing)}")
+
+    rows = []
+    for row in reader:
+        rows.append({h: (v or "").strip() for h, v in zip(headers, row.values()) if h})
+        if len(rows) > ONBOARDING_MAX_ROWS:
+            raise RosterError(f"Roster has more than {ONBOARDING_MAX_ROWS} rows")
+    return rows
+
+
+class ResumeArchive:
+    """
+    A ZIP of resumes read one member at a time (the archive itself can stay
+    spooled on disk). Members are matched by file name, case-insensitively
+    and ignoring folders.
+    """
+
+    def __init__(self, fileobj):
+        try:
+            self._zip = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile:
+            raise RosterError("Resumes must be uploaded as a ZIP archive")
+        self._members = {}
+        for info in self._zip.infolist():
+            if not info.is_dir():
+                self._members.setdefault(posixpath.basename(info.filename).lower(), info)
+
+    def find(self, name):
+        return self._members.get(posixpath.basename(name.replace("\\", "/")).lower())
+
+    def _read(self, info):
+        if info.file_size > MAX_UPLOAD_BYTES:
+            raise ValueError(f"{info.filename} exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+        return self._zip.read(info)
+
+    async def read(self, info):
+        return await run_in_threadpool(self._read, info)
+
+
+class CohortImport:
+    """
+    One run over a roster. Rows are processed in batches of
+    ONBOARDING_BATCH_SIZE: everything per row (read, parse in the process
+    pool, analysis, bcrypt) runs concurrently, then the batch's users go in
+    with one insert_many and their resume records with one bulk_write.
+
+    Resumable: users carry the import id, so rerunning the same import skips
+    rows that were written and retries only the rest. Generated passwords are
+    only ever emitted, so a rerun issues new ones to the imported users that
+    have not logged in yet (`password_is_temporary`, cleared by /login): a
+    rerun recovers credentials lost with a dropped stream. Identical resumes are
+    analyzed once (bytes or text already known, or repeated in the batch), and
+    GPT calls are capped at ONBOARDING_LLM_CONCURRENCY at planning priority.
+    """
+
+    def __init__(self, cohort, import_id, archive, emit):
+        self.cohort = cohort
+        self.import_id = import_id
+        self.archive = archive
+        self.emit = emit
+        self.counts = {}
+        self._llm = asyncio.Semaphore(ONBOARDING_LLM_CONCURRENCY)
+        self._parse = asyncio.Semaphore(PARSE_CONCURRENCY)
+        self._hash = asyncio.Semaphore(HASH_CONCURRENCY)
+        self._analyses = {}      # text hash → task, shared by identical resumes in this run
+
+    # ---------------- Per row ----------------
+
+    async def _analyze(self, text, normalized, sections):
+        record = await resume_dedupe.find_by_text(normalized)
+        if record:
+            return {**record["analysis"], "deduplicated": True}, "reused"
+        skills = extract_skills(text)
+        waited = 0
+        while True:
+            try:
+                async with self._llm:
+                    with llm_budget(RESUME_LLM_BUDGET), llm_priority("planning"):
+                        return await analyze_resume(text, "general", skills=skills, sections=sections), "gpt"
+            except LLMSaturated as e:
+                # Bulk work yields to interactive traffic instead of failing
+                if waited >= ONBOARDING_LLM_WAIT:
+                    raise
+                waited += e.retry_after
+                await asyncio.sleep(e.retry_after)
+
+    async def _resume_fields(self, email, info):
+        """(user fields, resume record op or None, analysis source)."""
+        content = await self.archive.read(info)
+        record = await resume_dedupe.find_by_bytes(content, email)
+        if record:
+            ai_output = {**record["analysis"], "deduplicated": True}
+            resume_text, sections = record["resume_text"], record.get("sections")
+            op, source = None, "reused"
+        else:
+            async with self._parse:
+                text = await extract_text_async(content, info.filename)
+            normalized = resume_dedupe.normalize_text(text)
+            sections = segment_resume(text)
+            key = resume_dedupe.text_hash(normalized)
+            shared = key in self._analyses
+            if not shared:
+                self._analyses[key] = asyncio.ensure_future(self._analyze(text, normalized, sections))
+            ai_output, source = await asyncio.shield(self._analyses[key])
+            if shared:
+                ai_output, source = {**ai_output, "deduplicated": True}, "batch_duplicate"
+            stored = {k: v for k, v in ai_output.items() if k not in ("deduplicated", "incremental", "similarity")}
+            resume_text, sections = compact_resume(sections), saved_sections(sections)
+            op = None if ai_output.get("fallback") else resume_dedupe.analysis_upsert(
+                email, content, normalized, resume_dedupe.minhash(normalized), resume_text, stored, sections)
+
+        fields = {
+            "resume_text": resume_text,
+            "resume_sections": sections,
+            "ai_analysis": ai_output,
+            "suggested_roles": suggest_roles_from_skills(ai_output.get("skills", [])),
+        }
+        return fields, op, source
+
+    async def _prepare(self, row, result):
+        """The user document for one row (and its resume op), or None on failure."""
+        password = row.get("password")
+        if not password:
+            password = result["temporary_password"] = temporary_password()
+        fields, op, result["analysis"] = {"resume_text": "", "ai_analysis": {}, "suggested_roles": []}, None, "none"
+        try:
+            async with self._hash:
+                hashed = await run_in_threadpool(hash_password, password)
+            if row["_member"] is not None:
+                fields, op, result["analysis"] = await self._resume_fields(result["email"], row["_member"])
+        except Exception as e:
+            result.update(status="failed", error=str(e) or type(e).__name__)
+            result.pop("temporary_password", None)
+            return None, None
+
+        user = {
+            "name": row["name"],
+            "email": result["email"],
+            "password": hashed,
+            **fields,
+            "selected_role": None,
+            "roadmap_data": None,
+            "projects": [],
+            "cohort": self.cohort,
+            "import_id": self.import_id,
+            "password_is_temporary": "temporary_password" in result,
+        }
+        result["suggested_roles"] = fields["suggested_roles"]
+        return user, op
+
+    async def _reissue(self, result):
+        """A new temporary password for an imported user who never logged in."""
+        password = temporary_password()
+        try:
+            async with self._hash:
+                hashed = await run_in_threadpool(hash_password, password)
+            updated = await users_col.update_one(
+                {"email": result["email"], "import_id": self.import_id, "password_is_temporary": True},
+                {"$set": {"password": hashed}})
+        except Exception as e:
+            print(f"⚠️ Temporary password for {result['email']} not reissued: {e}")
+            return
+        if updated.modified_count:
+            result["temporary_password"] = password
+
+    # ---------------- Per batch ----------------
+
+    async def _write(self, prepared):
+        users = [(result, user) for result, user, _ in prepared if user is not None]
+        if users:
+            try:
+                await users_col.insert_many([user for _, user in users], ordered=False)
+            except BulkWriteError as e:
+                # Signed up on their own while we were processing the batch
+                for err in e.details["writeErrors"]:
+                    result = users[err["index"]][0]
+                    if err["code"] == 11000:
+                        result.update(status="exists", error="User already exists")
+                    else:
+                        result.update(status="failed", error=err.get("errmsg"))
+                    result.pop("temporary_password", None)
+            for result, _ in users:
+                result.setdefault("status", "created")
+
+        ops = [op for result, user, op in prepared if op is not None and result.get("status") == "created"]
+        if ops:
+            try:
+                # ordered: identical resumes in one batch upsert the same record
+                await resumes_col.bulk_write(ops, ordered=True)
+            except Exception as e:
+                # Users are in; only future dedupe hits are lost
+                print(f"⚠️ Resume records of import {self.import_id} not saved: {e}")
+
+    async def _run_batch(self, batch):
+        emails = [result["email"] for _, result in batch if "status" not in result]
+        existing = {
+            doc["email"]: doc
+            async for doc in users_col.find(
+                {"email": {"$in": emails}}, {"email": 1, "import_id": 1, "password_is_temporary": 1})
+        }
+
+        todo, reissue = [], []
+        for row, result in batch:
+            if "status" in result:
+                continue
+            if result["email"] in existing:
+                user = existing[result["email"]]
+                already = user.get("import_id") == self.import_id
+                result.update(status="already_imported" if already else "exists",
+                              error=None if already else "User already exists")
+                if already and user.get("password_is_temporary") and not row.get("password"):
+                    reissue.append(result)
+            else:
+                todo.append((row, result))
+
+        await asyncio.gather(*(self._reissue(result) for result in reissue))
+        users = await asyncio.gather(*(self._prepare(row, result) for row, result in todo))
+        await self._write([(result, user, op) for (_, result), (user, op) in zip(todo, users)])
+
+        for _, result in batch:
+            self.counts[result["status"]] = self.counts.get(result["status"], 0) + 1
+            await self.emit("row", result)
+        await cohort_imports_col.update_one(
+            {"_id": self.import_id},
+            {"$set": {"counts": self.counts, "updated_at": datetime.datetime.utcnow()},
+             "$push": {"failures": {"$each": [
+                 {k: v for k, v in result.items() if k != "temporary_password"}
+                 for _, result in batch if result["status"] in ("failed", "invalid")]}}}
+        )
+
+    # ---------------- Whole import ----------------
+
+    def _validate(self, rows):
+        """Pair each row with its result; rows that cannot be imported are marked invalid."""
+        seen, batch = set(), []
+        for n, row in enumerate(rows, start=1):
+            email = row.get("email", "").lower()
+            result = {"row": n, "email": email}
+            resume = row.get("resume")
+            row["_member"] = self.archive.find(resume) if resume and self.archive else None
+            if not email or "@" not in email or not row.get("name"):
+                result.update(status="invalid", error="Missing name or email")
+            elif email in seen:
+                result.update(status="invalid", error="Duplicate email in roster")
+            elif resume and row["_member"] is None:
+                result.update(status="invalid", error=f"{resume} not found in the ZIP")
+            seen.add(email)
+            batch.append((row, result))
+        return batch
+
+    async def run(self, rows):
+        await cohort_imports_col.update_one(
+            {"_id": self.import_id},
+            {"$set": {"cohort": self.cohort, "status": "running", "total": len(rows),
+                      "failures": [], "updated_at": datetime.datetime.utcnow()},
+             "$setOnInsert": {"created_at": datetime.datetime.utcnow()},
+             "$inc": {"runs": 1}},
+            upsert=True
+        )
+        validated = self._validate(rows)
+        try:
+            for start in range(0, len(validated), ONBOARDING_BATCH_SIZE):
+                await self._run_batch(validated[start:start + ONBOARDING_BATCH_SIZE])
+                await self.emit("progress", {"processed": min(start + ONBOARDING_BATCH_SIZE, len(rows)),
+                                             "total": len(rows), "counts": self.counts})
+        except BaseException:
+            await cohort_imports_col.update_one(
+                {"_id": self.import_id}, {"$set": {"status": "interrupted"}})
+            raise
+
+        status = "completed" if not self.counts.get("failed") else "completed_with_failures"
+        await cohort_imports_col.update_one(
+            {"_id": self.import_id},
+            {"$set": {"status": status, "finished_at": datetime.datetime.utcnow()}})
+        return {"import_id": self.import_id, "cohort": self.cohort, "status": status,
+                "total": len(rows), "counts": self.counts}
+
+
+async def import_cohort(cohort, roster_bytes, resumes_file, emit, import_id=None):
+    """
+    Onboard a cohort: `roster_bytes` is the CSV, `resumes_file` a file object
+    holding the ZIP (or None). `emit(event, data)` receives a `row` result for
+    every row, `progress` after each batch; the summary is returned.
+    """
+    rows = read_roster(roster_bytes)
+    archive = ResumeArchive(resumes_file) if resumes_file is not None else None
+    job = CohortImport(cohort, import_id or import_key(cohort, roster_bytes), archive, emit)
+    return await job.run(rows)
+
+
+async def get_import(import_id):
+    return await cohort_imports_col.find_one({"_id": import_id})
@@ -1,6 +1,8 @@
-from pymongo import MongoClient
+from gridfs import AsyncGridFSBucket
+from pymongo import AsyncMongoClient
 import os
 from dotenv import load_dotenv
+from services.telemetry import TELEMETRY_ENABLED, MongoCommandTimer
 
 # Load environment variables
 load_dotenv()
@@ -8,16 +10,30 @@ load_dotenv()
 # Read MongoDB connection string from .env
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/edubridge")
 
-# Initialize MongoDB client
-client = MongoClient(MONGO_URI)
+# Initialize MongoDB client (native asyncio driver, connects lazily;
+# every command is timed into /metrics and the Server-Timing header)
+client = AsyncMongoClient(
+    MONGO_URI,
+    event_listeners=[MongoCommandTimer()] if TELEMETRY_ENABLED else []
+)
 
-# Select database
-db = client["edubridge"]
+# Select database (MONGO_DB lets benchmarks use a scratch database)
+db = client[os.getenv("MONGO_DB", "edubridge")]
 
 # Define collections
 users_col = db["users"]        # Stores registered users (auth info)
 projects_col = db["projects"]  # Stores AI-generated project ideas
 resumes_col = db["resumes"]    # Optional: store resume analysis data
+llm_cache_col = db["llm_cache"]  # Shared tier of the LLM response cache
+jobs_col = db["jobs"]          # Background job queue (resume analysis, ...)
+interviews_col = db["interviews"]  # Mock interview sessions and turns
+profile_invalidations_col = db["profile_invalidations"]  # Profile cache sync between workers
+cohort_imports_col = db["cohort_imports"]  # Bulk onboarding runs (status, counts, failures)
+skill_rollups_col = db["skill_rollups"]  # Users per cohort × role × skill (analytics)
+plan_catalog_col = db["plan_catalog"]  # Pre-generated roadmaps and projects (warmer)
+
+# Uploaded resumes waiting for their analysis job (kept out of the job documents)
+resume_uploads = AsyncGridFSBucket(db, bucket_name="resume_uploads")
 
 # Quick connection check
 print(f"✅ Connected to MongoDB at {MONGO_URI}")
@@ -0,0 +1,41 @@
+from services.db import users_col
+from services import interviews, resume_dedupe
+from services.jobs import job_queue
+from services.llm_cache import response_cache
+from services.profile_cache import profile_cache
+from services.skill_analytics import skill_rollups
+
+# ======================================================
+# Index Bootstrap (run once at startup)
+# ======================================================
+
+
+async def ensure_user_indexes():
+    # Every authenticated route looks users up by email
+    await users_col.create_index("email", unique=True)
+
+
+INDEX_BUILDERS = [
+    ("users", ensure_user_indexes),
+    ("llm_cache", response_cache.shared.ensure_indexes),
+    ("jobs", job_queue.ensure_indexes),
+    ("resumes", resume_dedupe.ensure_indexes),
+    ("interviews", interviews.ensure_indexes),
+    ("profile_invalidations", profile_cache.ensure_indexes),
+    ("skill_rollups", skill_rollups.ensure_indexes),
+]
+
+
+async def ensure_indexes():
+    """
+    Create every index the app relies on. create_index is a no-op when the
+    index already exists, so this is safe on each start. A failure on one
+    collection (e.g. duplicate emails blocking the unique index) is reported
+    without stopping the others.
+    """
+    for name, build in INDEX_BUILDERS:
+        try:
+            await build()
+        except Exception as e:
+            print(f"⚠️ Could not create indexes for {name}: {e}")
+    print("✅ MongoDB indexes ensured")
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import os
+import re
+from services.ai_engine import evaluate_answer, fallback_evaluation
+
+# ======================================================
+# Interview Evaluation: map (one call per answer) → reduce (local merge)
+# ======================================================
+
+# "per_question" scores each answer on its own and merges the results;
+# "single" sends the whole interview in one prompt (previous behaviour).
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "per_question")
+EVALUATION_CONCURRENCY = int(os.getenv("EVALUATION_CONCURRENCY", "5"))
+MAX_MERGED_NOTES = 5
+
+
+def answer_key(question, answer):
+    """Stable id of one Q&A pair, used to reuse scores within a session."""
+    normalized = "\x00".join(re.sub(r"\s+", " ", str(part or "")).strip() for part in (question, answer))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:24]
+
+
+def _distinct(notes, limit=MAX_MERGED_NOTES):
+    seen, result = set(), []
+    for note in notes:
+        key = note.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            result.append(note.strip())
+    return result[:limit]
+
+
+def merge_evaluations(items):
+    """
+    Reduce step: the overall {"score", "feedback"} from per-question results.
+    The score is the mean of the answers that were scored; weaknesses and
+    suggestions come from the weakest answers first. If nothing could be
+    scored, the generic evaluation is returned with the per-question list.
+    """
+    scored = [item for item in items if item["score"] is not None]
+    if not scored:
+        return {**fallback_evaluation(), "questions": items}
+
+    weakest_first = sorted(scored, key=lambda item: item["score"])
+    return {
+        "score": round(sum(item["score"] for item in scored) / len(scored)),
+        "feedback": {
+            "strengths": _distinct(
+                note for item in reversed(weakest_first) for note in item["strengths"]),
+            "weaknesses": _distinct(note for item in weakest_first for note in item["weaknesses"]),
+            "suggestions": " ".join(_distinct(
+                [item["suggestion"] for item in weakest_first if item["suggestion"]], limit=3)),
+        },
+        "questions": items,
+    }
+
+
+def _item(index, qa, result, reused):
+    result = result or {}
+    return {
+        "index": index,
+        "question": qa.get("question"),
+        "score": result.get("score"),
+        "strengths": result.get("strengths", []),
+        "weaknesses": result.get("weaknesses", []),
+        "suggestion": result.get("suggestion", ""),
+        "reused": reused,
+    }
+
+
+async def evaluate_per_question(role, qa_data, known=None):
+    """
+    Yields ("question", item) as each answer is scored (reused scores first,
+    then in completion order), then ("evaluation", merged_result).
+
+    `known` maps answer_key → an earlier result for the same pair; those
+    answers are not sent to GPT again. At most EVALUATION_CONCURRENCY calls
+    run at once. The merged result carries `scores` (answer_key → result)
+    so new ones can be saved with the session.
+    """
+    known = known or {}
+    qa_data = [qa if isinstance(qa, dict) else {"answer": str(qa)} for qa in qa_data]
+    semaphore = asyncio.Semaphore(EVALUATION_CONCURRENCY)
+    items = [None] * len(qa_data)
+    scores = {}
+
+    async def score(index, qa):
+        async with semaphore:
+            return index, await evaluate_answer(role, qa.get("question"), qa.get("answer"))
+
+    reused, pending = [], []
+    for index, qa in enumerate(qa_data):
+        key = answer_key(qa.get("question"), qa.get("answer"))
+        if key in known:
+            items[index] = _item(index, qa, known[key], reused=True)
+            reused.append(items[index])
+        else:
+            pending.append(asyncio.create_task(score(index, qa)))
+
+    try:
+        for item in reused:
+            yield "question", item
+        for finished in asyncio.as_completed(pending):
+            index, result = await finished
+            qa = qa_data[index]
+            if result is not None:
+                scores[answer_key(qa.get("question"), qa.get("answer"))] = result
+            items[index] = _item(index, qa, result, reused=False)
+            yield "question", items[index]
+    finally:
+        for task in pending:
+            task.cancel()
+
+    yield "evaluation", {**merge_evaluations(items), "scores": scores}
+
+
+async def evaluate_all(role, qa_data, known=None):
+    """evaluate_per_question without the per-question events."""
+    result = None
+    async for kind, payload in evaluate_per_question(role, qa_data, known):
+        if kind == "evaluation":
+            result = payload
+    return result
@@ -0,0 +1,277 @@
+import base64
+import datetime
+import uuid
+from pymongo import DESCENDING, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from services.db import interviews_col
+from services.users_repo import get_user, update_user
+
+# ======================================================
+# Interview Sessions & Turns (own collection)
+# ======================================================
+#
+# One `interviews` collection, two document kinds:
+#   session: {_id, kind: "session", email, role, questions, status,
+#             created_at, ended_at, qa, evaluation, checkpoint, scores,
+#             on_demand}
+#   turn:    {_id, kind: "turn", email, session_id, answer, feedback, created_at}
+# so the user document no longer grows with every answer.
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class SessionNotFound(ValueError):
+    """No session with that id for this user."""
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+async def ensure_indexes():
+    await interviews_col.create_index(
+        [("email", 1), ("kind", 1), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    await interviews_col.create_index(
+        [("session_id", 1), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    # At most one open on-demand session per user and role (see _open_on_demand)
+    await interviews_col.create_index(
+        [("email", 1), ("role", 1)], unique=True, name="open_on_demand_session",
+        partialFilterExpression={"kind": "session", "status": "active", "on_demand": True})
+
+# ======================================================
+# Writes
+# ======================================================
+
+
+async def _insert_session(email, role, questions):
+    session_id = uuid.uuid4().hex
+    await interviews_col.insert_one({
+        "_id": session_id,
+        "kind": "session",
+        "email": email,
+        "role": role,
+        "questions": questions,
+        "status": "active",
+        "created_at": _now(),
+        "ended_at": None,
+    })
+    return session_id
+
+
+async def start_session(email, role, questions):
+    """Create a session and remember it as the user's current one."""
+    session_id = await _insert_session(email, role, questions)
+    await update_user(email, {"current_interview_questions": questions,
+                              "current_interview_session": session_id})
+    return session_id
+
+
+async def _open_on_demand(email, role):
+    """
+    The user's open on-demand session for `role`, created if there is none.
+    Concurrent first answers race on the unique index; the loser reads the
+    winner's session.
+    """
+    query = {"email": email, "role": role, "kind": "session", "status": "active", "on_demand": True}
+    try:
+        session = await interviews_col.find_one_and_update(
+            query,
+            {"$setOnInsert": {"_id": uuid.uuid4().hex, "questions": [],
+                              "created_at": _now(), "ended_at": None}},
+            projection={"_id": 1}, upsert=True, return_document=ReturnDocument.AFTER)
+    except DuplicateKeyError:
+        session = await interviews_col.find_one(query, {"_id": 1})
+    return session["_id"]
+
+
+async def _is_active(email, session_id):
+    return await interviews_col.find_one(
+        {"_id": session_id, "email": email, "kind": "session", "status": "active"}, {"_id": 1}
+    ) is not None
+
+
+async def resolve_session(email, session_id=None, role=None):
+    """
+    The given session id if it is an active session of the user
+    (SessionNotFound if not), else their current one while it is active.
+    With a `role`, a user without an active session gets one opened on
+    demand, so free-form answers are never saved without a session (nor
+    added to a finished one); without it the result may be None.
+    """
+    if session_id:
+        if not await _is_active(email, session_id):
+            raise SessionNotFound("Unknown or finished interview session")
+        return session_id
+    user = await get_user(email, "current_interview_session")
+    current = (user or {}).get("current_interview_session")
+    if current and not await _is_active(email, current):
+        current = None
+    if current or role is None:
+        return current
+    current = await _open_on_demand(email, role)
+    await update_user(email, {"current_interview_session": current})
+    return current
+
+
+async def add_turn(email, session_id, answer, feedback, question=None):
+    turn = {
+        "_id": uuid.uuid4().hex,
+        "kind": "turn",
+        "email": email,
+        "session_id": session_id,
+        "question": question,
+        "answer": answer,
+        "feedback": feedback,
+        "created_at": _now(),
+    }
+    await interviews_col.insert_one(turn)
+    return turn["_id"]
+
+
+def _score_fields(scores):
+    return {f"scores.{key}": value for key, value in (scores or {}).items()}
+
+
+async def save_progress(email, session_id, turns, checkpoint, scores=None):
+    """
+    One batch at a turn boundary of a live session: the turns not saved yet,
+    answer scores computed since the last batch, and the checkpoint a
+    restarted worker resumes from.
+    """
+    now = _now()
+    await interviews_col.bulk_write([
+        # 1 ms apart so turns saved together keep their order (Mongo dates are ms)
+        *(InsertOne({"_id": uuid.uuid4().hex, "kind": "turn", "email": email,
+                     "session_id": session_id,
+                     "created_at": now + datetime.timedelta(milliseconds=i), **turn})
+          for i, turn in enumerate(turns)),
+        UpdateOne({"_id": session_id, "email": email},
+                  {"$set": {"checkpoint": {**checkpoint, "updated_at": now}, **_score_fields(scores)}}),
+    ], ordered=True)
+
+
+async def load_session(email, session_id):
+    """An active session of the user with its turns (oldest first), or None."""
+    session = await interviews_col.find_one(
+        {"_id": session_id, "email": email, "kind": "session", "status": "active"})
+    if session is None:
+        return None
+    session["turns"] = await interviews_col.find(
+        {"session_id": session_id, "email": email, "kind": "turn"},
+        {"_id": 0, "question": 1, "answer": 1, "feedback": 1}
+    ).sort([("created_at", 1), ("_id", 1)]).to_list(None)
+    return session
+
+
+async def get_scores(email, session_id):
+    """Per-answer scores already stored on the session (answer_key → result)."""
+    if not session_id:
+        return {}
+    session = await interviews_col.find_one({"_id": session_id, "email": email}, {"scores": 1})
+    return (session or {}).get("scores") or {}
+
+
+async def complete_session(email, session_id, role, qa, evaluation, scores=None):
+    """
+    Attach the final evaluation (and any new per-answer scores) to the
+    session, creating a standalone session when the client evaluated without
+    starting one. An existing id must be one of the user's sessions.
+    """
+    if session_id:
+        result = await interviews_col.update_one(
+            {"_id": session_id, "email": email, "kind": "session"},
+            {"$set": {"status": "completed", "qa": qa, "evaluation": evaluation,
+                      "ended_at": _now(), **_score_fields(scores)}})
+        if result.matched_count == 0:
+            raise SessionNotFound("Unknown interview session")
+        return session_id
+
+    session_id = uuid.uuid4().hex
+    await interviews_col.update_one(
+        {"_id": session_id, "email": email},
+        {
+            "$set": {"status": "completed", "qa": qa, "evaluation": evaluation,
+                     "ended_at": _now(), **_score_fields(scores)},
+            "$setOnInsert": {"kind": "session", "role": role, "questions": [],
+                             "created_at": _now()},
+        },
+        upsert=True
+    )
+    return session_id
+
+# ======================================================
+# Cursor-paginated reads (newest first)
+# ======================================================
+
+
+def encode_cursor(doc):
+    raw = f"{doc['created_at'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, doc_id = raw.split("|", 1)
+        return datetime.datetime.fromisoformat(created_at), doc_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def _page(query, limit, cursor, projection):
+    limit = max(1, min(limit or PAGE_SIZE, MAX_PAGE_SIZE))
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        query = {**query, "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]}
+    docs = await interviews_col.find(query, projection) \
+        .sort([("created_at", DESCENDING), ("_id", DESCENDING)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    return {
+        "items": docs,
+        "next_cursor": encode_cursor(docs[-1]) if has_more else None,
+    }
+
+
+async def list_sessions(email, limit=PAGE_SIZE, cursor=None):
+    return await _page(
+        {"email": email, "kind": "session"}, limit, cursor,
+        {"email": 0, "kind": 0, "qa": 0}
+    )
+
+
+async def list_turns(email, session_id, limit=PAGE_SIZE, cursor=None):
+    return await _page(
+        {"email": email, "kind": "turn", "session_id": session_id}, limit, cursor,
+        {"email": 0, "kind": 0}
+    )
+
+
+async def recent_summary(email, limit=5):
+    """Small summary for /user_data: latest sessions with their scores."""
+    sessions = await interviews_col.find(
+        {"email": email, "kind": "session"},
+        {"role": 1, "status": 1, "created_at": 1, "ended_at": 1, "evaluation.score": 1}
+    ).sort([("created_at", DESCENDING), ("_id", DESCENDING)]).limit(limit).to_list(limit)
+
+    return {
+        "total_sessions": await interviews_col.count_documents({"email": email, "kind": "session"}),
+        "recent": [
+            {
+                "session_id": s["_id"],
+                "role": s.get("role"),
+                "status": s.get("status"),
+                "started_at": s.get("created_at"),
+                "ended_at": s.get("ended_at"),
+                "score": (s.get("evaluation") or {}).get("score"),
+            }
+            for s in sessions
+        ],
+    }
@@ -0,0 +1,215 @@
+import asyncio
+import datetime
+import os
+import uuid
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from services.db import jobs_col
+
+# ======================================================
+# Mongo-backed Job Queue (no external broker)
+# ======================================================
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+class JobQueue:
+    """
+    Durable work queue stored in the `jobs` collection.
+
+    - enqueue() is idempotent per `idempotency_key`: a retried upload returns
+      the existing job instead of repeating the work.
+    - Workers claim jobs with an atomic find_one_and_update and hold a lease.
+      If a worker dies, the lease expires and another worker (or the restarted
+      process) picks the job up again, up to JOB_MAX_ATTEMPTS times.
+    - A failed attempt is requeued with `not_before` set after an exponential
+      delay (JOB_RETRY_BASE_SECONDS doubling per attempt), so a job failing
+      on a persistent upstream problem does not spin through its attempts.
+    - Handlers report progress through `report(stage)`, visible via get();
+      each report also renews the lease.
+    """
+
+    def __init__(self, collection, workers=JOB_WORKERS, lease_seconds=JOB_LEASE_SECONDS,
+                 max_attempts=JOB_MAX_ATTEMPTS, poll_seconds=JOB_POLL_SECONDS,
+                 retry_base_seconds=JOB_RETRY_BASE_SECONDS, retry_max_seconds=JOB_RETRY_MAX_SECONDS):
+        self.collection = collection
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.handlers = {}
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+
+    def register(self, job_type, handler):
+        """handler(job, report) -> result dict"""
+        self.handlers[job_type] = handler
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("idempotency_key", unique=True, sparse=True)
+        await self.collection.create_index([("status", 1), ("created_at", 1)])
+        await self.collection.create_index([("status", 1), ("lease_until", 1)])
+
+    # ---------------- Producer side ----------------
+
+    async def enqueue(self, job_type, email, payload, idempotency_key=None):
+        """
+        Queue a job and return its document. A job with the same idempotency key
+        is returned as-is, or re-queued if it had failed.
+        """
+        if idempotency_key:
+            existing = await self.find_by_key(idempotency_key)
+            if existing:
+                if existing["status"] == "failed":
+                    existing = await self._requeue(existing["_id"], payload)
+                return existing
+
+        job = {
+            "_id": uuid.uuid4().hex,
+            "type": job_type,
+            "email": email,
+            "status": "queued",
+            "stage": "queued",
+            "attempts": 0,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        if idempotency_key:
+            job["idempotency_key"] = idempotency_key
+        try:
+            await self.collection.insert_one(job)
+        except DuplicateKeyError:
+            # Lost a race with a concurrent identical retry
+            return await self.find_by_key(idempotency_key)
+
+        self._wakeup.set()
+        return job
+
+    async def _requeue(self, job_id, payload):
+        job = await self.collection.find_one_and_update(
+            {"_id": job_id},
+            {"$set": {"status": "queued", "stage": "queued", "attempts": 0,
+                      "payload": payload, "error": None, "updated_at": _now()},
+             "$unset": {"not_before": ""}},
+            return_document=ReturnDocument.AFTER
+        )
+        self._wakeup.set()
+        return job
+
+    async def find_by_key(self, idempotency_key):
+        return await self.collection.find_one({"idempotency_key": idempotency_key})
+
+    async def get(self, job_id, email):
+        """Public view of a job, visible only to the user who created it."""
+        return await self.collection.find_one(
+            {"_id": job_id, "email": email},
+            {"payload": 0, "idempotency_key": 0, "lease_until": 0, "not_before": 0}
+        )
+
+    # ---------------- Worker side ----------------
+
+    async def start(self):
+        for n in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(n)))
+        print(f"✅ Job queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _claim(self):
+        now = _now()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                # not_before absent or null (first attempt) or in the past
+                {"status": "queued", "not_before": {"$not": {"$gt": now}}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            {"$set": {
+                "status": "running",
+                "lease_until": now + datetime.timedelta(seconds=self.lease_seconds),
+                "updated_at": now,
+            }, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _worker(self, n):
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                print(f"⚠️ Job worker {n} could not claim: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    def retry_delay(self, attempts):
+        """Seconds before a job that failed its `attempts`-th attempt may run again."""
+        return min(self.retry_max_seconds, self.retry_base_seconds * 2 ** max(attempts - 1, 0))
+
+    async def _run(self, job):
+        job_id = job["_id"]
+
+        async def report(stage):
+            # Doubles as a heartbeat: long jobs keep their lease while reporting
+            now = _now()
+            await self.collection.update_one(
+                {"_id": job_id},
+                {"$set": {"stage": stage, "updated_at": now,
+                          "lease_until": now + datetime.timedelta(seconds=self.lease_seconds)}}
+            )
+
+        handler = self.handlers.get(job["type"])
+        try:
+            if job["attempts"] > self.max_attempts:
+                # Reclaimed after its last lease expired (worker crashed every time)
+                raise RuntimeError("Job exceeded its maximum attempts")
+            if handler is None:
+                raise ValueError(f"No handler for job type {job['type']}")
+            result = await handler(job, report)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failed = job["attempts"] >= self.max_attempts
+            print(f"⚠️ Job {job_id} attempt {job['attempts']} failed: {e}")
+            now = _now()
+            update = {"status": "failed" if failed else "queued", "error": str(e), "updated_at": now}
+            if not failed:
+                update["not_before"] = now + datetime.timedelta(seconds=self.retry_delay(job["attempts"]))
+            await self.collection.update_one({"_id": job_id}, {"$set": update})
+            return
+
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "done", "stage": "done", "result": result,
+                      "error": None, "updated_at": _now()},
+             "$unset": {"payload.content": ""}}
+        )
+
+
+job_queue = JobQueue(jobs_col)
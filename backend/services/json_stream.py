@@ -0,0 +1,171 @@
+import json
+
+# ======================================================
+# Incremental JSON: emit array elements as they complete
+# ======================================================
+
+
+class JsonArrayStream:
+    """
+    Feed LLM text deltas; get back each element of a target JSON array as
+    soon as that element's closing bracket arrives.
+
+    `key=None` targets a top-level array (`[{...}, {...}]`); `key="roadmap"`
+    targets the array under that key of the top-level object
+    (`{"roadmap": [{...}, ...]}`) and still accepts a bare top-level array.
+    Text outside the JSON (```json fences, a preamble) is ignored. Only
+    object/array elements are emitted.
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+        self.buffer = []
+        self.pos = 0
+        self.stack = []           # "{" / "[" for every open container
+        self.keys = []            # last key seen in each open object (None for arrays)
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.last_string = None
+        self.target_depth = None  # stack depth of the target array once found
+        self.element_start = None
+        self.done = False
+
+    def _is_target(self):
+        if self.key is None:
+            return not self.stack
+        return not self.stack or (self.stack == ["{"] and self.keys[-1] == self.key)
+
+    def feed(self, chunk):
+        """Consume `chunk`; return the list of elements completed by it."""
+        self.buffer.append(chunk)
+        text = "".join(self.buffer)
+        self.buffer = [text]
+        completed = []
+
+        while self.pos < len(text) and not self.done:
+            ch = text[self.pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    try:
+                        self.last_string = json.loads(text[self.string_start:self.pos + 1])
+                    except ValueError:
+                        self.last_string = None
+                self.pos += 1
+                continue
+
+            if ch == '"' and self.stack:
+                self.in_string = True
+                self.string_start = self.pos
+            elif ch == ":" and self.stack and self.stack[-1] == "{":
+                self.keys[-1] = self.last_string
+            elif ch in "{[":
+                if ch == "[" and self.target_depth is None and self._is_target():
+                    self.target_depth = len(self.stack) + 1
+                elif self.target_depth is not None and len(self.stack) == self.target_depth:
+                    self.element_start = self.pos
+                self.stack.append(ch)
+                self.keys.append(None)
+            elif ch in "}]" and self.stack:
+                self.stack.pop()
+                self.keys.pop()
+                depth = len(self.stack)
+                if self.target_depth is not None:
+                    if depth == self.target_depth and self.element_start is not None:
+                        try:
+                            completed.append(json.loads(text[self.element_start:self.pos + 1]))
+                        except ValueError:
+                            pass
+                        self.element_start = None
+                    elif depth < self.target_depth:
+                        self.done = True
+            self.pos += 1
+
+        return completed
+
+    def text(self):
+        """Everything fed so far."""
+        return "".join(self.buffer)
+
+# ======================================================
+# Tolerant parsing: salvage JSON from a messy or truncated reply
+# ======================================================
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _scan(text):
+    """
+    One pass over `text` from its first { or [ to where that value closes.
+    Returns (chars, open_stack, in_string, commas) where `commas` records
+    (position, stack) for every structural comma so a truncated tail can be
+    cut back to the last complete member. Trailing commas and stray closers
+    are dropped on the way.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON object or array in reply")
+
+    out, stack, commas = [], [], []
+    in_string = escaped = False
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                continue
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            stack.pop()
+        elif ch == ",":
+            commas.append((len(out), list(stack)))
+        out.append(ch)
+        if not stack:
+            break
+    return out, stack, in_string, commas
+
+
+def loads_tolerant(text):
+    """
+    json.loads for LLM replies: ignores prose and ```json fences around the
+    payload, drops trailing commas, and closes a reply that was cut off
+    mid-way (unterminated strings, missing brackets), backing off to the last
+    complete member when the tail is unusable. Raises ValueError when nothing
+    parseable is left.
+    """
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    out, stack, in_string, commas = _scan(text)
+    candidates = [("".join(out) + ('"' if in_string else ""), stack)]
+    for position, saved in reversed(commas):
+        candidates.append(("".join(out[:position]), saved))
+
+    for body, open_stack in candidates:
+        body = body.rstrip().rstrip(",:")
+        try:
+            return json.loads(body + "".join(_CLOSERS[c] for c in reversed(open_stack)))
+        except ValueError:
+            continue
+    raise ValueError("Reply is not repairable JSON")
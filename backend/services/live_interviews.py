@@ -0,0 +1,214 @@
+import asyncio
+import os
+import time
+from services import interviews
+from services.interviews import SessionNotFound
+from services.ai_engine import evaluate_answer, generate_interview_questions, interview_turn_messages
+from services.ai_streaming import stream_completion, stream_evaluation
+from services.interview_evaluation import EVALUATION_MODE, answer_key, evaluate_per_question
+from services.llm_gateway import llm_budget
+from services.llm_scheduler import LLMSaturated, llm_priority
+
+# ======================================================
+# Live Interview Sessions (WebSocket, state held per worker)
+# ======================================================
+
+CONTEXT_TURNS = int(os.getenv("INTERVIEW_CONTEXT_TURNS", "4"))   # earlier turns sent to GPT
+SESSION_IDLE_SECONDS = int(os.getenv("INTERVIEW_IDLE_SECONDS", "1800"))
+MAX_ANSWER_CHARS = 4000
+START_LLM_BUDGET = 15
+TURN_LLM_BUDGET = 30
+EVALUATION_LLM_BUDGET = 40
+
+
+class LiveSession:
+    """
+    One interview in progress: questions, turns so far and which of them are
+    already in Mongo. Turns are saved at each turn boundary together with a
+    checkpoint, so a restarted worker (or another one) can pick the session
+    up from the interviews collection.
+    """
+
+    def __init__(self, session_id, email, role, questions, turns=(), scores=None):
+        self.session_id = session_id
+        self.email = email
+        self.role = role
+        self.questions = questions
+        self.turns = list(turns)
+        self.saved = len(self.turns)
+        self.scores = dict(scores or {})     # answer_key → per-answer evaluation
+        self.unsaved_scores = {}
+        self.scoring = set()                 # background scoring tasks
+        self.lock = asyncio.Lock()      # one turn at a time, even over two sockets
+        self.touched = time.monotonic()
+
+    def next_question(self):
+        index = len(self.turns)
+        if index < len(self.questions):
+            return self.questions[index].get("question")
+        return None
+
+    def state(self):
+        """What a (re)connecting client needs to render the interview."""
+        return {
+            "session_id": self.session_id,
+            "role": self.role,
+            "questions": self.questions,
+            "turns": self.turns,
+            "next_question": self.next_question(),
+        }
+
+    async def flush(self):
+        """Save the pending turns plus the checkpoint in one round trip."""
+        pending = self.turns[self.saved:]
+        scores = dict(self.unsaved_scores)
+        await interviews.save_progress(self.email, self.session_id, pending, {
+            "turns": len(self.turns),
+            "next_question": len(self.turns),
+        }, scores)
+        self.saved += len(pending)
+        for key in scores:
+            self.unsaved_scores.pop(key, None)
+
+    def score_later(self, turn):
+        """
+        Score the answer in the background at planning priority, so the end
+        of the interview only merges results instead of waiting on GPT.
+        """
+        async def score():
+            try:
+                result = await evaluate_answer(self.role, turn["question"], turn["answer"])
+            except Exception as e:
+                print(f"⚠️ Background scoring skipped: {e}")
+                return
+            if result is not None:
+                key = answer_key(turn["question"], turn["answer"])
+                self.scores[key] = self.unsaved_scores[key] = result
+
+        with llm_budget(TURN_LLM_BUDGET), llm_priority("planning"):
+            task = asyncio.create_task(score())
+        self.scoring.add(task)
+        task.add_done_callback(self.scoring.discard)
+
+    async def answer(self, answer, emit):
+        """
+        Stream feedback on one answer as `token` messages, then send the
+        finished `turn`. GPT sees the last CONTEXT_TURNS turns, so feedback can
+        refer back to earlier answers without the prompt growing unbounded.
+        """
+        async with self.lock:
+            self.touched = time.monotonic()
+            question = self.next_question() or "Follow-up"
+            messages = interview_turn_messages(
+                self.role, self.questions, self.turns[-CONTEXT_TURNS:], question, answer)
+
+            parts = []
+            with llm_budget(TURN_LLM_BUDGET), llm_priority("interview"):
+                try:
+                    async for delta in stream_completion(messages, purpose="interview_feedback"):
+                        parts.append(delta)
+                        await emit("token", {"delta": delta})
+                    feedback = "".join(parts)
+                except LLMSaturated:
+                    raise  # → busy message to the client, the answer can be resent
+                except Exception as e:
+                    print("⚠️ Live interview feedback failed:", e)
+                    feedback = f"Mock interview AI failed ({e}). Try again later."
+
+            turn = {"question": question, "answer": answer, "feedback": feedback}
+            self.turns.append(turn)
+            if EVALUATION_MODE == "per_question":
+                self.score_later(turn)
+            try:
+                await self.flush()
+            except Exception as e:
+                # Kept in memory; the next boundary or the session end retries
+                print(f"⚠️ Interview {self.session_id} not saved yet: {e}")
+            await emit("turn", {**turn, "index": len(self.turns) - 1,
+                                "next_question": self.next_question()})
+
+
+class LiveInterviews:
+    """The live sessions of this worker, by session id."""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def _sweep(self):
+        cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+        for session_id, live in list(self._sessions.items()):
+            if live.touched < cutoff and not live.lock.locked():
+                del self._sessions[session_id]
+
+    async def open(self, email, role, session_id=None):
+        """
+        (session, source): the live session from memory, resumed from its
+        Mongo checkpoint, or a new one with freshly generated questions.
+        """
+        self._sweep()
+        if session_id:
+            live = self._sessions.get(session_id)
+            if live is not None and live.email == email:
+                live.touched = time.monotonic()
+                return live, "memory"
+            doc = await interviews.load_session(email, session_id)
+            if doc is None:
+                raise SessionNotFound("Unknown or finished interview session")
+            live = LiveSession(doc["_id"], email, doc["role"], doc.get("questions") or [],
+                               doc["turns"], doc.get("scores"))
+            self._sessions[live.session_id] = live
+            return live, "checkpoint"
+
+        with llm_budget(START_LLM_BUDGET), llm_priority("interview"):
+            questions = await generate_interview_questions(role)
+        session_id = await interviews.start_session(email, role, questions)
+        live = LiveSession(session_id, email, role, questions)
+        self._sessions[session_id] = live
+        return live, "new"
+
+    async def detach(self, live):
+        """Client went away: save what is pending, keep the state for a reconnect."""
+        if live.saved < len(live.turns) or live.unsaved_scores:
+            try:
+                await live.flush()
+            except Exception as e:
+                print(f"⚠️ Interview {live.session_id} not saved on disconnect: {e}")
+
+    async def finish(self, live, emit):
+        """
+        Evaluate all turns, then close the session for good. Answers scored
+        in the background are reused; each result is sent as a `question`
+        message (or, in single-prompt mode, the raw evaluation as tokens).
+        """
+        async with live.lock:
+            qa = [{"question": t["question"], "answer": t["answer"]} for t in live.turns]
+            result, scores = None, None
+            with llm_budget(EVALUATION_LLM_BUDGET), llm_priority("interview"):
+                if EVALUATION_MODE == "per_question":
+                    await asyncio.gather(*live.scoring, return_exceptions=True)
+                    async for kind, payload in evaluate_per_question(live.role, qa, live.scores):
+                        if kind == "question":
+                            await emit("question", payload)
+                        else:
+                            result = payload
+                    scores = {**live.unsaved_scores, **result.pop("scores")}
+                else:
+                    async for kind, payload in stream_evaluation(live.role, qa):
+                        if kind == "token":
+                            await emit("token", {"delta": payload})
+                        else:
+                            result = payload
+
+            if live.saved < len(live.turns):
+                await live.flush()
+            await interviews.complete_session(
+                live.email, live.session_id, live.role, qa, result, scores)
+            self._sessions.pop(live.session_id, None)
+            await emit("evaluation", {**result, "session_id": live.session_id})
+
+    def snapshot(self):
+        return {"sessions": len(self._sessions),
+                "unsaved_turns": sum(len(s.turns) - s.saved for s in self._sessions.values())}
+
+
+live_interviews = LiveInterviews()
@@ -0,0 +1,212 @@
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from services.db import llm_cache_col
+
+# ======================================================
+# Cache Policies (per endpoint)
+# ======================================================
+
+
+class CachePolicy:
+    """
+    How responses for one kind of prompt are cached.
+    `variants` > 1 keeps several distinct completions per key and serves a random
+    one, so users picking the same role still see some variety.
+    """
+
+    def __init__(self, name, ttl_seconds, variants=1):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.variants = variants
+
+
+DAY = 24 * 60 * 60
+
+POLICIES = {
+    "roadmap": CachePolicy("roadmap", ttl_seconds=7 * DAY, variants=3),
+    "projects": CachePolicy("projects", ttl_seconds=7 * DAY, variants=3),
+    "interview_questions": CachePolicy("interview_questions", ttl_seconds=3 * DAY, variants=5),
+}
+
+
+def cache_key(messages, model, temperature):
+    """
+    Content address for a completion: SHA-256 over the whitespace-normalized
+    prompt messages plus model and temperature.
+    """
+    normalized = [
+        {"role": m["role"], "content": re.sub(r"\s+", " ", m["content"]).strip()}
+        for m in messages
+    ]
+    payload = json.dumps(
+        {"messages": normalized, "model": model, "temperature": temperature},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ======================================================
+# Tier 1: In-process LRU with TTL
+# ======================================================
+
+
+class MemoryTier:
+    """Per-worker LRU: key -> (expires_at, [variants])."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return []
+        expires_at, variants = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return []
+        self._entries.move_to_end(key)
+        return variants
+
+    async def put(self, key, variants, policy):
+        self._entries[key] = (time.time() + policy.ttl_seconds, list(variants))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def add(self, key, value, policy):
+        variants = (await self.get(key) + [value])[-policy.variants:]
+        await self.put(key, variants, policy)
+
+# ======================================================
+# Tier 2: Shared Mongo collection (all workers)
+# ======================================================
+
+
+class MongoTier:
+    """
+    Shared tier in the `llm_cache` collection: {_id: key, policy, variants, expires_at}.
+    Expired documents are ignored on read and reaped by a TTL index, which
+    only acts on BSON dates, so expires_at is stored as a UTC datetime.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+        # Entries written with a float timestamp are invisible to the TTL index
+        await self.collection.delete_many({"expires_at": {"$not": {"$type": "date"}}})
+
+    async def get(self, key):
+        doc = await self.collection.find_one(
+            {"_id": key}, {"variants": 1, "expires_at": 1})
+        expires_at = doc.get("expires_at") if doc else None
+        if not isinstance(expires_at, datetime.datetime) or expires_at < datetime.datetime.utcnow():
+            return []
+        return doc.get("variants", [])
+
+    async def add(self, key, value, policy):
+        await self.collection.update_one(
+            {"_id": key},
+            {
+                "$push": {"variants": {"$each": [value], "$slice": -policy.variants}},
+                "$set": {"policy": policy.name, "expires_at": datetime.datetime.utcnow()
+                         + datetime.timedelta(seconds=policy.ttl_seconds)},
+            },
+            upsert=True
+        )
+
+# ======================================================
+# Response Cache
+# ======================================================
+
+
+class ResponseCache:
+    """
+    Two-tier read-through cache for LLM completions.
+
+    A key counts as a hit once it holds `policy.variants` completions; until then
+    every call goes upstream and its result is added as a new variant.
+    """
+
+    def __init__(self, memory, shared=None):
+        self.memory = memory
+        self.shared = shared
+        self.stats = {}
+
+    def _count(self, policy, outcome):
+        counters = self.stats.setdefault(
+            policy.name, {"memory_hits": 0, "shared_hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    async def lookup(self, key, policy):
+        """A cached variant for `key` (counted as a hit), or None (counted as a miss)."""
+        variants = await self.memory.get(key)
+        if len(variants) >= policy.variants:
+            self._count(policy, "memory_hits")
+            return random.choice(variants)
+
+        if self.shared is not None:
+            try:
+                variants = await self.shared.get(key)
+            except Exception as e:
+                print(f"⚠️ Shared LLM cache read failed: {e}")
+                variants = []
+            if len(variants) >= policy.variants:
+                await self.memory.put(key, variants, policy)
+                self._count(policy, "shared_hits")
+                return random.choice(variants)
+
+        self._count(policy, "misses")
+        return None
+
+    async def store(self, key, policy, value, validate=None):
+        """Add a fresh completion as a variant, only if `validate(value)` does not raise."""
+        try:
+            if validate:
+                validate(value)
+        except Exception:
+            return
+
+        await self.memory.add(key, value, policy)
+        if self.shared is not None:
+            try:
+                await self.shared.add(key, value, policy)
+            except Exception as e:
+                print(f"⚠️ Shared LLM cache write failed: {e}")
+
+    async def get_or_generate(self, key, policy, generate, validate=None):
+        """
+        Returns a cached completion for `key` or awaits `generate()` for a fresh
+        one. Fresh results are stored only if `validate(text)` does not raise.
+        """
+        cached = await self.lookup(key, policy)
+        if cached is not None:
+            return cached
+
+        value = await generate()
+        await self.store(key, policy, value, validate)
+        return value
+
+    def snapshot(self):
+        """Hit/miss counters per policy, with hit ratio."""
+        report = {}
+        for name, counters in self.stats.items():
+            total = sum(counters.values())
+            hits = counters["memory_hits"] + counters["shared_hits"]
+            report[name] = {**counters, "hit_ratio": round(hits / total, 3) if total else 0.0}
+        return report
+
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+response_cache = ResponseCache(
+    memory=MemoryTier(int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))),
+    shared=MongoTier(llm_cache_col),
+)
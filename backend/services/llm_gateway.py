@@ -0,0 +1,313 @@
+import asyncio
+import contextvars
+import os
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+import openai
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+from services.llm_scheduler import estimate_tokens, scheduler
+from services.telemetry import record_llm_usage, span
+
+# ======================================================
+# LLM Gateway: one client, deadlines, retries, circuit breaker
+# ======================================================
+
+load_dotenv()
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))            # ceiling per attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.25"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "2.0"))
+LLM_MIN_ATTEMPT = 0.5                                          # not worth starting with less left
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# Total LLM time per endpoint, counted from request arrival (seconds).
+# /select_role is generous because generations that miss its response
+# deadline are still saved once they finish.
+ENDPOINT_BUDGETS = {
+    "/select_role": 60,
+    "/select_role/stream": 40,
+    "/update_resume/stream": 45,
+    "/mock_interview": 15,
+    "/mock_interview/stream": 30,
+    "/start_interview": 15,
+    "/evaluate_interview": 25,
+    "/evaluate_interview/stream": 40,
+}
+
+# Worth retrying: the request may succeed a moment later
+RETRYABLE = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailable(Exception):
+    """Raised instead of calling upstream; callers serve their fallback."""
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+class DeadlineExceeded(LLMUnavailable):
+    pass
+
+# ======================================================
+# Request budgets (contextvar, inherited by spawned tasks)
+# ======================================================
+
+
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_budget(seconds):
+    """
+    Every LLM call inside the block (including tasks it spawns) must finish
+    within `seconds` from now. Nested budgets can only shorten the deadline.
+    """
+    ends_at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(ends_at if outer is None else min(outer, ends_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget():
+    """Seconds left in the current budget, or None when there is none."""
+    ends_at = _deadline.get()
+    return None if ends_at is None else ends_at - time.monotonic()
+
+
+class LLMBudgetMiddleware:
+    """ASGI middleware: starts each request's budget from ENDPOINT_BUDGETS."""
+
+    def __init__(self, app, budgets=None):
+        self.app = app
+        self.budgets = ENDPOINT_BUDGETS if budgets is None else budgets
+
+    async def __call__(self, scope, receive, send):
+        seconds = self.budgets.get(scope.get("path")) if scope["type"] == "http" else None
+        if seconds is None:
+            return await self.app(scope, receive, send)
+        with llm_budget(seconds):
+            await self.app(scope, receive, send)
+
+# ======================================================
+# Circuit Breaker (per worker)
+# ======================================================
+
+
+class CircuitBreaker:
+    """
+    closed → open after `failure_threshold` consecutive upstream failures;
+    open → half_open after `reset_timeout` seconds, letting one probe through;
+    the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.transitions = 0
+
+    def _set(self, state):
+        if state != self.state:
+            print(f"🔌 LLM circuit {self.state} → {state}")
+            self.state = state
+            self.transitions += 1
+
+    def allow(self):
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._set("half_open")
+            self.probing = False
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.probing = False
+        self._set("closed")
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set("open")
+
+    def snapshot(self):
+        return {"state": self.state, "consecutive_failures": self.failures,
+                "transitions": self.transitions}
+
+# ======================================================
+# Gateway
+# ======================================================
+
+
+class LLMGateway:
+    """
+    Every chat completion goes through here. A call first needs a slot from
+    the LLM scheduler (rate limits, priorities). Each attempt is capped by the
+    smaller of LLM_TIMEOUT and what is left of the request budget; retryable
+    errors back off with full jitter (honouring Retry-After) while the budget
+    allows; an open circuit fails fast so callers use their fallback at once.
+    The SDK's own retries are disabled so the budget is the only clock.
+    """
+
+    def __init__(self, client, breaker, scheduler, max_retries=LLM_MAX_RETRIES):
+        self.client = client
+        self.breaker = breaker
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        self.stats = {"calls": 0, "retries": 0, "failures": 0,
+                      "short_circuited": 0, "deadline_exceeded": 0}
+
+    def _attempt_timeout(self):
+        remaining = remaining_budget()
+        if remaining is None:
+            return LLM_TIMEOUT
+        if remaining < LLM_MIN_ATTEMPT:
+            self.stats["deadline_exceeded"] += 1
+            raise DeadlineExceeded("LLM budget for this request is spent")
+        return min(LLM_TIMEOUT, remaining)
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+        retry_after = getattr(getattr(error, "response", None), "headers", {}).get("retry-after")
+        try:
+            delay = max(delay, min(float(retry_after), LLM_TIMEOUT)) if retry_after else delay
+        except ValueError:
+            pass
+        return delay
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError("LLM upstream unhealthy; serving fallback")
+
+    @asynccontextmanager
+    async def _admitted(self, kwargs):
+        """A scheduler slot (RPM/TPM/concurrency) for one logical call."""
+        remaining = remaining_budget()
+        max_wait = None if remaining is None else remaining - LLM_MIN_ATTEMPT
+        try:
+            with span("llm_queue"):
+                grant = await self.scheduler.acquire(
+                    estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens")), max_wait)
+        except BaseException:
+            self.breaker.probing = False
+            raise
+        try:
+            yield grant
+        finally:
+            await self.scheduler.release(grant)
+
+    async def _call(self, **kwargs):
+        self.stats["calls"] += 1
+        attempt = 0
+        while True:
+            try:
+                timeout = self._attempt_timeout()
+            except DeadlineExceeded:
+                self.breaker.probing = False
+                raise
+            try:
+                response = await self.client.chat.completions.create(timeout=timeout, **kwargs)
+            except RETRYABLE as e:
+                delay = self._backoff(attempt, e)
+                remaining = remaining_budget()
+                out_of_time = remaining is not None and delay + LLM_MIN_ATTEMPT > remaining
+                # Concurrent calls may have opened the circuit meanwhile; stop piling on
+                if attempt >= self.max_retries or out_of_time or self.breaker.state == "open":
+                    self.stats["failures"] += 1
+                    self.breaker.record_failure()
+                    raise
+                attempt += 1
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Our own request was bad (4xx) or the caller gave up; says
+                # nothing about upstream health
+                self.breaker.probing = False
+                raise
+            self.breaker.record_success()
+            return response
+
+    async def create(self, purpose="chat", **kwargs):
+        """
+        chat.completions.create with breaker, scheduling, budget and retries
+        applied. `purpose` names the call in timings and token metrics.
+        """
+        self._check_breaker()
+        async with self._admitted(kwargs) as grant:
+            with span(f"llm.{purpose}"):
+                response = await self._call(**kwargs)
+            usage = getattr(response, "usage", None)
+            grant.record_usage(usage)
+            record_llm_usage(purpose, usage)
+            return response
+
+    async def stream(self, purpose="chat", **kwargs):
+        """
+        Yields chunks of a streamed completion, holding one scheduler slot
+        until it ends. Opening the stream gets the same retries as create();
+        after that a failure is final. Each chunk must arrive within the
+        remaining budget.
+        """
+        self._check_breaker()
+        async with self._admitted(kwargs) as grant:
+            with span(f"llm.{purpose}"):
+                stream = await self._call(
+                    stream=True, stream_options={"include_usage": True}, **kwargs)
+                chunks = stream.__aiter__()
+                while True:
+                    remaining = remaining_budget()
+                    try:
+                        if remaining is None:
+                            chunk = await chunks.__anext__()
+                        else:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), max(remaining, 0))
+                    except StopAsyncIteration:
+                        return
+                    except (asyncio.TimeoutError, *RETRYABLE):
+                        self.stats["failures"] += 1
+                        self.breaker.record_failure()
+                        raise
+                    # The last chunk carries the token usage of the whole stream
+                    usage = getattr(chunk, "usage", None)
+                    if usage is not None:
+                        grant.record_usage(usage)
+                        record_llm_usage(purpose, usage)
+                    yield chunk
+
+    def snapshot(self):
+        return {**self.stats, "circuit": self.breaker.snapshot(), "scheduler": self.scheduler.snapshot()}
+
+
+gateway = LLMGateway(
+    client=AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        timeout=LLM_TIMEOUT,
+        max_retries=0,
+    ),
+    breaker=CircuitBreaker(BREAKER_FAILURES, BREAKER_RESET_SECONDS),
+    scheduler=scheduler,
+)
@@ -0,0 +1,325 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+# ======================================================
+# LLM Scheduler: RPM/TPM token buckets, concurrency cap, priorities
+# ======================================================
+
+load_dotenv()
+
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+# Shared by every uvicorn worker on the host; ":memory:" limits per worker only
+LLM_SCHEDULER_DB = os.getenv(
+    "LLM_SCHEDULER_DB", os.path.join(tempfile.gettempdir(), "edubridge-llm-scheduler.sqlite3"))
+COMPLETION_TOKEN_ESTIMATE = 700   # charged up front, corrected from `usage` afterwards
+LEASE_SECONDS = 120               # a crashed worker's slots free themselves after this
+POLL_SECONDS = 0.25               # re-check interval while waiting on another worker
+
+
+class PriorityClass:
+    """Lower `rank` is served first. Callers wait at most `max_wait` seconds."""
+
+    def __init__(self, name, rank, max_wait, max_queue):
+        self.name = name
+        self.rank = rank
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+
+
+PRIORITY_CLASSES = {
+    "interview": PriorityClass("interview", 0, max_wait=5, max_queue=200),
+    "resume": PriorityClass("resume", 1, max_wait=30, max_queue=200),
+    "planning": PriorityClass("planning", 2, max_wait=10, max_queue=100),
+}
+
+ENDPOINT_PRIORITIES = {
+    "/mock_interview": "interview",
+    "/mock_interview/stream": "interview",
+    "/start_interview": "interview",
+    "/evaluate_interview": "interview",
+    "/evaluate_interview/stream": "interview",
+    "/update_resume/stream": "resume",
+    "/select_role": "planning",
+    "/select_role/stream": "planning",
+}
+
+
+class LLMSaturated(Exception):
+    """
+    No LLM capacity within the caller's wait limit. Not a reason to serve a
+    fallback: the API answers 503 with Retry-After instead.
+    """
+
+    def __init__(self, priority, retry_after):
+        super().__init__(f"LLM capacity saturated for {priority} requests")
+        self.priority = priority
+        self.retry_after = max(1, math.ceil(retry_after))
+
+# ======================================================
+# Priority context (contextvar, inherited by spawned tasks)
+# ======================================================
+
+
+_priority = contextvars.ContextVar("llm_priority", default="planning")
+
+
+@contextmanager
+def llm_priority(name):
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class LLMPriorityMiddleware:
+    """ASGI middleware: tags each request's LLM calls with ENDPOINT_PRIORITIES."""
+
+    def __init__(self, app, priorities=None):
+        self.app = app
+        self.priorities = ENDPOINT_PRIORITIES if priorities is None else priorities
+
+    async def __call__(self, scope, receive, send):
+        name = self.priorities.get(scope.get("path")) if scope["type"] == "http" else None
+        if name is None:
+            return await self.app(scope, receive, send)
+        with llm_priority(name):
+            await self.app(scope, receive, send)
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough prompt size (~4 chars per token) plus the expected completion."""
+    prompt = sum(len(m.get("content") or "") for m in messages) // 4
+    return prompt + (max_tokens or COMPLETION_TOKEN_ESTIMATE)
+
+# ======================================================
+# Shared state: SQLite file (one transaction per decision)
+# ======================================================
+
+
+class SqliteBucketStore:
+    """
+    Token buckets and in-flight leases in one SQLite file, so every worker
+    process on the host draws from the same RPM/TPM budget. BEGIN IMMEDIATE
+    serializes the refill-check-take step across processes.
+    """
+
+    def __init__(self, path, rpm, tpm, max_concurrency):
+        self.buckets = {"rpm": (rpm, rpm / 60.0), "tpm": (tpm, tpm / 60.0)}
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL, updated REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS leases (id TEXT PRIMARY KEY, expires REAL)")
+
+    def _levels(self, now):
+        levels = {}
+        for name, (capacity, rate) in self.buckets.items():
+            row = self._conn.execute(
+                "SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            level = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            levels[name] = level
+        return levels
+
+    def _save(self, levels, now):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)",
+            [(name, level, now) for name, level in levels.items()])
+
+    def try_acquire(self, tokens, lease_id):
+        """0 when a slot was taken (lease recorded), else seconds worth waiting."""
+        costs = {"rpm": 1, "tpm": min(tokens, self.buckets["tpm"][0])}
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM leases WHERE expires < ?", (now,))
+                in_flight = self._conn.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+                levels = self._levels(now)
+                wait = max(
+                    (costs[name] - levels[name]) / self.buckets[name][1]
+                    for name in self.buckets
+                )
+                if in_flight >= self.max_concurrency:
+                    wait = max(wait, POLL_SECONDS)
+                if wait > 0:
+                    self._conn.execute("ROLLBACK")
+                    return wait
+
+                self._save({name: levels[name] - costs[name] for name in levels}, now)
+                self._conn.execute(
+                    "INSERT INTO leases (id, expires) VALUES (?, ?)", (lease_id, now + LEASE_SECONDS))
+                self._conn.execute("COMMIT")
+                return 0
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def release(self, lease_id, token_correction=0):
+        """Free the concurrency slot; charge (or refund) the TPM estimate error."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+                if token_correction:
+                    levels = self._levels(now)
+                    levels["tpm"] -= token_correction
+                    self._save(levels, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+# ======================================================
+# Scheduler (priority queue per worker over the shared store)
+# ======================================================
+
+
+class Grant:
+    """An admitted call. Report real usage so the TPM bucket stays accurate."""
+
+    def __init__(self, lease_id, tokens):
+        self.lease_id = lease_id
+        self.tokens = tokens
+        self.used_tokens = None
+
+    def record_usage(self, usage):
+        if usage is not None and getattr(usage, "total_tokens", None):
+            self.used_tokens = usage.total_tokens
+
+
+class LLMScheduler:
+    """
+    Waiting callers queue by (priority rank, arrival); only the head of the
+    queue may take capacity, so interview turns overtake queued roadmap work.
+    A caller that cannot be served within its class's max_wait (or its
+    remaining request budget), or that finds the queue full, gets LLMSaturated.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._waiters = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._dispatcher = None
+        self.stats = {name: {"admitted": 0, "rejected": 0, "waited_seconds": 0.0}
+                      for name in PRIORITY_CLASSES}
+
+    def queue_depth(self):
+        depth = {name: 0 for name in PRIORITY_CLASSES}
+        for _, _, name, _, future in self._waiters:
+            if not future.done():
+                depth[name] += 1
+        return depth
+
+    def _reject(self, cls, retry_after):
+        self.stats[cls.name]["rejected"] += 1
+        raise LLMSaturated(cls.name, retry_after)
+
+    async def _dispatch(self):
+        while self._waiters:
+            rank, seq, name, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            lease_id = uuid.uuid4().hex
+            wait = await run_in_threadpool(self.store.try_acquire, tokens, lease_id)
+            if wait <= 0:
+                heapq.heappop(self._waiters)
+                if future.done():
+                    await run_in_threadpool(self.store.release, lease_id)
+                else:
+                    future.set_result(lease_id)
+                continue
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), min(wait, POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        self._dispatcher = None
+
+    async def acquire(self, tokens, max_wait=None):
+        cls = PRIORITY_CLASSES[_priority.get()]
+        max_wait = cls.max_wait if max_wait is None else min(cls.max_wait, max_wait)
+        started = time.monotonic()
+
+        if not self._waiters:
+            lease_id = uuid.uuid4().hex
+            wait = await run_in_threadpool(self.store.try_acquire, tokens, lease_id)
+            if wait <= 0:
+                self.stats[cls.name]["admitted"] += 1
+                return Grant(lease_id, tokens)
+            if wait > max_wait:
+                self._reject(cls, wait)
+
+        ahead = sum(1 for rank, *_ in self._waiters if rank <= cls.rank)
+        if ahead >= cls.max_queue or max_wait <= 0:
+            self._reject(cls, max(max_wait, 1))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cls.rank, next(self._seq), cls.name, tokens, future))
+        self._wake.set()
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), max_wait)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # A slot granted at the same moment must not leak
+            if not future.cancel():
+                await run_in_threadpool(self.store.release, future.result())
+            raise
+        if future.cancel():
+            self._reject(cls, max_wait)
+        lease_id = future.result()
+
+        waited = time.monotonic() - started
+        self.stats[cls.name]["admitted"] += 1
+        self.stats[cls.name]["waited_seconds"] += waited
+        return Grant(lease_id, tokens)
+
+    async def release(self, grant):
+        correction = grant.used_tokens - grant.tokens if grant.used_tokens else 0
+        await run_in_threadpool(self.store.release, grant.lease_id, correction)
+        self._wake.set()
+
+    @asynccontextmanager
+    async def slot(self, tokens, max_wait=None):
+        """Holds one admitted LLM call for the duration of the block."""
+        grant = await self.acquire(tokens, max_wait)
+        try:
+            yield grant
+        finally:
+            await self.release(grant)
+
+    def snapshot(self):
+        return {
+            "limits": {"rpm": LLM_RPM, "tpm": LLM_TPM, "max_concurrency": LLM_MAX_CONCURRENCY},
+            "queued": self.queue_depth(),
+            "classes": self.stats,
+        }
+
+
+scheduler = LLMScheduler(SqliteBucketStore(LLM_SCHEDULER_DB, LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY))
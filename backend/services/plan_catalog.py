@@ -0,0 +1,224 @@
+import asyncio
+import copy
+import datetime
+import os
+import time
+from services.ai_engine import generate_projects, generate_roadmap, normalize_projects
+from services.db import plan_catalog_col
+from services.jobs import job_queue
+from services.llm_gateway import llm_budget
+from services.llm_scheduler import LLMSaturated, llm_priority
+from services.role_engine import role_engine
+
+# ======================================================
+# Plan Catalog: pre-generated roadmaps + projects, served from memory
+# ======================================================
+
+CATALOG_ENABLED = os.getenv("CATALOG_ENABLED", "0") == "1"     # opt-in
+CATALOG_CORE_SKILLS = int(os.getenv("CATALOG_CORE_SKILLS", "4"))     # 2^n roadmap buckets per role
+CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", str(24 * 3600)))
+CATALOG_RELOAD_SECONDS = int(os.getenv("CATALOG_RELOAD_SECONDS", "300"))
+CATALOG_WARM_CONCURRENCY = int(os.getenv("CATALOG_WARM_CONCURRENCY", "4"))
+CATALOG_LLM_BUDGET = 60
+CATALOG_LLM_WAIT = 300         # seconds an entry keeps retrying while the LLM is saturated
+CATALOG_SCHEMA = 1             # bump when the prompts or the stored shape change
+CATALOG_JOB = "catalog_refresh"
+MIN_PHASES = 3
+MIN_PROJECTS = 2
+
+
+def core_skills(role):
+    """The role's most important skills; which of them a user has picks the bucket."""
+    return role_engine.role_skills(role)[:CATALOG_CORE_SKILLS]
+
+
+def skill_bucket(role, skills):
+    """Bitmask of the role's core skills present in `skills` (case-insensitive)."""
+    have = {s.strip().lower() for s in skills or [] if isinstance(s, str)}
+    return sum(1 << i for i, skill in enumerate(core_skills(role)) if skill.lower() in have)
+
+
+def entry_id(kind, role, bucket=None):
+    return f"{kind}:{role}" if bucket is None else f"{kind}:{role}:{bucket}"
+
+
+def _check_roadmap(roadmap):
+    if len(roadmap.get("roadmap") or []) < MIN_PHASES:
+        raise ValueError(f"roadmap has fewer than {MIN_PHASES} phases")
+    return roadmap
+
+
+def _check_projects(projects):
+    projects = [p for p in normalize_projects(projects) if p["title"] != "Untitled Project"]
+    if len(projects) < MIN_PROJECTS:
+        raise ValueError(f"fewer than {MIN_PROJECTS} usable projects")
+    return projects
+
+
+class PlanCatalog:
+    """
+    Roadmaps per role × skill bucket and project lists per role, generated
+    offline by a warmer job and stored in the `plan_catalog` collection.
+
+    Users are bucketed by which of the role's CATALOG_CORE_SKILLS most
+    important skills they already have, so students with similar profiles
+    share one validated roadmap. Each worker keeps the whole catalog (a few
+    hundred small documents) in a dict, reloaded every CATALOG_RELOAD_SECONDS:
+    serving is one dict lookup, no Mongo or GPT on the request path. Roles
+    outside data/roles.json (or entries not warmed yet) are generated live.
+    Serving and the scheduled refresh are opt-in (CATALOG_ENABLED=1); until
+    then every plan is generated live.
+
+    Every entry carries the version (warmer job id) that wrote it. A refresh
+    is scheduled as a job per CATALOG_REFRESH_SECONDS window, so one worker
+    does it; an interrupted refresh resumes, skipping entries already at its
+    version, and a failed generation keeps the previous entry.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._entries = {}
+        self._task = None
+        self.loaded_at = None
+        self.stats = {"hits": 0, "partial": 0, "misses": 0}
+
+    # ---------------- Serving ----------------
+
+    def lookup(self, skills, role):
+        """{"roadmap" | "projects": value} for what the catalog covers."""
+        if not CATALOG_ENABLED:
+            return {}
+        known = {}
+        roadmap = self._entries.get(entry_id("roadmap", role, skill_bucket(role, skills)))
+        if roadmap is not None:
+            known["roadmap"] = copy.deepcopy(roadmap)
+        projects = self._entries.get(entry_id("projects", role))
+        if projects is not None:
+            known["projects"] = copy.deepcopy(projects)
+        self.stats["hits" if len(known) == 2 else "partial" if known else "misses"] += 1
+        return known
+
+    async def load(self):
+        entries = {}
+        async for doc in self.collection.find({"schema": CATALOG_SCHEMA}, {"value": 1}):
+            entries[doc["_id"]] = doc["value"]
+        self._entries = entries
+        self.loaded_at = datetime.datetime.utcnow()
+
+    # ---------------- Warming ----------------
+
+    def plan(self, roles=None):
+        """Every (kind, role, bucket, skills) the catalog should hold."""
+        entries = []
+        for role in roles or role_engine.role_names:
+            core = core_skills(role)
+            entries.append(("projects", role, None, []))
+            for bucket in range(2 ** len(core)):
+                entries.append(("roadmap", role, bucket,
+                                [skill for i, skill in enumerate(core) if bucket & (1 << i)]))
+        return entries
+
+    async def _generate(self, kind, role, skills, heartbeat):
+        waited = 0
+        while True:
+            try:
+                with llm_budget(CATALOG_LLM_BUDGET), llm_priority("planning"):
+                    if kind == "roadmap":
+                        return _check_roadmap(await generate_roadmap(skills, role, fallback=False))
+                    return _check_projects(await generate_projects(role, fallback=False))
+            except LLMSaturated as e:
+                # Warming yields to interactive traffic instead of failing
+                if waited >= CATALOG_LLM_WAIT:
+                    raise
+                waited += e.retry_after
+                await heartbeat("waiting for LLM capacity")
+                await asyncio.sleep(e.retry_after)
+
+    async def warm(self, version, report=None, roles=None):
+        """
+        Generate and validate every planned entry not yet at `version`.
+        Returns counts of generated, skipped (already done) and failed entries.
+        `report` is called after every entry and before every saturation
+        wait, so a job's lease is renewed even while nothing succeeds.
+        """
+        planned = self.plan(roles)
+        done = {doc["_id"] async for doc in self.collection.find(
+            {"version": version, "schema": CATALOG_SCHEMA}, {"_id": 1})}
+        counts = {"generated": 0, "skipped": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(CATALOG_WARM_CONCURRENCY)
+
+        async def heartbeat(note=None):
+            if report is not None:
+                stage = f"warming {sum(counts.values())}/{len(planned)}"
+                await report(f"{stage} ({note})" if note else stage)
+
+        async def warm_one(kind, role, bucket, skills):
+            _id = entry_id(kind, role, bucket)
+            if _id in done:
+                counts["skipped"] += 1
+                return
+            async with semaphore:
+                try:
+                    value = await self._generate(kind, role, skills, heartbeat)
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"⚠️ Catalog entry {_id} not refreshed: {e}")
+                    await heartbeat()
+                    return
+            await self.collection.replace_one({"_id": _id}, {
+                "kind": kind, "role": role, "bucket": bucket, "skills": skills, "value": value,
+                "schema": CATALOG_SCHEMA, "version": version, "generated_at": datetime.datetime.utcnow(),
+            }, upsert=True)
+            counts["generated"] += 1
+            await heartbeat()
+
+        await asyncio.gather(*(warm_one(*entry) for entry in planned))
+        return {"version": version, "entries": len(planned), **counts}
+
+    async def run_job(self, job, report):
+        result = await self.warm(job["_id"], report, job["payload"].get("roles"))
+        await self.load()
+        return result
+
+    # ---------------- Scheduling ----------------
+
+    async def schedule_refresh(self, roles=None, manual=False):
+        """
+        Queue a warmer job. Scheduled refreshes share one idempotency key per
+        CATALOG_REFRESH_SECONDS window, so only one worker runs each of them.
+        """
+        key = None if manual else f"{CATALOG_JOB}:{int(time.time() // CATALOG_REFRESH_SECONDS)}"
+        return await job_queue.enqueue(CATALOG_JOB, None, {"roles": roles}, idempotency_key=key)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.schedule_refresh()
+                await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Plan catalog reload failed: {e}")
+            await asyncio.sleep(CATALOG_RELOAD_SECONDS)
+
+    async def start(self):
+        if CATALOG_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self):
+        return {
+            **self.stats,
+            "enabled": CATALOG_ENABLED,
+            "entries": len(self._entries),
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
+
+
+plan_catalog = PlanCatalog(plan_catalog_col)
+job_queue.register(CATALOG_JOB, plan_catalog.run_job)
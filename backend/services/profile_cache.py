@@ -0,0 +1,253 @@
+import asyncio
+import datetime
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pymongo.errors import OperationFailure, PyMongoError
+from services.db import profile_invalidations_col
+from services.telemetry import PROFILE_CACHE_REQUESTS
+
+# ======================================================
+# Profile Cache: hot user fields per worker, invalidated on write
+# ======================================================
+
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))       # 0 disables the cache
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_SYNC_SECONDS = float(os.getenv("PROFILE_CACHE_SYNC_SECONDS", "1"))
+SYNC_OVERLAP = datetime.timedelta(seconds=5)       # tolerates clock skew between hosts
+INVALIDATION_RETENTION_SECONDS = 600
+
+# Small fields read on nearly every interactive request. Never credentials:
+# login and signup always read the password hash from Mongo.
+HOT_FIELDS = ("name", "email", "selected_role", "suggested_roles", "ai_analysis.skills",
+              "current_interview_session")
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _lookup(doc, path):
+    """(found, value) of a dotted path in a document."""
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return False, None
+        doc = doc[part]
+    return True, doc
+
+
+def _project(entry, fields):
+    """Cached values shaped like a Mongo projection of `fields` (absent paths omitted)."""
+    result = {}
+    for field in fields:
+        if field not in entry:
+            continue
+        *parents, leaf = field.split(".")
+        target = result
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = entry[field]
+    return result
+
+
+class ProfileCache:
+    """
+    Per-worker LRU of HOT_FIELDS by email, with a TTL as the upper bound on
+    staleness. Writes made through users_repo update this worker's entry in
+    place (write-through) and are announced to the other workers through the
+    `profile_invalidations` collection, which each worker follows with a
+    change stream (replica sets) or by polling it every
+    PROFILE_CACHE_SYNC_SECONDS.
+
+    A read that races with an invalidation is not cached: `_pending` holds a
+    token per in-flight miss, and invalidating the email drops it.
+    """
+
+    def __init__(self, collection, ttl=PROFILE_CACHE_TTL, max_entries=PROFILE_CACHE_SIZE):
+        self.collection = collection
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.origin = uuid.uuid4().hex    # skips our own announcements
+        self._entries = OrderedDict()     # email -> (expires_at, {path: value})
+        self._pending = {}
+        self._task = None
+        self.mode = "off"
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "invalidations": 0, "remote_invalidations": 0}
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def covers(self, fields):
+        return self.enabled and bool(fields) and all(field in HOT_FIELDS for field in fields)
+
+    def _count(self, result):
+        self.stats[result] += 1
+        PROFILE_CACHE_REQUESTS.inc(1, result)
+
+    async def get(self, email, fields, load):
+        """
+        Projection of `fields` for `email`, from cache when possible.
+        `load(*HOT_FIELDS)` reads the user from Mongo on a miss.
+        """
+        if not self.covers(fields):
+            self._count("bypassed")
+            return await load(*fields)
+
+        entry = self._entries.get(email)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(email)
+            self._count("hits")
+            return _project(entry[1], fields)
+
+        self._count("misses")
+        token = object()
+        self._pending[email] = token
+        try:
+            doc = await load(*HOT_FIELDS)
+        finally:
+            fresh = self._pending.get(email) is token
+            if fresh:
+                del self._pending[email]
+        if doc is None:
+            return None      # unknown users are not cached; signup must see them at once
+        values = {}
+        for field in HOT_FIELDS:
+            found, value = _lookup(doc, field)
+            if found:
+                values[field] = value
+        if fresh:
+            self._store(email, values)
+        return _project(values, fields)
+
+    def _store(self, email, values):
+        self._entries[email] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(email)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict(self, email):
+        self._entries.pop(email, None)
+        self._pending.pop(email, None)
+
+    # ---------------- Writes ----------------
+
+    async def written(self, email, fields):
+        """
+        After a $set of `fields` on the user: update this worker's entry and
+        tell the other workers. Writes that touch no hot field cost nothing.
+        """
+        if not self.enabled:
+            return
+        roots = {path.split(".")[0] for path in fields}
+        touched = [field for field in HOT_FIELDS if field.split(".")[0] in roots]
+        if not touched:
+            return
+
+        self.stats["invalidations"] += 1
+        self._pending.pop(email, None)
+        entry = self._entries.get(email)
+        if entry is not None:
+            values = dict(entry[1])
+            for path, value in fields.items():
+                for field in touched:
+                    if field == path:
+                        values[field] = value
+                    elif field.startswith(path + "."):      # a parent was replaced
+                        found, value_at = _lookup(value, field[len(path) + 1:])
+                        if found:
+                            values[field] = value_at
+                        else:
+                            values.pop(field, None)
+                    elif path.startswith(field + "."):      # part of a hot value changed
+                        values = None
+                        break
+                if values is None:
+                    break
+            if values is None:
+                self._evict(email)
+            else:
+                self._store(email, values)
+        await self._announce(email)
+
+    async def invalidate(self, email):
+        """Drop the user everywhere (writes that are not plain $set)."""
+        if not self.enabled:
+            return
+        self.stats["invalidations"] += 1
+        self._evict(email)
+        await self._announce(email)
+
+    async def _announce(self, email):
+        try:
+            await self.collection.insert_one({"email": email, "origin": self.origin, "at": _now()})
+        except PyMongoError as e:
+            # Other workers fall back to the TTL for this one
+            print(f"⚠️ Profile invalidation for {email} not announced: {e}")
+
+    # ---------------- Cross-worker sync ----------------
+
+    def _apply(self, doc):
+        if doc.get("origin") != self.origin:
+            self.stats["remote_invalidations"] += 1
+            self._evict(doc["email"])
+
+    async def _follow_change_stream(self):
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        async with await self.collection.watch(pipeline) as stream:
+            self.mode = "change_stream"
+            async for change in stream:
+                self._apply(change["fullDocument"])
+
+    async def _poll(self):
+        self.mode = "polling"
+        since = _now()
+        while True:
+            await asyncio.sleep(PROFILE_CACHE_SYNC_SECONDS)
+            cursor = self.collection.find(
+                {"at": {"$gt": since - SYNC_OVERLAP}, "origin": {"$ne": self.origin}},
+                {"email": 1, "origin": 1, "at": 1})
+            async for doc in cursor:
+                self._apply(doc)
+                since = max(since, doc["at"].replace(tzinfo=datetime.timezone.utc))
+
+    async def _sync(self):
+        while True:
+            try:
+                try:
+                    await self._follow_change_stream()
+                except OperationFailure:
+                    # Standalone server: no change streams
+                    await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Profile cache sync failed ({e}); retrying")
+                self._entries.clear()     # may have missed invalidations meanwhile
+                await asyncio.sleep(PROFILE_CACHE_SYNC_SECONDS)
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("at", expireAfterSeconds=INVALIDATION_RETENTION_SECONDS)
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._sync())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "sync": self.mode,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
+
+
+profile_cache = ProfileCache(profile_invalidations_col)
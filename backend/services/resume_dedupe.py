@@ -0,0 +1,148 @@
+import datetime
+import hashlib
+import os
+import re
+import numpy as np
+from pymongo import UpdateOne
+from services.db import resumes_col
+
+# ======================================================
+# Resume Fingerprints (exact + near-duplicate)
+# ======================================================
+
+NEAR_DUP_THRESHOLD = float(os.getenv("RESUME_NEAR_DUP_THRESHOLD", "0.85"))
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+BANDS = 16                      # 16 bands × 4 rows → ~0.85 similarity knee
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE = (1 << 61) - 1
+_rng = np.random.RandomState(1729)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+
+# Records any lookup may reuse: not a failed analysis. Older records have no
+# `fallback` flag, only the placeholder summary (ai_engine.analysis_unavailable).
+USABLE = {
+    "analysis.fallback": {"$ne": True},
+    "analysis.ai_summary": {"$not": re.compile(r"^⚠️ AI analysis unavailable")},
+}
+
+
+def byte_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def normalize_text(text):
+    """Lowercase, drop punctuation and collapse whitespace, so re-exports match."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w+#.]+", " ", text.lower())).strip()
+
+
+def text_hash(normalized):
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def minhash(normalized):
+    """64-permutation MinHash signature over 5-word shingles."""
+    words = normalized.split()
+    shingles = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+         for s in shingles],
+        dtype=np.uint64
+    )
+    # (a·x + b) mod p per permutation; 32-bit inputs keep a·x inside uint64
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE
+    return permuted.min(axis=0).tolist()
+
+
+def lsh_bands(signature):
+    """Band keys for candidate lookup: similar signatures share at least one."""
+    return [
+        f"{b}:" + hashlib.md5(str(signature[b * ROWS:(b + 1) * ROWS]).encode()).hexdigest()[:16]
+        for b in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+# ======================================================
+# Analysis store (resumes collection)
+# ======================================================
+
+
+async def find_by_byte_hash(digest, email):
+    """
+    Stored analysis for a byte-identical upload (by SHA-256) by this user,
+    skipping parsing entirely. Records of other users are not matched.
+    """
+    return await resumes_col.find_one(
+        {"byte_hashes": digest, "$or": [{"email": email}, {"uploaders": email}], **USABLE})
+
+
+async def find_by_bytes(content, email):
+    return await find_by_byte_hash(byte_hash(content), email)
+
+
+async def find_by_text(normalized):
+    """Stored analysis for the same text (e.g. re-exported PDF)."""
+    return await resumes_col.find_one({"text_hash": text_hash(normalized), **USABLE})
+
+
+async def find_near_duplicate(email, signature, threshold=NEAR_DUP_THRESHOLD):
+    """
+    Best match among this user's earlier resumes whose estimated similarity
+    is at least `threshold`, as (record, similarity), or (None, 0).
+    """
+    best, best_sim = None, 0.0
+    cursor = resumes_col.find(
+        {"email": email, "bands": {"$in": lsh_bands(signature)}, **USABLE},
+        {"minhash": 1, "analysis": 1, "skills": 1}
+    )
+    async for record in cursor:
+        sim = similarity(signature, record["minhash"])
+        if sim >= threshold and sim > best_sim:
+            best, best_sim = record, sim
+    return best, best_sim
+
+
+def analysis_upsert(email, content, normalized, signature, resume_text, analysis, sections=None):
+    """The write behind save_analysis, as an operation for bulk_write."""
+    return UpdateOne(
+        {"text_hash": text_hash(normalized)},
+        {
+            "$setOnInsert": {"email": email},
+            "$set": {
+                "minhash": signature,
+                "bands": lsh_bands(signature),
+                "resume_text": resume_text,
+                "sections": sections,
+                "analysis": analysis,
+                "updated_at": datetime.datetime.utcnow(),
+            },
+            "$addToSet": {"byte_hashes": byte_hash(content), "uploaders": email},
+        },
+        upsert=True
+    )
+
+
+async def save_analysis(email, content, normalized, signature, resume_text, analysis, sections=None):
+    """
+    Store (or extend) the record for this resume text. The record stays owned
+    by its first uploader, which scopes near-duplicate lookups per user;
+    everyone who uploaded it is in `uploaders`, which scopes byte lookups.
+    """
+    await resumes_col.bulk_write(
+        [analysis_upsert(email, content, normalized, signature, resume_text, analysis, sections)])
+
+
+async def ensure_indexes():
+    await resumes_col.create_index("text_hash", unique=True)
+    await resumes_col.create_index("byte_hashes")
+    await resumes_col.create_index([("email", 1), ("bands", 1)])
@@ -1,13 +1,156 @@
 import docx2txt
 import PyPDF2
+import asyncio
+import hashlib
 import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from starlette.concurrency import run_in_threadpool
+from services.telemetry import span
 
+# ======================================================
+# Limits
+# ======================================================
 
-def extract_text(file_bytes, filename):
-    if filename.endswith(".pdf"):
+MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "30"))
+MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", "40000"))
+PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "20"))
+PARSER_PROCESSES = int(os.getenv("RESUME_PARSER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+
+UPLOAD_CHUNK = 64 * 1024
+SPOOL_IN_MEMORY = 1024 * 1024
+
+
+class ResumeTooLarge(ValueError):
+    pass
+
+
+class ResumeParseTimeout(ValueError):
+    pass
+
+# ======================================================
+# Upload streaming
+# ======================================================
+
+
+async def spool_upload(file, max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Streams an UploadFile into a spooled temp file in chunks (on disk past
+    SPOOL_IN_MEMORY), refusing anything over `max_bytes` without reading the
+    rest of it. Returns the file positioned at 0; the caller closes it.
+    """
+    size = 0
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_IN_MEMORY)
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResumeTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def read_upload(file, max_bytes=MAX_UPLOAD_BYTES):
+    """spool_upload for small uploads that are parsed whole (a CSV roster): the bytes."""
+    with await spool_upload(file, max_bytes) as spool:
+        return spool.read()
+
+
+def spool_digest(spool):
+    """SHA-256 hex digest of a spooled upload, read in chunks; leaves it at 0."""
+    digest = hashlib.sha256()
+    spool.seek(0)
+    while chunk := spool.read(UPLOAD_CHUNK):
+        digest.update(chunk)
+    spool.seek(0)
+    return digest.hexdigest()
+
+# ======================================================
+# Extraction (runs inside the parser process pool)
+# ======================================================
+
+
+def extract_text(file_bytes, filename, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """
+    Extract plain text from a PDF, DOCX or text upload.
+    Reads at most `max_pages` PDF pages and stops once `max_chars` is reached.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".pdf"):
         reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-        return " ".join([p.extract_text() or "" for p in reader.pages])
-    elif filename.endswith(".docx"):
-        return docx2txt.process(io.BytesIO(file_bytes))
+        parts, total = [], 0
+        for i, page in enumerate(reader.pages):
+            if i >= max_pages or total >= max_chars:
+                break
+            text = page.extract_text() or ""
+            parts.append(text)
+            total += len(text) + 1
+        return " ".join(parts)[:max_chars]
+    elif name.endswith(".docx"):
+        return docx2txt.process(io.BytesIO(file_bytes))[:max_chars]
     else:
-        return file_bytes.decode("utf-8", errors="ignore")
+        return file_bytes[:max_chars * 4].decode("utf-8", errors="ignore")[:max_chars]
+
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # "spawn" keeps forked children from inheriting the event loop's threads
+        _pool = ProcessPoolExecutor(
+            max_workers=PARSER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _recycle_pool():
+    """
+    Drop a pool whose worker is stuck on a pathological document. The executor
+    has no public way to kill a running task, so its processes are terminated;
+    other parses in flight on that pool fail too (their jobs are retried).
+    """
+    global _pool
+    pool, _pool = _pool, None
+    if pool is None:
+        return
+    processes = list(getattr(pool, "_processes", {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+async def extract_text_async(file_bytes, filename, timeout=PARSE_TIMEOUT):
+    """
+    Run PDF/DOCX extraction in the parser process pool with a per-document
+    timeout, so a huge or malformed upload cannot pin the event loop or a
+    request worker. RESUME_PARSER_PROCESSES=0 falls back to the thread pool.
+    """
+    with span("extract"):
+        if PARSER_PROCESSES <= 0:
+            return await asyncio.wait_for(
+                run_in_threadpool(extract_text, file_bytes, filename), timeout)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_pool(), extract_text, file_bytes, filename)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            _recycle_pool()
+            raise ResumeParseTimeout(f"Parsing {filename} took longer than {timeout}s")
+
+
+def shutdown_parser_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,205 @@
+from gridfs.errors import NoFile
+from services.ai_engine import analyze_resume, extract_skills, suggest_roles_from_skills
+from services import resume_dedupe
+from services.db import resume_uploads
+from services.jobs import job_queue
+from services.llm_gateway import llm_budget
+from services.llm_scheduler import llm_priority
+from services.resume_parser import extract_text_async
+from services.resume_sections import compact_resume, saved_sections, segment_resume
+from services.roadmap_diff import refresh_roadmap
+from services.users_repo import get_user, update_user
+
+# ======================================================
+# Resume Analysis Pipeline (runs on the job queue)
+# ======================================================
+
+RESUME_JOB = "resume_analysis"
+RESUME_LLM_BUDGET = 60  # seconds of GPT time per analysis job
+
+
+def resume_idempotency_key(email, digest, mode):
+    """Same user + same bytes (their SHA-256) + same endpoint → same job."""
+    return f"{RESUME_JOB}:{mode}:{email}:{digest}"
+
+
+def _job_key(email, digest, mode, idempotency_key):
+    # An explicit Idempotency-Key header wins over the content-derived key
+    if idempotency_key:
+        return f"{RESUME_JOB}:{email}:{idempotency_key}"
+    return resume_idempotency_key(email, digest, mode)
+
+
+async def find_resume_job(email, digest, mode, idempotency_key=None):
+    """The job an identical earlier upload created, if any."""
+    return await job_queue.find_by_key(_job_key(email, digest, mode, idempotency_key))
+
+
+async def enqueue_resume_analysis(email, spool, digest, filename, mode, idempotency_key=None):
+    """
+    Queue extraction → skills → AI analysis → role suggestion for a spooled
+    upload. `mode` is "register" or "update". The file is streamed into
+    GridFS (resume_uploads) and the job carries only its id, so neither the
+    request nor the job document holds the whole resume.
+    """
+    key = _job_key(email, digest, mode, idempotency_key)
+    existing = await job_queue.find_by_key(key)
+    if existing and existing["status"] != "failed":
+        return existing
+
+    file_id = await resume_uploads.upload_from_stream(
+        filename or "resume", spool, metadata={"email": email, "sha256": digest})
+    job = await job_queue.enqueue(
+        RESUME_JOB,
+        email,
+        {"file_id": file_id, "filename": filename, "mode": mode, "sha256": digest},
+        idempotency_key=key
+    )
+    if job["payload"].get("file_id") != file_id:
+        # A concurrent identical upload queued its own copy first
+        await _discard_upload({"file_id": file_id})
+    return job
+
+
+async def _read_upload(payload):
+    if "content" in payload:
+        # Queued before uploads moved out of the job document
+        return payload["content"]
+    download = await resume_uploads.open_download_stream(payload["file_id"])
+    return await download.read()
+
+
+async def _discard_upload(payload):
+    if "file_id" not in payload:
+        return
+    try:
+        await resume_uploads.delete(payload["file_id"])
+    except NoFile:
+        pass
+
+
+async def _save_to_user(email, resume_text, ai_output, suggested_roles, sections=None):
+    """
+    Save the analysis (and the resume sections, for later prompts), then
+    bring the user's roadmap in line with the new skills: only phases whose
+    focus gained or lost a skill are regenerated.
+    """
+    before = await get_user(email, "selected_role", "roadmap_data", "ai_analysis.skills")
+    fields = {
+        "resume_text": resume_text,
+        "ai_analysis": ai_output,
+        "suggested_roles": suggested_roles
+    }
+    if sections is not None:
+        fields["resume_sections"] = sections
+    await update_user(email, fields)
+    roadmap_update = await refresh_roadmap(email, before, ai_output.get("skills", []))
+    return {"ai_output": ai_output, "suggested_roles": suggested_roles, "roadmap_update": roadmap_update}
+
+
+def same_skills(old, new):
+    """Whether two skill lists name the same skills (order and case aside)."""
+    def normalized(skills):
+        return {s.strip().lower() for s in skills or [] if isinstance(s, str) and s.strip()}
+    return normalized(old) == normalized(new)
+
+
+async def reuse_known_resume(email, digest):
+    """
+    If bytes with this SHA-256 were analyzed before, apply the stored analysis
+    to the user and return the result; otherwise None. No parsing, no
+    analysis call.
+    """
+    record = await resume_dedupe.find_by_byte_hash(digest, email)
+    if not record:
+        return None
+    ai_output = {**record["analysis"], "deduplicated": True}
+    suggested_roles = suggest_roles_from_skills(ai_output.get("skills", []))
+    return await _save_to_user(email, record["resume_text"], ai_output, suggested_roles, record.get("sections"))
+
+
+async def process_resume_job(job, report):
+    """
+    Job handler: each stage is reported so /jobs/{id} can show progress.
+    Byte- or text-identical resumes reuse their stored analysis; a
+    near-duplicate of the user's earlier resume with the same skills keeps
+    its AI summary (fresh local skills + roles). If the skills changed, the
+    summary would describe the old resume, so it is analyzed again. The upload is removed from
+    GridFS once the job is done or has used its last attempt.
+    """
+    payload = job["payload"]
+    try:
+        result = await _process_upload(job, report)
+    except Exception:
+        if job["attempts"] >= job_queue.max_attempts:
+            await _discard_upload(payload)
+        raise
+    await _discard_upload(payload)
+    return result
+
+
+async def _process_upload(job, report):
+    payload = job["payload"]
+    email = job["email"]
+
+    await report("fingerprinting")
+    content = await _read_upload(payload)
+    reused = await reuse_known_resume(email, payload.get("sha256") or resume_dedupe.byte_hash(content))
+    if reused:
+        return reused
+
+    await report("extracting")
+    text = await extract_text_async(content, payload["filename"])
+    normalized = resume_dedupe.normalize_text(text)
+
+    await report("extracting_skills")
+    skills = extract_skills(text)
+    sections = segment_resume(text)
+
+    await report("analyzing")
+    signature = resume_dedupe.minhash(normalized)
+    record = await resume_dedupe.find_by_text(normalized)
+    if record:
+        ai_output = {**record["analysis"], "skills": skills, "deduplicated": True}
+    else:
+        previous, sim = await resume_dedupe.find_near_duplicate(email, signature)
+        if previous and same_skills(previous["analysis"].get("skills"), skills):
+            ai_output = {
+                "ai_summary": previous["analysis"].get("ai_summary", ""),
+                "skills": skills,
+                "incremental": True,
+                "similarity": round(sim, 3)
+            }
+        else:
+            with llm_budget(RESUME_LLM_BUDGET), llm_priority("resume"):
+                ai_output = await analyze_resume(text, "general", skills=skills, sections=sections)
+
+    await report("saving")
+    return await store_resume_analysis(email, content, text, ai_output, normalized, signature, sections)
+
+
+async def store_resume_analysis(email, content, text, ai_output, normalized=None, signature=None,
+                                sections=None):
+    """
+    Suggest roles for a finished analysis, record it for future dedupe and save
+    it on the user. Shared by the job handler and the streaming endpoint.
+    The stored resume_text is a compact, skills-first digest of the sections
+    rather than the first characters of the file.
+    """
+    if normalized is None:
+        normalized = resume_dedupe.normalize_text(text)
+    if signature is None:
+        signature = resume_dedupe.minhash(normalized)
+    if sections is None:
+        sections = segment_resume(text)
+    suggested_roles = suggest_roles_from_skills(ai_output["skills"])
+    resume_text, sections = compact_resume(sections), saved_sections(sections)
+
+    if not ai_output.get("fallback"):
+        # A placeholder from a failed analysis is shown once, never reused
+        stored = {k: v for k, v in ai_output.items() if k not in ("deduplicated", "incremental", "similarity")}
+        await resume_dedupe.save_analysis(email, content, normalized, signature, resume_text, stored, sections)
+    return await _save_to_user(email, resume_text, ai_output, suggested_roles, sections)
+
+
+job_queue.register(RESUME_JOB, process_resume_job)
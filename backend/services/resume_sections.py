@@ -0,0 +1,105 @@
+import os
+import re
+from services.token_budget import fit_sections, truncate_tokens
+
+# ======================================================
+# Resume Sections: local segmentation by headings
+# ======================================================
+
+RESUME_PROMPT_TOKENS = int(os.getenv("RESUME_PROMPT_TOKENS", "1500"))    # resume part of the analysis prompt
+RESUME_STORED_TOKENS = int(os.getenv("RESUME_STORED_TOKENS", "400"))     # compact `resume_text` on the user
+SECTION_MAX_TOKENS = 1500          # per saved section, bounds the document size
+
+# A heading matches whole or by its last words, so "Academic Projects" is projects
+SECTION_HEADINGS = {
+    "projects": ("projects", "project work", "personal projects", "academic projects", "key projects"),
+    "certifications": ("certifications", "certification", "certificates", "licenses", "courses",
+                       "licenses and certifications", "online courses"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools", "tools and technologies", "skills and tools",
+               "programming languages", "languages and frameworks", "languages and tools",
+               "frameworks", "computer languages"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship", "internship experience"),
+    "education": ("education", "academics", "academic background", "qualifications",
+                  "educational qualifications", "relevant coursework", "coursework"),
+    "summary": ("summary", "professional summary", "profile", "objective", "career objective", "about me"),
+    "other": ("achievements", "awards", "publications", "activities", "extracurricular activities",
+              "interests", "hobbies", "languages", "spoken languages", "foreign languages",
+              "references", "volunteering", "leadership"),
+}
+
+# Only as the whole heading: "Programming Languages" is a skills list, not "other"
+WHOLE_HEADING_ONLY = {"languages"}
+
+# What an analysis needs most when the resume does not fit; contact details last
+ANALYSIS_PRIORITY = ("skills", "experience", "projects", "certifications", "summary", "education", "other", "header")
+
+MAX_HEADING_WORDS = 5
+_NON_WORD = re.compile(r"[^a-z ]+")
+_HEADING_TO_SECTION = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+
+def heading_section(line):
+    """The section a line opens ("Technical Skills:", "WORK EXPERIENCE"), or None."""
+    stripped = line.strip().strip("#*•-–—|:").strip()
+    if not stripped or "," in stripped or ":" in stripped or stripped.endswith("."):
+        return None
+    words = _NON_WORD.sub(" ", stripped.lower().replace("&", " and ")).split()
+    if not words or len(words) > MAX_HEADING_WORDS:
+        return None
+    phrase = " ".join(words)
+    if phrase in _HEADING_TO_SECTION:
+        return _HEADING_TO_SECTION[phrase]
+    # A qualifier in front: "Relevant Work Experience", "Selected Projects"
+    for n in range(len(words) - 1, 0, -1):
+        suffix = " ".join(words[-n:])
+        section = None if suffix in WHOLE_HEADING_ONLY else _HEADING_TO_SECTION.get(suffix)
+        if section is not None:
+            return section
+    return None
+
+
+def segment_resume(text):
+    """
+    {section: text} from the headings in the resume. Text before the first
+    heading is the `header` (name, contact); repeated headings are merged.
+    A resume without recognizable headings is returned whole as `other`.
+    """
+    sections, current, lines = {}, "header", []
+
+    def close():
+        body = "\n".join(lines).strip()
+        if body:
+            sections[current] = f"{sections[current]}\n{body}" if current in sections else body
+
+    found = False
+    for line in (text or "").splitlines():
+        section = heading_section(line)
+        if section is None:
+            lines.append(line)
+            continue
+        found = True
+        close()
+        current, lines = section, []
+    close()
+
+    if not found:
+        body = (text or "").strip()
+        return {"other": body} if body else {}
+    return sections
+
+
+def saved_sections(sections):
+    """Sections as stored on the user, each capped at SECTION_MAX_TOKENS."""
+    return {name: truncate_tokens(body, SECTION_MAX_TOKENS) for name, body in sections.items()}
+
+
+def compact_resume(sections, budget=RESUME_STORED_TOKENS):
+    """Short resume text for the profile: skills and experience first, not the first N characters."""
+    return fit_sections(sections, budget, ANALYSIS_PRIORITY)[0]
+
+
+def analysis_text(sections, budget=RESUME_PROMPT_TOKENS):
+    """(resume text for the analysis prompt, fill report) within `budget` tokens."""
+    return fit_sections(sections, budget, ANALYSIS_PRIORITY)
@@ -0,0 +1,110 @@
+import asyncio
+import copy
+import re
+from services.ai_engine import extract_skills, regenerate_phase
+from services.llm_gateway import llm_budget
+from services.users_repo import update_user
+
+# ======================================================
+# Roadmap Diff: regenerate only the phases a skill change affects
+# ======================================================
+
+ROADMAP_UPDATE_LLM_BUDGET = 20
+_PHASE_NUMBER = re.compile(r"^\s*phase\s+\d+\s*[:\-–]\s*", re.IGNORECASE)
+
+
+def _by_lower(skills):
+    return {s.strip().lower(): s.strip() for s in skills or [] if isinstance(s, str) and s.strip()}
+
+
+def _keep_number(old_title, new_title):
+    """The regenerated phase keeps the old "Phase N:" label, whatever GPT wrote."""
+    label = _PHASE_NUMBER.match(old_title or "")
+    if not label:
+        return new_title
+    return label.group(0) + _PHASE_NUMBER.sub("", new_title or "")
+
+
+def phase_topics(phase):
+    """Lower-cased skills a phase teaches: its focus topics, raw and as canonical skills."""
+    focus = [topic for topic in phase.get("focus") or [] if isinstance(topic, str)]
+    return {topic.strip().lower() for topic in focus} | \
+        {skill.lower() for skill in extract_skills(", ".join(focus))}
+
+
+def diff_roadmap(roadmap, old_skills, new_skills):
+    """
+    [{"index", "covered", "missing"}] for each phase whose focus includes a
+    skill the user gained (now covered) or no longer shows (newly missing).
+    Phases the skill change does not touch are not listed.
+    """
+    old, new = _by_lower(old_skills), _by_lower(new_skills)
+    gained = {key: name for key, name in new.items() if key not in old}
+    lost = {key: name for key, name in old.items() if key not in new}
+    changes = []
+    for index, phase in enumerate(roadmap.get("roadmap") or []):
+        topics = phase_topics(phase)
+        covered = sorted(name for key, name in gained.items() if key in topics)
+        missing = sorted(name for key, name in lost.items() if key in topics)
+        if covered or missing:
+            changes.append({"index": index, "covered": covered, "missing": missing})
+    return changes
+
+
+async def update_roadmap(email, role, roadmap, old_skills, new_skills):
+    """
+    Regenerate the affected phases of the user's roadmap (one small prompt
+    each, concurrently) and save it; the other phases stay as they are.
+    Saved only if the user still has this exact roadmap, so a concurrent
+    /select_role wins. Returns a summary, or None when nothing changed.
+    """
+    changes = diff_roadmap(roadmap, old_skills, new_skills)
+    if not changes:
+        return None
+
+    phases = roadmap["roadmap"]
+    with llm_budget(ROADMAP_UPDATE_LLM_BUDGET):
+        results = await asyncio.gather(*(
+            regenerate_phase(role, phases[c["index"]], new_skills, c["covered"], c["missing"])
+            for c in changes
+        ))
+
+    updated = copy.deepcopy(roadmap)
+    regenerated = []
+    for change, phase in zip(changes, results):
+        if phase is None:
+            continue
+        old_phase = updated["roadmap"][change["index"]]
+        old_weeks = old_phase.get("duration_weeks", 0)
+        updated["roadmap"][change["index"]] = {**phase, "phase": _keep_number(old_phase.get("phase"), phase["phase"])}
+        updated["timeline_weeks"] = max(1, updated.get("timeline_weeks", 0) + phase["duration_weeks"] - old_weeks)
+        regenerated.append(change["index"])
+
+    saved = False
+    if regenerated:
+        saved = await update_user(email, {"roadmap_data": updated},
+                                  match={"selected_role": role, "roadmap_data": roadmap})
+    return {
+        "changes": changes,
+        "regenerated": regenerated if saved else [],
+        "unchanged": len(phases) - (len(regenerated) if saved else 0),
+    }
+
+
+async def refresh_roadmap(email, before, new_skills):
+    """
+    After a resume update: `before` holds the user's selected_role,
+    roadmap_data and ai_analysis.skills from before the update.
+    """
+    if not before:
+        return None
+    role, roadmap = before.get("selected_role"), before.get("roadmap_data")
+    if not role or not isinstance(roadmap, dict) or not roadmap.get("roadmap"):
+        return None
+    old_skills = (before.get("ai_analysis") or {}).get("skills") or []
+    try:
+        return await update_roadmap(email, role, roadmap, old_skills, new_skills)
+    except Exception as e:
+        # The analysis is saved either way; the roadmap just stays as it was
+        print(f"⚠️ Roadmap update for {email} skipped: {e}")
+        return None
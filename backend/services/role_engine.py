@@ -0,0 +1,123 @@
+import json
+import os
+import numpy as np
+from scipy import sparse
+
+# ======================================================
+# Role Scoring Engine (sparse role × skill matrix)
+# ======================================================
+
+ROLES_PATH = os.getenv(
+    "ROLES_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "roles.json")
+)
+
+
+class RoleEngine:
+    """
+    Scores skill profiles against every role with one sparse matrix product.
+
+    W[r, s] is the weight of skill s for role r (from data/roles.json), optionally
+    scaled by an IDF factor so skills shared by many roles count for less. A
+    profile's score for a role is the fraction of that role's total weight it
+    covers, i.e. in [0, 1].
+    """
+
+    def __init__(self, roles, use_idf=True):
+        self.role_names = [r["name"] for r in roles]
+        self.skill_names = sorted({s for r in roles for s in r["skills"]})
+        self.skill_index = {s: i for i, s in enumerate(self.skill_names)}
+
+        rows, cols, vals = [], [], []
+        for r, role in enumerate(roles):
+            for skill, weight in role["skills"].items():
+                rows.append(r)
+                cols.append(self.skill_index[skill])
+                vals.append(float(weight))
+        shape = (len(self.role_names), len(self.skill_names))
+        weights = sparse.csr_matrix((vals, (rows, cols)), shape=shape)
+
+        if use_idf:
+            doc_freq = np.asarray((weights > 0).sum(axis=0)).ravel()
+            idf = np.log((1 + shape[0]) / (1 + doc_freq)) + 1.0
+            weights = weights @ sparse.diags(idf)
+
+        self.weights = sparse.csr_matrix(weights)
+        self.weights_t = self.weights.T.tocsr()
+        self.totals = np.asarray(self.weights.sum(axis=1)).ravel()
+        self.totals[self.totals == 0] = 1.0
+
+    @classmethod
+    def from_file(cls, path=ROLES_PATH, use_idf=True):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["roles"], use_idf=use_idf)
+
+    # ---------------- Vectorization ----------------
+
+    def vectorize(self, skill_lists):
+        """Binary CSR matrix (profiles × skills); unknown skills are ignored."""
+        rows, cols = [], []
+        for i, skills in enumerate(skill_lists):
+            for skill in set(skills):
+                j = self.skill_index.get(skill)
+                if j is not None:
+                    rows.append(i)
+                    cols.append(j)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(skill_lists), len(self.skill_names))
+        )
+
+    # ---------------- Scoring ----------------
+
+    def score_matrix(self, profiles):
+        """Dense (profiles × roles) coverage scores for a CSR profile matrix."""
+        covered = (profiles @ self.weights_t).toarray()
+        return covered / self.totals
+
+    def top_k_batch(self, profiles, k=5):
+        """
+        Top-k role indices and scores per profile, best first.
+        Returns (indices, scores), both shaped (profiles, k).
+        """
+        scores = self.score_matrix(profiles)
+        k = min(k, scores.shape[1])
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+    def role_skills(self, role):
+        """The role's skills, most important first (empty for unknown roles)."""
+        if role not in self.role_names:
+            return []
+        row = self.weights.getrow(self.role_names.index(role))
+        ranked = sorted(zip(row.indices, row.data), key=lambda x: -x[1])
+        return [self.skill_names[j] for j, _ in ranked]
+
+    def missing_skills(self, role, skills, limit=5):
+        """The role's skills absent from `skills`, most important first."""
+        have = set(skills)
+        return [skill for skill in self.role_skills(role) if skill not in have][:limit]
+
+    def rank(self, skills, k=5):
+        """
+        Top-k roles for one skill list:
+        [{"role", "score", "missing_skills"}], skipping roles with zero coverage.
+        """
+        indices, scores = self.top_k_batch(self.vectorize([skills]), k)
+        results = []
+        for r, score in zip(indices[0], scores[0]):
+            if score <= 0:
+                continue
+            role = self.role_names[r]
+            results.append({
+                "role": role,
+                "score": round(float(score), 3),
+                "missing_skills": self.missing_skills(role, skills)
+            })
+        return results
+
+
+# Built once per process
+role_engine = RoleEngine.from_file()
@@ -0,0 +1,56 @@
+import asyncio
+
+# ======================================================
+# Single-flight: coalesce identical in-flight calls
+# ======================================================
+
+
+class _Call:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Concurrent callers that ask for the same key share one execution of `fn`.
+
+    - The first caller (leader) starts `fn()` as a task; later callers (followers)
+      await the same task until it finishes.
+    - Errors propagate to every waiter; nothing is remembered once the call ends,
+      so the next caller after a failure retries upstream.
+    - A cancelled caller only stops waiting. The shared task is cancelled only
+      when its last waiter goes away.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key, fn):
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["followers"] += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up: stop the upstream call and let the next
+                # caller start a fresh one instead of joining a cancelled task.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self):
+        return len(self._calls)
@@ -0,0 +1,212 @@
+import copy
+from collections import Counter
+from pymongo import ReturnDocument, UpdateOne
+from services.db import skill_rollups_col, users_col
+from services.role_engine import role_engine
+
+# ======================================================
+# Skill Analytics: cohort × role × skill rollups kept by deltas
+# ======================================================
+
+# User fields a rollup depends on; $set of anything else skips the rollups
+TRACKED_ROOTS = ("cohort", "selected_role", "ai_analysis")
+TRACKED_PROJECTION = {"_id": 0, "cohort": 1, "selected_role": 1, "ai_analysis.skills": 1}
+MEMBERS = None      # `skill` of the row counting the users themselves
+
+
+def _set_path(doc, path, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        if not isinstance(doc.get(part), dict):
+            doc[part] = {}
+        doc = doc[part]
+    doc[leaf] = value
+
+
+def apply_set(doc, fields):
+    """`doc` as it reads after `{"$set": fields}` (tracked paths only)."""
+    after = copy.deepcopy(doc)
+    for path, value in fields.items():
+        if path.split(".")[0] in TRACKED_ROOTS:
+            _set_path(after, path, value)
+    return after
+
+
+def rollup_keys(user):
+    """
+    The (cohort, role, skill) rows a user counts in: one MEMBERS row plus one
+    per distinct skill. Users without a cohort or a selected role count nowhere.
+    """
+    cohort, role = user.get("cohort"), user.get("selected_role")
+    if not isinstance(cohort, str) or not cohort or not isinstance(role, str) or not role:
+        return set()
+    analysis = user.get("ai_analysis")
+    skills = analysis.get("skills") if isinstance(analysis, dict) else None
+    keys = {(cohort, role, MEMBERS)}
+    if isinstance(skills, list):
+        keys.update((cohort, role, s.strip()) for s in skills if isinstance(s, str) and s.strip())
+    return keys
+
+
+def rollup_delta(before, after):
+    """Counter of row → +1/-1 turning `before`'s contribution into `after`'s."""
+    old, new = rollup_keys(before or {}), rollup_keys(after or {})
+    delta = Counter({key: 1 for key in new - old})
+    delta.update({key: -1 for key in old - new})
+    return delta
+
+
+def rollup_pipeline():
+    """
+    Aggregation computing every rollup row from users, with the same rules
+    as rollup_keys (trimmed, distinct, non-empty string skills).
+    """
+    skills = {"$setUnion": [{"$filter": {
+        "input": {"$map": {
+            "input": {"$filter": {
+                "input": {"$cond": [{"$isArray": "$ai_analysis.skills"}, "$ai_analysis.skills", []]},
+                "cond": {"$eq": [{"$type": "$$this"}, "string"]},
+            }},
+            "in": {"$trim": {"input": "$$this"}},
+        }},
+        "cond": {"$ne": ["$$this", ""]},
+    }}]}
+    return [
+        {"$match": {"cohort": {"$type": "string", "$ne": ""},
+                    "selected_role": {"$type": "string", "$ne": ""}}},
+        {"$project": {"_id": 0, "cohort": 1, "role": "$selected_role",
+                      "skill": {"$concatArrays": [[MEMBERS], skills]}}},
+        {"$unwind": "$skill"},
+        {"$group": {"_id": {"cohort": "$cohort", "role": "$role", "skill": "$skill"},
+                    "count": {"$sum": 1}}},
+        {"$project": {"_id": 0, "cohort": "$_id.cohort", "role": "$_id.role",
+                      "skill": "$_id.skill", "count": 1}},
+    ]
+
+
+class SkillRollups:
+    """
+    How many users of each cohort target each role (the MEMBERS row) and how
+    many of those have each skill, one document per (cohort, role, skill).
+    Missing-skill counts are members minus holders, for the role's skills
+    from data/roles.json.
+
+    Kept current by deltas: a write touching the tracked fields reads the
+    previous values atomically (find_one_and_update), and only the rows that
+    changed get a $inc. A lost delta (crash between the two writes) is fixed
+    by rebuild(), which recomputes everything with one aggregation.
+    """
+
+    def __init__(self, users, rollups):
+        self.users = users
+        self.rollups = rollups
+
+    @staticmethod
+    def tracks(fields):
+        return any(path.split(".")[0] in TRACKED_ROOTS for path in fields)
+
+    async def set_fields(self, query, fields):
+        """
+        $set `fields` on the user matching `query` and apply the rollup delta.
+        Returns the user's tracked fields before the write, or None if no
+        user matched.
+        """
+        before = await self.users.find_one_and_update(
+            query, {"$set": fields}, projection=TRACKED_PROJECTION,
+            return_document=ReturnDocument.BEFORE)
+        if before is not None:
+            await self.apply(rollup_delta(before, apply_set(before, fields)))
+        return before
+
+    async def apply(self, delta):
+        ops = [
+            UpdateOne({"cohort": cohort, "role": role, "skill": skill},
+                      {"$inc": {"count": change}}, upsert=True)
+            for (cohort, role, skill), change in delta.items() if change
+        ]
+        if not ops:
+            return
+        try:
+            await self.rollups.bulk_write(ops, ordered=False)
+        except Exception as e:
+            print(f"⚠️ Skill rollups drifted (rebuild to fix): {e}")
+
+    # ---------------- Queries ----------------
+
+    async def _counts(self, query):
+        cursor = self.rollups.find({**query, "count": {"$gt": 0}}, {"_id": 0, "skill": 1, "role": 1, "count": 1})
+        return [doc async for doc in cursor]
+
+    async def skill_gaps(self, cohort, role, limit=10):
+        """
+        The role's skills that the cohort's users targeting it lack, most
+        missing first (ties: most important for the role first), plus the
+        skills they have most often.
+        """
+        counts = {doc["skill"]: doc["count"] for doc in await self._counts({"cohort": cohort, "role": role})}
+        members = counts.pop(MEMBERS, 0)
+        gaps = [
+            {"skill": skill, "missing": members - counts.get(skill, 0),
+             "coverage": round(counts.get(skill, 0) / members, 3) if members else 0.0}
+            for skill in role_engine.role_skills(role)
+        ]
+        gaps = sorted((g for g in gaps if g["missing"] > 0), key=lambda g: -g["missing"])
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return {
+            "cohort": cohort,
+            "role": role,
+            "members": members,
+            "missing_skills": gaps[:limit],
+            "top_skills": [{"skill": skill, "count": count} for skill, count in top[:limit]],
+        }
+
+    async def cohort_roles(self, cohort):
+        """Users per targeted role in the cohort, largest first."""
+        docs = await self._counts({"cohort": cohort, "skill": MEMBERS})
+        roles = sorted(((doc["role"], doc["count"]) for doc in docs), key=lambda item: (-item[1], item[0]))
+        return {"cohort": cohort, "members": sum(count for _, count in roles),
+                "roles": [{"role": role, "members": count} for role, count in roles]}
+
+    # ---------------- Rebuild ----------------
+
+    async def rebuild(self):
+        """
+        Recompute every row from users server-side ($out into a scratch
+        collection, then an atomic rename over the live one). Deltas applied
+        while the aggregation runs are lost, so run it when writes are quiet.
+        """
+        scratch = self.rollups.database[self.rollups.name + "_rebuild"]
+        await scratch.drop()
+        await self._create_indexes(scratch)
+        cursor = await self.users.aggregate(rollup_pipeline() + [{"$out": scratch.name}], allowDiskUse=True)
+        await cursor.to_list()
+        rows = await scratch.count_documents({})
+        await scratch.rename(self.rollups.name, dropTarget=True)
+        return {"rows": rows}
+
+    async def verify(self):
+        """
+        Stream the full recompute and compare it with the stored rows.
+        Returns the number of rows checked and those that differ.
+        """
+        stored = {(doc["cohort"], doc["role"], doc["skill"]): doc["count"]
+                  async for doc in self.rollups.find({"count": {"$ne": 0}}, {"_id": 0})}
+        mismatches, checked = [], 0
+        async for doc in await self.users.aggregate(rollup_pipeline(), allowDiskUse=True):
+            key = (doc["cohort"], doc["role"], doc["skill"])
+            checked += 1
+            count = stored.pop(key, 0)
+            if count != doc["count"]:
+                mismatches.append({"key": key, "expected": doc["count"], "stored": count})
+        mismatches.extend({"key": key, "expected": 0, "stored": count} for key, count in stored.items())
+        return {"checked": checked, "mismatches": mismatches}
+
+    @staticmethod
+    async def _create_indexes(collection):
+        await collection.create_index([("cohort", 1), ("role", 1), ("skill", 1)], unique=True)
+
+    async def ensure_indexes(self):
+        await self._create_indexes(self.rollups)
+
+
+skill_rollups = SkillRollups(users_col, skill_rollups_col)
@@ -0,0 +1,84 @@
+import json
+import os
+import re
+
+# ======================================================
+# Skill Taxonomy → Single-pass Matcher
+# ======================================================
+
+SKILLS_PATH = os.getenv(
+    "SKILLS_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.json")
+)
+
+# A skill token must not be glued to other token characters on either side,
+# so "Java" does not fire inside "JavaScript" and "C++"/"C#" keep their symbols.
+_TOKEN_CHARS = r"a-z0-9_+#"
+_BEFORE = rf"(?<![{_TOKEN_CHARS}])"
+_AFTER = rf"(?![{_TOKEN_CHARS}])"
+
+
+def _normalize(alias):
+    return re.sub(r"\s+", " ", alias.strip().lower())
+
+
+def _trie_pattern(node):
+    """
+    Turns a character trie into a prefix-factored regex. At each text position
+    the engine walks at most one branch per character, so matching stays linear
+    in the text length however many skills the taxonomy holds.
+    """
+    branches = []
+    for ch in sorted(k for k in node if k != ""):
+        head = r"\s+" if ch == " " else re.escape(ch)
+        branches.append(head + _trie_pattern(node[ch]))
+    if not branches:
+        return ""
+
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # Terminal nodes make the longer continuation optional (greedy: longest wins)
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class SkillMatcher:
+    """
+    Compiled matcher over a taxonomy of canonical skills and aliases.
+    extract(text) returns canonical names in order of first appearance.
+    """
+
+    def __init__(self, skills):
+        self.canonical = {}
+        trie = {}
+        for skill in skills:
+            names = list(skill.get("aliases", []))
+            if skill.get("match_name", True):
+                names.append(skill["name"])
+            for alias in names:
+                key = _normalize(alias)
+                if not key:
+                    continue
+                self.canonical[key] = skill["name"]
+                node = trie
+                for ch in key:
+                    node = node.setdefault(ch, {})
+                node[""] = True
+
+        self.pattern = re.compile(_BEFORE + "(" + _trie_pattern(trie) + ")" + _AFTER)
+
+    @classmethod
+    def from_file(cls, path=SKILLS_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["skills"])
+
+    def extract(self, text):
+        found = {}
+        for match in self.pattern.finditer(text.lower()):
+            name = self.canonical[_normalize(match.group(1))]
+            found.setdefault(name, None)
+        return list(found)
+
+
+# Loaded once per process
+skill_matcher = SkillMatcher.from_file()
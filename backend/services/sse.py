@@ -0,0 +1,52 @@
+import asyncio
+import json
+from fastapi.responses import StreamingResponse
+
+# ======================================================
+# Server-Sent Events helpers
+# ======================================================
+
+# Strong references so producers outlive a disconnected client
+_producers = set()
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+
+def sse_response(produce):
+    """
+    Streams the events of `produce(emit)` as text/event-stream.
+
+    `produce` runs as its own task, detached from the HTTP connection, so if
+    the client disconnects mid-stream the work still finishes and its final
+    result is still saved. `await emit(event, data)` sends one event; an
+    unexpected exception is sent as an "error" event.
+    """
+    queue = asyncio.Queue()
+
+    async def emit(event, data):
+        queue.put_nowait(sse_event(event, data))
+
+    async def run():
+        try:
+            await produce(emit)
+        except Exception as e:
+            print("⚠️ Stream producer failed:", e)
+            await emit("error", {"detail": str(e), "retry_after": getattr(e, "retry_after", None)})
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    _producers.add(task)
+    task.add_done_callback(_producers.discard)
+
+    async def events():
+        while (item := await queue.get()) is not None:
+            yield item
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
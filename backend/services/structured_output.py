@@ -0,0 +1,122 @@
+import json
+import os
+from pydantic import ValidationError
+from models.llm_schemas import (
+    Evaluation, InterviewQuestionList, ProjectList, QuestionEvaluation, Roadmap, RoadmapPhase
+)
+from services.json_stream import loads_tolerant
+
+# ======================================================
+# Output Schemas (one per kind of GPT JSON reply)
+# ======================================================
+
+# Ask the API to constrain replies to the schema (json_schema response_format).
+# Turned off automatically if the API rejects it.
+STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+
+def rejected_response_format(error):
+    """
+    What a 400 from the API says about the json_schema response_format:
+    "unsupported" (the model or deployment has no structured outputs),
+    "invalid" (this particular schema was refused) or None when the request
+    was bad for some other reason.
+    """
+    message = str(getattr(error, "message", None) or error).lower()
+    if (getattr(error, "param", None) != "response_format"
+            and "response_format" not in message and "json_schema" not in message):
+        return None
+    return "unsupported" if "not supported" in message or "unsupported" in message else "invalid"
+
+
+class SchemaError(ValueError):
+    """A reply that does not match its schema even after repair."""
+
+
+class OutputSchema:
+    """
+    A Pydantic model plus the bookkeeping around it: the response_format sent
+    to the API, tolerant parsing, and per-schema outcome counters.
+
+    `items_key` marks list schemas: the API needs an object at the top level
+    ({"projects": [...]}), but callers get the bare list, and a bare array in
+    the reply (older prompts, cached completions) is accepted too.
+    """
+
+    def __init__(self, name, model, items_key=None):
+        self.name = name
+        self.model = model
+        self.items_key = items_key
+        self.stats = {"direct": 0, "repaired": 0, "retried": 0, "recovered": 0, "failed": 0}
+        self._response_format = None
+
+    def response_format(self):
+        # Built once: model_json_schema() takes milliseconds of loop time per call
+        if self._response_format is None:
+            self._response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": self.name, "schema": self.model.model_json_schema()},
+            }
+        return self._response_format
+
+    def parse_detailed(self, raw):
+        """(value, repaired): repaired is True when the raw text was not plain valid JSON."""
+        try:
+            data, repaired = json.loads(raw), False
+        except (TypeError, ValueError):
+            try:
+                data, repaired = loads_tolerant(raw or ""), True
+            except ValueError as e:
+                raise SchemaError(f"{self.name}: {e}")
+
+        if self.items_key and isinstance(data, list):
+            data = {self.items_key: data}
+        try:
+            value = self.model.model_validate(data).model_dump()
+        except ValidationError as e:
+            raise SchemaError(f"{self.name}: {e.error_count()} validation error(s): {e.errors()[0]['msg']}")
+        return (value[self.items_key] if self.items_key else value), repaired
+
+    def parse(self, raw):
+        """Validated value of a reply; raises SchemaError. Usable as a cache validator."""
+        return self.parse_detailed(raw)[0]
+
+    def record(self, outcome):
+        self.stats[outcome] += 1
+
+    def retry_messages(self, messages, raw, error):
+        """The original conversation plus one short correction turn."""
+        return messages + [
+            {"role": "assistant", "content": (raw or "")[:4000]},
+            {"role": "user", "content": (
+                f"That reply could not be used ({error}). "
+                "Return only the corrected JSON matching the requested format, with no other text."
+            )},
+        ]
+
+    def snapshot(self):
+        total = self.stats["direct"] + self.stats["repaired"] + self.stats["retried"]
+        return {
+            **self.stats,
+            "parse_failure_rate": round(self.stats["retried"] / total, 3) if total else 0.0,
+            "final_failure_rate": round(self.stats["failed"] / total, 3) if total else 0.0,
+        }
+
+
+ROADMAP = OutputSchema("roadmap", Roadmap)
+ROADMAP_PHASE = OutputSchema("roadmap_phase", RoadmapPhase)
+PROJECTS = OutputSchema("projects", ProjectList, items_key="projects")
+INTERVIEW_QUESTIONS = OutputSchema("interview_questions", InterviewQuestionList, items_key="questions")
+EVALUATION = OutputSchema("evaluation", Evaluation)
+QUESTION_EVALUATION = OutputSchema("question_evaluation", QuestionEvaluation)
+
+SCHEMAS = [ROADMAP, ROADMAP_PHASE, PROJECTS, INTERVIEW_QUESTIONS, EVALUATION, QUESTION_EVALUATION]
+
+
+def schema_stats():
+    """
+    Outcome counters per schema: direct (valid JSON), repaired (salvaged
+    locally, a round trip saved), retried (needed the correction call),
+    recovered (the retry worked) and failed (fallback served).
+    """
+    return {schema.name: schema.snapshot() for schema in SCHEMAS}
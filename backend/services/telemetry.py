@@ -0,0 +1,240 @@
+import asyncio
+import bisect
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from pymongo import monitoring
+
+# ======================================================
+# Metrics: Prometheus-format histograms and counters (per process)
+# ======================================================
+# Small in-house registry instead of prometheus_client: observe() is a bisect
+# and two additions, cheap enough to leave on in production. Each uvicorn
+# worker exposes its own numbers at /metrics.
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+LAG_SAMPLE_SECONDS = 0.1
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, [("le", bound)])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {series[-1]}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, *labels):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+HTTP_SECONDS = Histogram(
+    "edubridge_http_request_seconds", "Request latency until the response starts.",
+    ("method", "route", "status"))
+SPAN_SECONDS = Histogram(
+    "edubridge_span_seconds", "Duration of instrumented stages (auth, mongo, extract, llm.*).",
+    ("span",))
+MONGO_SECONDS = Histogram(
+    "edubridge_mongo_command_seconds", "MongoDB command latency by command.",
+    ("command", "outcome"))
+LLM_TOKENS = Histogram(
+    "edubridge_llm_tokens", "Tokens per LLM call.", ("purpose", "kind"), buckets=TOKEN_BUCKETS)
+LLM_TOKENS_TOTAL = Counter(
+    "edubridge_llm_tokens_total", "Tokens used by LLM calls.", ("purpose", "kind"))
+EVENT_LOOP_LAG = Histogram(
+    "edubridge_event_loop_lag_seconds", "How late a periodic timer fired on the event loop.",
+    buckets=LAG_BUCKETS)
+PROFILE_CACHE_REQUESTS = Counter(
+    "edubridge_profile_cache_requests_total", "User profile reads by cache outcome.", ("result",))
+PROMPT_TOKENS = Histogram(
+    "edubridge_prompt_tokens", "Prompt tokens per call, with the whole input (full) and as sent (budgeted).",
+    ("purpose", "stage"), buckets=TOKEN_BUCKETS)
+
+METRICS = [HTTP_SECONDS, SPAN_SECONDS, MONGO_SECONDS, LLM_TOKENS, LLM_TOKENS_TOTAL, EVENT_LOOP_LAG,
+           PROFILE_CACHE_REQUESTS, PROMPT_TOKENS]
+
+
+def render_metrics():
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ======================================================
+# Spans: per-request timings (contextvar) → Server-Timing
+# ======================================================
+
+
+_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def record_span(name, seconds):
+    """Add a finished stage to the histogram and to the current request's timings."""
+    if not TELEMETRY_ENABLED:
+        return
+    SPAN_SECONDS.observe(seconds, name)
+    timings = _timings.get()
+    if timings is not None:
+        total, count = timings.get(name, (0.0, 0))
+        timings[name] = (total + seconds, count + 1)
+
+
+@contextmanager
+def span(name):
+    """
+    Time a block of sync or async code:
+
+        with span("llm.roadmap"):
+            roadmap = await generate_roadmap(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def record_llm_usage(purpose, usage):
+    """Prompt/completion token counts of one LLM call (from the API's `usage`)."""
+    if not TELEMETRY_ENABLED or usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, kind, None)
+        if tokens is not None:
+            LLM_TOKENS.observe(tokens, purpose, kind[:-7])
+            LLM_TOKENS_TOTAL.inc(tokens, purpose, kind[:-7])
+
+
+def server_timing_header(timings, total):
+    """`Server-Timing: auth;dur=1.2, mongo;dur=8.0;desc="3x", ..., total;dur=52.3`"""
+    parts = []
+    for name, (seconds, count) in timings.items():
+        desc = f';desc="{count}x"' if count > 1 else ""
+        parts.append(f"{name};dur={seconds * 1000:.1f}{desc}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware: collects the spans of each request, sends them in a
+    Server-Timing header and records request latency by route template (so
+    /jobs/{job_id} is one series). Streaming responses report the spans
+    finished before their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TELEMETRY_ENABLED:
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        timings = {}
+        token = _timings.set(timings)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_SECONDS.observe(elapsed, scope["method"], route, str(message["status"]))
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings, elapsed).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+
+# ======================================================
+# Event loop lag (blocking code shows up here first)
+# ======================================================
+
+
+async def monitor_event_loop_lag(interval=LAG_SAMPLE_SECONDS):
+    """
+    Sleep `interval` in a loop and record how much later than asked each wake
+    up came. Anything that blocks the loop (sync I/O, CPU work outside the
+    pools) delays every request by the same amount. Run as a background task.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - interval))
+
+# ======================================================
+# MongoDB command timings (driver event listener)
+# ======================================================
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """
+    Times every Mongo command without touching call sites. The async driver
+    publishes events from the task that issued the command, so each one lands
+    in that request's Server-Timing as `mongo`.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        MONGO_SECONDS.observe(seconds, event.command_name, "ok")
+        record_span("mongo", seconds)
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1e6
+        MONGO_SECONDS.observe(seconds, event.command_name, "error")
+        record_span("mongo", seconds)
@@ -0,0 +1,95 @@
+import functools
+import math
+from services.telemetry import PROMPT_TOKENS
+
+try:
+    import tiktoken
+except ImportError:       # optional: falls back to a character estimate
+    tiktoken = None
+
+# ======================================================
+# Token Budget: local token counts, prompts filled by priority
+# ======================================================
+
+TOKENIZER_MODEL = "gpt-4o-mini"
+CHARS_PER_TOKEN = 4       # estimate when no tokenizer is available
+MIN_SECTION_TOKENS = 40   # a section cut shorter than this is dropped instead
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(TOKENIZER_MODEL)
+    except Exception as e:
+        # Unknown model or the encoding files cannot be fetched (offline)
+        print(f"⚠️ Tokenizer unavailable, estimating tokens from characters: {e}")
+        return None
+
+
+def tokenizer_name():
+    encoding = _encoding()
+    return encoding.name if encoding is not None else "chars/4"
+
+
+def count_tokens(text):
+    encoding = _encoding()
+    if encoding is None:
+        return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+    return len(encoding.encode(text or "", disallowed_special=()))
+
+
+def truncate_tokens(text, limit):
+    """`text` cut to at most `limit` tokens, at a line or word boundary when possible."""
+    if count_tokens(text) <= limit:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        cut = text[:limit * CHARS_PER_TOKEN]
+    else:
+        cut = encoding.decode(encoding.encode(text, disallowed_special=())[:limit])
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return cut[:boundary] if boundary > len(cut) // 2 else cut
+
+
+def fit_sections(sections, budget, priority):
+    """
+    Fill up to `budget` tokens with sections in `priority` order; the first
+    one that does not fit is cut, later ones are dropped. Returns (text,
+    report) where the text lists the kept sections under their names, in
+    priority order.
+    """
+    parts, used = [], 0
+    report = {"included": [], "truncated": [], "dropped": []}
+    for name in priority:
+        body = (sections.get(name) or "").strip()
+        if not body:
+            continue
+        block = f"{name.upper()}:\n{body}"
+        tokens = count_tokens(block) + 1
+        remaining = budget - used
+        if tokens <= remaining:
+            parts.append(block)
+            used += tokens
+            report["included"].append(name)
+        elif remaining >= MIN_SECTION_TOKENS:
+            block = truncate_tokens(block, remaining - 1)
+            parts.append(block)
+            used += count_tokens(block) + 1
+            report["truncated"].append(name)
+        else:
+            report["dropped"].append(name)
+    report["tokens"] = used
+    return "\n".join(parts), report
+
+
+def record_prompt(purpose, full_prompt, budgeted_prompt):
+    """
+    Observe the prompt size with and without budgeting (the `full` and
+    `budgeted` series of edubridge_prompt_tokens). Returns both counts.
+    """
+    before, after = count_tokens(full_prompt), count_tokens(budgeted_prompt)
+    PROMPT_TOKENS.observe(before, purpose, "full")
+    PROMPT_TOKENS.observe(after, purpose, "budgeted")
+    return before, after
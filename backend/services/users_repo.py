@@ -0,0 +1,61 @@
+from services.db import users_col
+from services.profile_cache import profile_cache
+from services.skill_analytics import skill_rollups
+
+# ======================================================
+# User Data Access (projection-only reads)
+# ======================================================
+
+
+async def _find_user(email, *fields):
+    projection = {field: 1 for field in fields}
+    projection["_id"] = 0
+    return await users_col.find_one({"email": email}, projection)
+
+
+async def get_user(email, *fields):
+    """
+    Fetch only `fields` of a user (dotted paths allowed), or None if the user
+    does not exist. The returned dict never contains `_id`. Reads of hot
+    profile fields (selected_role, skills, ...) are served by the profile
+    cache; anything else goes to Mongo.
+    """
+    return await profile_cache.get(email, fields, lambda *hot: _find_user(email, *hot))
+
+
+async def user_exists(email):
+    return await get_user(email, "email") is not None
+
+
+async def get_selected_role(email, default="General"):
+    """The user's selected role; None if the user does not exist."""
+    user = await get_user(email, "selected_role")
+    if user is None:
+        return None
+    return user.get("selected_role") or default
+
+
+async def get_dashboard(email):
+    """
+    Profile for the dashboard, minus credentials and any legacy embedded
+    interview history (that now lives in the interviews collection).
+    """
+    return await users_col.find_one(
+        {"email": email}, {"_id": 0, "password": 0, "mock_interview_history": 0})
+
+
+async def update_user(email, fields, match=None):
+    """
+    $set `fields` on the user (optionally only if `match` also holds) and
+    keep the profile cache of every worker and the skill rollups in step.
+    Every write to users other than signup should come through here.
+    Returns whether a user matched.
+    """
+    query = {"email": email, **(match or {})}
+    if skill_rollups.tracks(fields):
+        matched = await skill_rollups.set_fields(query, fields) is not None
+    else:
+        matched = (await users_col.update_one(query, {"$set": fields})).matched_count > 0
+    if matched:
+        await profile_cache.written(email, fields)
+    return matched
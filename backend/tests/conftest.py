@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Run from backend/ like the app: `python -m pytest -q`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import pytest
+from services import ai_streaming
+from services.llm_scheduler import LLMSaturated
+
+PHASE = {"phase": "Phase 1: Basics", "objective": "Learn", "focus": ["Python"], "projects": [],
+         "duration_weeks": 2}
+
+
+def collect(events):
+    async def run():
+        return [event async for event in events]
+    return asyncio.run(run())
+
+
+def failing_stream(error):
+    async def stream_cached(*args, **kwargs):
+        yield '{"target_role": "Data Scientist", "roadmap": [' + json.dumps(PHASE) + ", "
+        raise error
+    return stream_cached
+
+
+def test_partial_roadmap_is_reset_before_the_fallback(monkeypatch):
+    monkeypatch.setattr(ai_streaming, "stream_cached", failing_stream(RuntimeError("connection reset")))
+    events = collect(ai_streaming.stream_roadmap(["Python"], "Data Scientist"))
+
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["phase", "reset", "roadmap"]
+    assert events[1][1]["part"] == "roadmap"
+
+
+def test_saturation_is_raised_not_replaced_by_a_fallback(monkeypatch):
+    monkeypatch.setattr(ai_streaming, "stream_cached", failing_stream(LLMSaturated("planning", 3)))
+    with pytest.raises(LLMSaturated):
+        collect(ai_streaming.stream_roadmap(["Python"], "Data Scientist"))
+    with pytest.raises(LLMSaturated) as raised:
+        collect(ai_streaming.stream_role_plan(["Python"], "Data Scientist", deadline=5))
+    assert raised.value.retry_after == 3
+
+
+def test_deadline_after_partial_phases_resets_the_roadmap(monkeypatch):
+    async def slow_stream(*args, **kwargs):
+        yield '{"target_role": "Data Scientist", "roadmap": [' + json.dumps(PHASE) + ", "
+        await asyncio.sleep(10)
+    monkeypatch.setattr(ai_streaming, "stream_cached", slow_stream)
+    projects = [{"title": "Churn model", "description": "d", "skills": ["Python"]}] * 2
+    events = collect(ai_streaming.stream_role_plan(
+        ["Python"], "Data Scientist", deadline=0.2, known={"projects": projects}))
+
+    kinds = [kind for kind, _ in events]
+    assert kinds.index("phase") < kinds.index("reset") < kinds.index("roadmap")
+    assert [payload["part"] for kind, payload in events if kind == "reset"] == ["roadmap"]
+    assert "projects" in kinds
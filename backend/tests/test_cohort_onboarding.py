@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+from services import cohort_onboarding
+from services.cohort_onboarding import CohortImport
+
+
+class FakeUsers:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        async def docs():
+            for doc in self.docs:
+                if doc["email"] in query["email"]["$in"]:
+                    yield dict(doc)
+        return docs()
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if all(doc.get(k) == v for k, v in query.items()):
+                doc.update(update["$set"])
+                return SimpleNamespace(modified_count=1)
+        return SimpleNamespace(modified_count=0)
+
+
+class FakeImports:
+    async def update_one(self, query, update, upsert=False):
+        pass
+
+
+def test_rerun_reissues_passwords_only_to_users_who_never_logged_in(monkeypatch):
+    users = FakeUsers([
+        {"email": "new@example.com", "import_id": "imp1", "password": "h0", "password_is_temporary": True},
+        {"email": "seen@example.com", "import_id": "imp1", "password": "h1", "password_is_temporary": False},
+        {"email": "own@example.com", "import_id": "imp1", "password": "h2", "password_is_temporary": True},
+    ])
+    monkeypatch.setattr(cohort_onboarding, "users_col", users)
+    monkeypatch.setattr(cohort_onboarding, "cohort_imports_col", FakeImports())
+    monkeypatch.setattr(cohort_onboarding, "hash_password", lambda password: f"hashed:{password}")
+
+    rows = []
+
+    async def emit(event, data):
+        if event == "row":
+            rows.append(data)
+
+    batch = [
+        ({"name": "A", "_member": None}, {"row": 1, "email": "new@example.com"}),
+        ({"name": "B", "_member": None}, {"row": 2, "email": "seen@example.com"}),
+        ({"name": "C", "password": "chosen", "_member": None}, {"row": 3, "email": "own@example.com"}),
+    ]
+    asyncio.run(CohortImport("cse", "imp1", None, emit)._run_batch(batch))
+
+    assert [r["status"] for r in rows] == ["already_imported"] * 3
+    reissued = rows[0]["temporary_password"]
+    assert users.docs[0]["password"] == f"hashed:{reissued}"
+    assert "temporary_password" not in rows[1] and users.docs[1]["password"] == "h1"
+    # The roster set this one's password; the admin already has it
+    assert "temporary_password" not in rows[2] and users.docs[2]["password"] == "h2"
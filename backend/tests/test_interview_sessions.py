@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from pymongo.errors import DuplicateKeyError
+from services import interviews
+from services.interviews import SessionNotFound
+
+EMAIL = "s@example.com"
+ROLE = "Data Scientist"
+
+
+def _matches(doc, query):
+    return all(doc.get(key) == value for key, value in query.items())
+
+
+class FakeInterviews:
+    """The session queries interviews.py sends, with the open_on_demand_session unique index."""
+
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        doc = await self.find_one(query)
+        if doc is not None or not upsert:
+            return doc
+        await asyncio.sleep(0)   # a concurrent caller gets to look too
+        doc = {**query, **update["$setOnInsert"]}
+        if any(_matches(other, {"email": doc["email"], "role": doc["role"], "kind": "session",
+                                "status": "active", "on_demand": True}) for other in self.docs):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.docs.append(doc)
+        return doc
+
+
+@pytest.fixture
+def store(monkeypatch):
+    collection, user = FakeInterviews(), {"email": EMAIL}
+
+    async def get_user(email, *fields):
+        return user
+
+    async def update_user(email, fields, match=None):
+        user.update(fields)
+        return True
+
+    monkeypatch.setattr(interviews, "interviews_col", collection)
+    monkeypatch.setattr(interviews, "get_user", get_user)
+    monkeypatch.setattr(interviews, "update_user", update_user)
+    return collection, user
+
+
+def sessions(collection):
+    return [doc for doc in collection.docs if doc["kind"] == "session"]
+
+
+def test_concurrent_first_answers_share_one_session(store):
+    collection, user = store
+
+    async def run():
+        return await asyncio.gather(*(interviews.resolve_session(EMAIL, role=ROLE) for _ in range(5)))
+
+    ids = asyncio.run(run())
+
+    assert len(set(ids)) == 1 and len(sessions(collection)) == 1
+    assert user["current_interview_session"] == ids[0]
+
+
+def test_answers_after_completion_open_a_new_session(store):
+    collection, user = store
+    first = asyncio.run(interviews.resolve_session(EMAIL, role=ROLE))
+    collection.docs[0]["status"] = "completed"
+
+    second = asyncio.run(interviews.resolve_session(EMAIL, role=ROLE))
+
+    assert second != first and len(sessions(collection)) == 2
+    assert user["current_interview_session"] == second
+    # An evaluation without a session no longer lands on the finished one
+    user["current_interview_session"] = first
+    assert asyncio.run(interviews.resolve_session(EMAIL)) is None
+
+
+def test_finished_or_foreign_session_ids_are_rejected(store):
+    collection, _ = store
+    collection.docs.append({"_id": "done", "kind": "session", "email": EMAIL, "status": "completed"})
+    collection.docs.append({"_id": "theirs", "kind": "session", "email": "x@example.com", "status": "active"})
+
+    for session_id in ("done", "theirs", "missing"):
+        with pytest.raises(SessionNotFound):
+            asyncio.run(interviews.resolve_session(EMAIL, session_id, ROLE))
@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+import main
+from services.llm_scheduler import LLMSaturated
+
+
+class FakeLive:
+    session_id = "s1"
+
+    def state(self):
+        return {"session_id": self.session_id, "role": "Data Scientist", "questions": [], "turns": [],
+                "next_question": None}
+
+
+class FakeInterviews:
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.detached = 0
+
+    async def open(self, email, role, session_id=None):
+        return FakeLive(), "memory"
+
+    async def finish(self, live, emit):
+        if self.failures:
+            raise self.failures.pop(0)
+        await emit("evaluation", {"score": 80, "session_id": live.session_id})
+
+    async def detach(self, live):
+        self.detached += 1
+
+
+@pytest.fixture
+def socket(monkeypatch):
+    async def get_selected_role(email):
+        return "Data Scientist"
+
+    def connect(failures):
+        interviews = FakeInterviews(failures)
+        monkeypatch.setattr(main, "verify_token", lambda token: "s@example.com")
+        monkeypatch.setattr(main, "get_selected_role", get_selected_role)
+        monkeypatch.setattr(main, "live_interviews", interviews)
+        return TestClient(main.app).websocket_connect("/ws/interview?token=t"), interviews
+    return connect
+
+
+def test_busy_evaluation_keeps_the_session_open(socket):
+    connection, interviews = socket([LLMSaturated("interview", 7)])
+    with connection as ws:
+        assert ws.receive_json()["type"] == "session"
+        ws.send_json({"type": "end"})
+        assert ws.receive_json() == {"type": "error", "retry_after": 7,
+                                     "detail": "AI service is busy. Please end the interview again."}
+        ws.send_json({"type": "end"})
+        assert ws.receive_json()["type"] == "evaluation"
+    assert interviews.detached == 0
+
+
+def test_failed_evaluation_is_reported_and_checkpointed(socket):
+    connection, interviews = socket([RuntimeError("upstream 500")])
+    with connection as ws:
+        ws.receive_json()
+        ws.send_json({"type": "end"})
+        error = ws.receive_json()
+        assert error["type"] == "error" and error["retry_after"] is None
+    assert interviews.detached == 1
@@ -0,0 +1,42 @@
+import asyncio
+import datetime
+from services.jobs import JobQueue
+
+
+class RecordingJobs:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+
+
+def run_failing(queue, attempts):
+    async def handler(job, report):
+        raise RuntimeError("upstream down")
+    queue.register("resume_analysis", handler)
+    job = {"_id": "j1", "type": "resume_analysis", "attempts": attempts, "payload": {}}
+    asyncio.run(queue._run(job))
+    return queue.collection.updates[-1]["$set"]
+
+
+def test_retry_delay_doubles_up_to_the_cap():
+    queue = JobQueue(RecordingJobs(), retry_base_seconds=10, retry_max_seconds=60)
+    assert [queue.retry_delay(n) for n in range(1, 6)] == [10, 20, 40, 60, 60]
+
+
+def test_failed_attempt_is_requeued_after_a_delay():
+    queue = JobQueue(RecordingJobs(), max_attempts=3, retry_base_seconds=10)
+    before = datetime.datetime.utcnow()
+    update = run_failing(queue, attempts=2)
+
+    assert update["status"] == "queued"
+    assert update["not_before"] - before >= datetime.timedelta(seconds=20)
+
+
+def test_last_attempt_fails_without_a_retry():
+    queue = JobQueue(RecordingJobs(), max_attempts=3)
+    update = run_failing(queue, attempts=3)
+
+    assert update["status"] == "failed"
+    assert "not_before" not in update
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import httpx
+import openai
+import pytest
+from services import llm_gateway
+from services.llm_gateway import CircuitBreaker, CircuitOpenError, DeadlineExceeded, LLMGateway, llm_budget
+
+REQUEST = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class FaultyClient:
+    """chat.completions.create that fails the first `failures` calls, then answers."""
+
+    def __init__(self, failures=0, latency=0.0, error=None):
+        self.failures = failures
+        self.latency = latency
+        self.error = error or (lambda: openai.APIConnectionError(request=REQUEST))
+        self.calls = 0
+        self.timeouts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, timeout=None, **kwargs):
+        self.calls += 1
+        self.timeouts.append(timeout)
+        if self.latency:
+            await asyncio.sleep(min(self.latency, timeout))
+            if self.latency > timeout:
+                raise openai.APITimeoutError(request=REQUEST)
+        if self.calls <= self.failures:
+            raise self.error()
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+class OpenScheduler:
+    async def acquire(self, tokens, max_wait=None):
+        return SimpleNamespace(record_usage=lambda usage: None)
+
+    async def release(self, grant):
+        pass
+
+    def snapshot(self):
+        return {}
+
+
+def make_gateway(client, threshold=3, reset=0.2, retries=0):
+    return LLMGateway(client, CircuitBreaker(threshold, reset), OpenScheduler(), max_retries=retries)
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(llm_gateway, "LLM_BACKOFF_MAX", 0.02)
+
+
+def call(gateway):
+    return gateway.create(model="gpt-4o-mini", messages=MESSAGES)
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    client = FaultyClient(failures=100)
+    gateway = make_gateway(client)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(openai.APIConnectionError):
+                await call(gateway)
+        with pytest.raises(CircuitOpenError):
+            await call(gateway)
+    asyncio.run(run())
+
+    assert gateway.breaker.state == "open"
+    assert client.calls == 3
+    assert gateway.stats["short_circuited"] == 1
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    client = FaultyClient(failures=3, latency=0.05)
+    gateway = make_gateway(client, reset=0.1)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(openai.APIConnectionError):
+                await call(gateway)
+        await asyncio.sleep(0.15)
+        # Only the first of these reaches upstream while the circuit is half open
+        return await asyncio.gather(*(call(gateway) for _ in range(5)), return_exceptions=True)
+    results = asyncio.run(run())
+
+    assert sum(isinstance(r, CircuitOpenError) for r in results) == 4
+    assert client.calls == 4
+    assert gateway.breaker.state == "closed"
+    assert asyncio.run(call(gateway)).choices[0].message.content == "ok"
+
+
+def test_failed_probe_reopens_the_circuit():
+    client = FaultyClient(failures=4)
+    gateway = make_gateway(client, reset=0.1)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(openai.APIConnectionError):
+                await call(gateway)
+        await asyncio.sleep(0.15)
+        with pytest.raises(openai.APIConnectionError):
+            await call(gateway)
+        with pytest.raises(CircuitOpenError):
+            await call(gateway)
+    asyncio.run(run())
+
+    assert gateway.breaker.state == "open"
+    assert client.calls == 4
+
+
+def test_retries_stop_when_the_request_budget_is_spent():
+    client = FaultyClient(latency=10)
+    gateway = make_gateway(client, threshold=10, retries=5)
+
+    async def run():
+        with llm_budget(1.0):
+            started = time.monotonic()
+            with pytest.raises((openai.APITimeoutError, DeadlineExceeded)):
+                await call(gateway)
+            return time.monotonic() - started
+    elapsed = asyncio.run(run())
+
+    # Each attempt is capped by what is left of the budget, never LLM_TIMEOUT
+    assert elapsed < 1.2
+    assert all(timeout <= 1.0 for timeout in client.timeouts)
+    assert client.calls < 1 + gateway.max_retries
+
+
+def test_spent_budget_fails_before_calling_upstream():
+    client = FaultyClient()
+    gateway = make_gateway(client)
+
+    async def run():
+        with llm_budget(llm_gateway.LLM_MIN_ATTEMPT / 2):
+            with pytest.raises(DeadlineExceeded):
+                await call(gateway)
+    asyncio.run(run())
+
+    assert client.calls == 0
+    assert gateway.stats["deadline_exceeded"] == 1
+    # Running out of budget says nothing about upstream health
+    assert gateway.breaker.state == "closed" and gateway.breaker.failures == 0
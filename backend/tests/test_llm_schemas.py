@@ -0,0 +1,15 @@
+import pytest
+from pydantic import ValidationError
+from models.llm_schemas import Evaluation, QuestionEvaluation
+
+
+@pytest.mark.parametrize("model", [Evaluation, QuestionEvaluation])
+@pytest.mark.parametrize("score", [None, "n/a", {}, [], True, float("nan"), float("inf")])
+def test_bad_score_is_a_validation_error(model, score):
+    with pytest.raises(ValidationError):
+        model(score=score)
+
+
+@pytest.mark.parametrize("score, expected", [(87.6, 88), ("42", 42), (-5, 0), (150, 100)])
+def test_score_is_rounded_and_clamped(score, expected):
+    assert Evaluation(score=score).score == expected
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+import main
+from services import ai_engine, auth, structured_output
+from services.ai_engine import fallback_projects, fallback_roadmap
+from services.llm_gateway import CircuitBreaker, LLMGateway
+
+LOGINS = 20
+BCRYPT_SECONDS = 0.2
+ROLE_SELECTIONS = 50
+LLM_SECONDS = 1.5
+
+
+def heartbeat(lags, stop):
+    async def beat():
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            tick = loop.time()
+            await asyncio.sleep(0.01)
+            lags.append(loop.time() - tick - 0.01)
+    return asyncio.create_task(beat())
+
+
+def test_concurrent_logins_do_not_block_the_event_loop(monkeypatch):
+    hashed_on = set()
+
+    def slow_verify(plain, hashed):
+        # Stands in for bcrypt: CPU-bound and slow, holds its thread
+        hashed_on.add(threading.get_ident())
+        time.sleep(BCRYPT_SECONDS)
+        return plain == hashed
+
+    async def get_user(email, *fields):
+        return {"name": "Student", "email": email, "password": "secret", "selected_role": None}
+
+    monkeypatch.setattr(auth.pwd_context, "verify", slow_verify)
+    monkeypatch.setattr(main, "get_user", get_user)
+
+    async def run():
+        lags, stop = [], asyncio.Event()
+        beat = heartbeat(lags, stop)
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            main.login(email=f"s{i}@example.com", password="secret") for i in range(LOGINS)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await beat
+        return results, elapsed, max(lags), threading.get_ident()
+
+    results, elapsed, worst_lag, loop_thread = asyncio.run(run())
+
+    assert all(r["token"] for r in results)
+    assert loop_thread not in hashed_on
+    # Serialized on the loop this would take LOGINS * BCRYPT_SECONDS and stall every tick
+    assert elapsed < LOGINS * BCRYPT_SECONDS / 4
+    assert worst_lag < BCRYPT_SECONDS / 2
+
+
+class SlowLLM:
+    """chat.completions.create that answers with a valid plan after LLM_SECONDS."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, timeout=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(LLM_SECONDS)
+        name = kwargs["response_format"]["json_schema"]["name"]
+        reply = fallback_roadmap("Role") if name == "roadmap" else fallback_projects("Role")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))])
+
+
+class OpenScheduler:
+    async def acquire(self, tokens, max_wait=None):
+        return SimpleNamespace(record_usage=lambda usage: None)
+
+    async def release(self, grant):
+        pass
+
+
+def test_login_latency_stays_flat_while_role_plans_are_generating(monkeypatch):
+    llm = SlowLLM()
+    saved = []
+
+    def verify(plain, hashed):
+        time.sleep(0.02)
+        return plain == hashed
+
+    async def get_user(email, *fields):
+        return {"name": "Student", "email": email, "password": "secret", "selected_role": None,
+                "ai_analysis": {"skills": ["Python", "SQL"]}}
+
+    async def update_user(email, fields, match=None):
+        saved.append(email)
+
+    monkeypatch.setattr(auth.pwd_context, "verify", verify)
+    monkeypatch.setattr(main, "get_user", get_user)
+    monkeypatch.setattr(main, "update_user", update_user)
+    monkeypatch.setattr(main.plan_catalog, "lookup", lambda skills, role: {})
+    monkeypatch.setattr(ai_engine, "gateway", LLMGateway(llm, CircuitBreaker(50, 30), OpenScheduler()))
+    monkeypatch.setattr(ai_engine, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(structured_output, "STRUCTURED_OUTPUT", True)
+
+    async def timed_login(i):
+        started = time.perf_counter()
+        result = await main.login(email=f"s{i}@example.com", password="secret")
+        assert result["token"]
+        return time.perf_counter() - started
+
+    async def run():
+        idle = [await timed_login(i) for i in range(5)]
+
+        lags, stop = [], asyncio.Event()
+        beat = heartbeat(lags, stop)
+        # Distinct roles so nothing is coalesced: every call waits on the slow LLM
+        selections = [
+            asyncio.create_task(main.select_role(role=f"Role {i}", authorization=f"Bearer {main.create_token(f'r{i}@example.com')}"))
+            for i in range(ROLE_SELECTIONS)
+        ]
+        await asyncio.sleep(0.1)
+        loaded = [await timed_login(i) for i in range(5)]
+        in_flight = sum(not task.done() for task in selections)
+        stop.set()
+        await beat
+        results = await asyncio.gather(*selections)
+        return idle, loaded, in_flight, max(lags), results
+
+    idle, loaded, in_flight, worst_lag, results = asyncio.run(run())
+
+    assert in_flight == ROLE_SELECTIONS
+    assert llm.calls == 2 * ROLE_SELECTIONS
+    assert len(results) == len(saved) == ROLE_SELECTIONS
+    assert all(r["roadmap"]["roadmap"] and not r["pending"] for r in results)
+    # Logins are served between LLM awaits, not after them
+    assert max(loaded) < statistics.median(idle) * 2 + 0.05
+    assert max(loaded) < LLM_SECONDS / 10
+    assert worst_lag < 0.05
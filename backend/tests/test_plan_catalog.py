@@ -0,0 +1,56 @@
+import asyncio
+from services import plan_catalog
+from services.llm_scheduler import LLMSaturated
+from services.plan_catalog import PlanCatalog
+
+
+class FakeCatalog:
+    def __init__(self):
+        self.docs = {}
+
+    def find(self, query, projection=None):
+        async def docs():
+            for _id, doc in list(self.docs.items()):
+                if all(doc.get(k) == v for k, v in query.items()):
+                    yield {"_id": _id, **doc}
+        return docs()
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+
+def saturated():
+    error = LLMSaturated("planning", 1)
+    error.retry_after = 0.01
+    return error
+
+
+def test_lease_is_renewed_while_waiting_and_failing(monkeypatch):
+    attempts = {"roadmap": 0}
+
+    async def generate_roadmap(skills, role, fallback=True):
+        attempts["roadmap"] += 1
+        raise saturated()
+
+    async def generate_projects(role, fallback=True):
+        raise ValueError("bad reply")
+
+    monkeypatch.setattr(plan_catalog, "CATALOG_CORE_SKILLS", 1)
+    monkeypatch.setattr(plan_catalog, "CATALOG_LLM_WAIT", 0.05)
+    monkeypatch.setattr(plan_catalog, "generate_roadmap", generate_roadmap)
+    monkeypatch.setattr(plan_catalog, "generate_projects", generate_projects)
+
+    reports = []
+
+    async def report(stage):
+        reports.append(stage)
+
+    catalog = PlanCatalog(FakeCatalog())
+    result = asyncio.run(catalog.warm("v1", report, ["Data Scientist"]))
+
+    assert result["failed"] == 3 and result["generated"] == 0
+    # Every saturation wait and every failure renewed the lease
+    waits = [stage for stage in reports if "waiting for LLM capacity" in stage]
+    assert len(waits) == attempts["roadmap"] - 2
+    assert len(reports) == len(waits) + 3
+
@@ -0,0 +1,119 @@
+import asyncio
+from services import ai_engine, resume_dedupe, resume_pipeline
+from services.resume_dedupe import normalize_text
+
+TEXT = "SKILLS\nPython, SQL, Docker\nEXPERIENCE\nBuilt data pipelines at Acme for three years."
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(cond, dict):
+            if "$ne" in cond and value == cond["$ne"]:
+                return False
+            if "$not" in cond and isinstance(value, str) and cond["$not"].search(value):
+                return False
+            if "$in" in cond and not set(value or []) & set(cond["$in"]):
+                return False
+        elif not (value == cond or (isinstance(value, list) and cond in value)):
+            return False
+    return True
+
+
+class FakeResumes:
+    """The queries and upserts resume_dedupe sends to the resumes collection."""
+
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    def find(self, query, projection=None):
+        async def docs():
+            for doc in self.docs:
+                if _matches(doc, query):
+                    yield doc
+        return docs()
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            doc = await self.find_one(op._filter)
+            if doc is None:
+                doc = {**op._filter, **op._doc["$setOnInsert"]}
+                self.docs.append(doc)
+            doc.update(op._doc["$set"])
+            for field, value in op._doc["$addToSet"].items():
+                doc.setdefault(field, [])
+                if value not in doc[field]:
+                    doc[field].append(value)
+
+
+def test_failed_analysis_is_not_reused(monkeypatch):
+    calls = []
+
+    async def chat_completion(messages, **kwargs):
+        calls.append(messages)
+        if len(calls) == 1:
+            raise ConnectionError("upstream down")
+        return "Strong data engineering profile."
+
+    async def read_upload(payload):
+        return TEXT.encode()
+
+    async def extract(content, filename):
+        return content.decode()
+
+    async def save_to_user(email, resume_text, ai_output, suggested_roles, sections=None):
+        return {"ai_output": ai_output}
+
+    async def discard(payload):
+        pass
+
+    monkeypatch.setattr(resume_dedupe, "resumes_col", FakeResumes())
+    monkeypatch.setattr(ai_engine, "chat_completion", chat_completion)
+    monkeypatch.setattr(resume_pipeline, "_read_upload", read_upload)
+    monkeypatch.setattr(resume_pipeline, "_discard_upload", discard)
+    monkeypatch.setattr(resume_pipeline, "extract_text_async", extract)
+    monkeypatch.setattr(resume_pipeline, "_save_to_user", save_to_user)
+
+    async def upload(email):
+        async def report(stage):
+            pass
+        job = {"email": email, "attempts": 1, "payload": {"file_id": "f", "filename": "cv.txt"}}
+        return (await resume_pipeline.process_resume_job(job, report))["ai_output"]
+
+    async def run():
+        return [await upload("a@example.com"), await upload("a@example.com"),
+                await upload("a@example.com"), await upload("b@example.com")]
+    failed, retried, reused, other_user = asyncio.run(run())
+
+    assert failed["fallback"] and failed["ai_summary"].startswith("⚠️ AI analysis unavailable")
+    # The same bytes again: analyzed again instead of serving the placeholder
+    assert len(calls) == 2 and retried["ai_summary"] == "Strong data engineering profile."
+    # A real analysis is reused as before
+    assert reused["ai_summary"] == retried["ai_summary"] and reused["deduplicated"]
+    assert other_user["ai_summary"] == retried["ai_summary"] and len(calls) == 2
+
+
+def test_lookups_skip_stored_placeholders(monkeypatch):
+    resumes = FakeResumes()
+    normalized = normalize_text(TEXT)
+    resumes.docs.append({"text_hash": resume_dedupe.text_hash(normalized), "email": "a@example.com",
+                         "byte_hashes": ["h"], "analysis": {"ai_summary": ai_engine.analysis_unavailable("timeout")}})
+    monkeypatch.setattr(resume_dedupe, "resumes_col", resumes)
+
+    async def run():
+        return (await resume_dedupe.find_by_text(normalized),
+                await resume_dedupe.find_by_byte_hash("h", "a@example.com"))
+    assert asyncio.run(run()) == (None, None)
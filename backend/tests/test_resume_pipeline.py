@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from services import resume_pipeline
+
+TEXT = "SKILLS\nPython, SQL, Docker\nEXPERIENCE\nBuilt data pipelines at Acme."
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    calls = {"analyzed": 0, "stored": None, "byte_lookups": []}
+
+    async def none(*args, **kwargs):
+        return None
+
+    async def read_upload(payload):
+        return TEXT.encode()
+
+    async def find_by_byte_hash(digest, email):
+        calls["byte_lookups"].append(email)
+        return None
+
+    async def extract(content, filename):
+        return content.decode()
+
+    async def analyze(text, role, skills=None, sections=None):
+        calls["analyzed"] += 1
+        return {"ai_summary": "fresh summary", "skills": skills}
+
+    async def store(email, content, text, ai_output, *args):
+        calls["stored"] = ai_output
+        return ai_output
+
+    monkeypatch.setattr(resume_pipeline, "_read_upload", read_upload)
+    monkeypatch.setattr(resume_pipeline, "_discard_upload", none)
+    monkeypatch.setattr(resume_pipeline.resume_dedupe, "find_by_byte_hash", find_by_byte_hash)
+    monkeypatch.setattr(resume_pipeline.resume_dedupe, "find_by_text", none)
+    monkeypatch.setattr(resume_pipeline, "extract_text_async", extract)
+    monkeypatch.setattr(resume_pipeline, "analyze_resume", analyze)
+    monkeypatch.setattr(resume_pipeline, "store_resume_analysis", store)
+
+    def run(previous_skills):
+        async def near_duplicate(email, signature):
+            return {"analysis": {"ai_summary": "old summary", "skills": previous_skills}}, 0.9
+        monkeypatch.setattr(resume_pipeline.resume_dedupe, "find_near_duplicate", near_duplicate)
+
+        async def report(stage):
+            pass
+        job = {"email": "s@example.com", "attempts": 1, "payload": {"file_id": "f1", "filename": "cv.txt"}}
+        asyncio.run(resume_pipeline.process_resume_job(job, report))
+        return calls
+    return run
+
+
+def test_near_duplicate_with_the_same_skills_keeps_the_summary(pipeline):
+    calls = pipeline(["docker", "Python", "SQL"])
+    assert calls["analyzed"] == 0
+    assert calls["stored"]["ai_summary"] == "old summary" and calls["stored"]["incremental"]
+    assert calls["byte_lookups"] == ["s@example.com"]
+
+
+def test_near_duplicate_with_changed_skills_is_analyzed_again(pipeline):
+    calls = pipeline(["Python", "SQL"])
+    assert calls["analyzed"] == 1
+    assert calls["stored"]["ai_summary"] == "fresh summary"
@@ -0,0 +1,23 @@
+import pytest
+from services.resume_sections import heading_section, segment_resume
+
+
+@pytest.mark.parametrize("line, section", [
+    ("Programming Languages:", "skills"),
+    ("LANGUAGES & FRAMEWORKS", "skills"),
+    ("Technical Skills", "skills"),
+    ("Relevant Work Experience", "experience"),
+    ("Academic Projects", "projects"),
+    ("Languages", "other"),
+    ("Spoken Languages", "other"),
+    ("Known Languages", None),
+    ("Python, SQL, Docker", None),
+    ("Led a team of five engineers.", None),
+])
+def test_heading_section(line, section):
+    assert heading_section(line) == section
+
+
+def test_programming_languages_are_segmented_as_skills():
+    sections = segment_resume("Jane Doe\nPROGRAMMING LANGUAGES\nPython, Java\nLANGUAGES\nEnglish, Hindi")
+    assert sections == {"header": "Jane Doe", "skills": "Python, Java", "other": "English, Hindi"}
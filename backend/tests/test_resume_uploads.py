@@ -0,0 +1,69 @@
+import asyncio
+import io
+import pytest
+from services import resume_parser, resume_pipeline
+from services.resume_dedupe import byte_hash
+
+
+class FakeUpload:
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self.stream.read(size)
+
+
+class FakeBucket:
+    def __init__(self):
+        self.files, self.deleted = {}, []
+
+    async def upload_from_stream(self, filename, source, metadata=None):
+        file_id = f"f{len(self.files)}"
+        self.files[file_id] = source.read()
+        return file_id
+
+    async def delete(self, file_id):
+        self.deleted.append(file_id)
+
+
+class FakeQueue:
+    max_attempts = 3
+
+    def __init__(self):
+        self.jobs = {}
+
+    async def find_by_key(self, key):
+        return self.jobs.get(key)
+
+    async def enqueue(self, job_type, email, payload, idempotency_key=None):
+        job = {"_id": "job1", "status": "queued", "payload": payload}
+        self.jobs.setdefault(idempotency_key, job)
+        return self.jobs[idempotency_key]
+
+
+def test_spooled_upload_is_refused_past_the_limit():
+    with pytest.raises(resume_parser.ResumeTooLarge):
+        asyncio.run(resume_parser.spool_upload(FakeUpload(b"x" * 2048), max_bytes=1024))
+
+
+def test_job_carries_a_gridfs_id_not_the_resume_bytes(monkeypatch):
+    data = b"%PDF-1.4 " + b"resume " * 300_000       # spills to disk
+    bucket, queue = FakeBucket(), FakeQueue()
+    monkeypatch.setattr(resume_pipeline, "resume_uploads", bucket)
+    monkeypatch.setattr(resume_pipeline, "job_queue", queue)
+
+    async def run():
+        with await resume_parser.spool_upload(FakeUpload(data)) as spool:
+            digest = resume_parser.spool_digest(spool)
+            first = await resume_pipeline.enqueue_resume_analysis(
+                "s@example.com", spool, digest, "cv.pdf", "update")
+            again = await resume_pipeline.enqueue_resume_analysis(
+                "s@example.com", spool, digest, "cv.pdf", "update")
+        return digest, first, again
+    digest, first, again = asyncio.run(run())
+
+    assert digest == byte_hash(data)
+    assert "content" not in first["payload"]
+    assert bucket.files[first["payload"]["file_id"]] == data
+    # A retried identical upload returns the queued job without storing a second copy
+    assert again is first and len(bucket.files) == 1
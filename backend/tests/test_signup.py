@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+import main
+
+
+def test_concurrent_duplicate_signup_is_a_400(monkeypatch):
+    async def get_user(email, *fields):
+        return None         # both requests checked before either inserted
+
+    async def hash_password(password):
+        return "hashed"
+
+    class Users:
+        async def insert_one(self, doc):
+            raise DuplicateKeyError("E11000 duplicate key error collection: users index: email_1")
+
+    monkeypatch.setattr(main, "get_user", get_user)
+    monkeypatch.setattr(main, "hash_password_async", hash_password)
+    monkeypatch.setattr(main, "users_col", Users())
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main.register_with_resume(
+            name="Student", email="S@example.com", password="pw", file=None, idempotency_key=None))
+    assert raised.value.status_code == 400
+    assert raised.value.detail == "User already exists"
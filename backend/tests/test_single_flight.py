@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+from services import ai_engine
+from services.llm_cache import MemoryTier, ResponseCache
+
+CALLERS = 100
+
+
+class CountingGateway:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, purpose=None, **kwargs):
+        self.calls += 1
+        number = self.calls
+        await asyncio.sleep(0.05)
+        message = SimpleNamespace(content=f"reply {number}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def run_concurrently(cache_policy):
+    messages = [{"role": "user", "content": "Suggest projects for a Data Analyst"}]
+
+    async def run():
+        return await asyncio.gather(*(
+            ai_engine.chat_completion(messages, temperature=0.7, cache_policy=cache_policy)
+            for _ in range(CALLERS)))
+    return asyncio.run(run())
+
+
+def test_identical_cacheable_calls_make_one_upstream_call(monkeypatch):
+    gateway = CountingGateway()
+    monkeypatch.setattr(ai_engine, "gateway", gateway)
+    monkeypatch.setattr(ai_engine, "response_cache", ResponseCache(MemoryTier(16)))
+
+    replies = run_concurrently("projects")
+
+    assert gateway.calls == 1
+    assert set(replies) == {"reply 1"}
+    assert ai_engine.inflight.in_flight() == 0
+
+
+def test_coalescing_without_the_response_cache(monkeypatch):
+    gateway = CountingGateway()
+    monkeypatch.setattr(ai_engine, "gateway", gateway)
+    monkeypatch.setattr(ai_engine, "LLM_CACHE_ENABLED", False)
+
+    assert set(run_concurrently("projects")) == {"reply 1"}
+    assert gateway.calls == 1
+
+
+def test_uncached_calls_are_not_coalesced(monkeypatch):
+    gateway = CountingGateway()
+    monkeypatch.setattr(ai_engine, "gateway", gateway)
+
+    replies = run_concurrently(None)
+
+    assert gateway.calls == CALLERS
+    assert len(set(replies)) == CALLERS
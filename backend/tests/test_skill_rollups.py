@@ -0,0 +1,95 @@
+import asyncio
+import copy
+import random
+from collections import Counter
+from services.skill_analytics import MEMBERS, SkillRollups, apply_set
+
+COHORTS = ["2025-A", "2025-B", "", None]
+ROLES = ["Data Scientist", "Backend Developer", None]
+SKILLS = ["Python", "SQL", " Docker ", "React", "Machine Learning", "", 42]
+
+
+class FakeUsers:
+    """find_one_and_update with $set and ReturnDocument.BEFORE, as SkillRollups uses it."""
+
+    def __init__(self, docs):
+        self.docs = {doc["email"]: doc for doc in docs}
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        doc = self.docs.get(query["email"])
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        for path, value in update["$set"].items():
+            *parents, leaf = path.split(".")
+            target = doc
+            for part in parents:
+                if not isinstance(target.get(part), dict):
+                    target[part] = {}
+                target = target[part]
+            target[leaf] = copy.deepcopy(value)
+        return before
+
+
+class FakeRollups:
+    """bulk_write of upserting $inc UpdateOnes, keyed like the unique index."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            key = (op._filter["cohort"], op._filter["role"], op._filter["skill"])
+            self.counts[key] += op._doc["$inc"]["count"]
+
+
+def recompute(users):
+    """Every row counted from scratch, the way the rebuild aggregation does."""
+    counts = Counter()
+    for user in users:
+        cohort, role = user.get("cohort"), user.get("selected_role")
+        if not (isinstance(cohort, str) and cohort and isinstance(role, str) and role):
+            continue
+        counts[(cohort, role, MEMBERS)] += 1
+        skills = (user.get("ai_analysis") or {}).get("skills")
+        if isinstance(skills, list):
+            for skill in {s.strip() for s in skills if isinstance(s, str)} - {""}:
+                counts[(cohort, role, skill)] += 1
+    return counts
+
+
+def random_update(rng):
+    choice = rng.randrange(5)
+    if choice == 0:
+        return {"cohort": rng.choice(COHORTS)}
+    if choice == 1:
+        return {"selected_role": rng.choice(ROLES)}
+    if choice == 2:
+        return {"ai_analysis.skills": rng.sample(SKILLS, rng.randint(0, 4)) + [rng.choice(SKILLS)]}
+    if choice == 3:
+        return {"ai_analysis": {"skills": rng.sample(SKILLS, rng.randint(0, 3)), "summary": "x"}}
+    return {"name": "renamed", "cohort": rng.choice(COHORTS), "selected_role": rng.choice(ROLES)}
+
+
+def test_incremental_rollups_equal_a_full_recompute():
+    rng = random.Random(7)
+    users = FakeUsers([{"email": f"s{i}@example.com"} for i in range(40)])
+    rollups = FakeRollups()
+    engine = SkillRollups(users, rollups)
+
+    async def run():
+        for step in range(2000):
+            email = f"s{rng.randrange(45)}@example.com"    # some users do not exist
+            await engine.set_fields({"email": email}, random_update(rng))
+    asyncio.run(run())
+
+    stored = +rollups.counts    # drop rows that went back to zero
+    assert stored == recompute(users.docs.values())
+    assert any(skill is not MEMBERS for _, _, skill in stored)
+
+
+def test_apply_set_ignores_untracked_fields():
+    before = {"cohort": "2025-A", "selected_role": "Data Scientist"}
+    after = apply_set(before, {"name": "x", "ai_analysis.skills": ["SQL"]})
+    assert after == {**before, "ai_analysis": {"skills": ["SQL"]}}
+    assert before == {"cohort": "2025-A", "selected_role": "Data Scientist"}
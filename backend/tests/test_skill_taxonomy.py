@@ -0,0 +1,37 @@
+import pytest
+from services.skill_taxonomy import skill_matcher
+
+
+@pytest.mark.parametrize("text", [
+    "Built a strong network of mentors through the alumni program.",
+    "Networking events and career fairs every semester.",
+    "I express complex ideas clearly to stakeholders.",
+    "Moved the team's files to cloud storage.",
+    "Portfolio: github.com/student",
+])
+def test_ordinary_prose_is_not_a_skill(text):
+    assert skill_matcher.extract(text) == []
+
+
+@pytest.mark.parametrize("text, unexpected", [
+    ("Wrote bash scripts to rename files", "Linux"),
+    ("Projects hosted on GitHub", "Git"),
+    ("Installed Grafana with a Helm chart", "Kubernetes"),
+    ("Triggered Jenkins jobs by hand", "CI"),
+])
+def test_related_tools_do_not_imply_the_broader_skill(text, unexpected):
+    assert unexpected not in skill_matcher.extract(text)
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("REST services in Express.js", "Express"),
+    ("Cloud computing coursework on AWS", "Cloud"),
+    ("Computer networking and TCP/IP labs", "Network"),
+    ("Automated deploys with bash", "Bash"),
+    ("Packaged services as Helm charts", "Helm"),
+    ("Pipelines in Jenkins", "Jenkins"),
+    ("Shipped with GitHub Actions", "CI"),
+    ("Version control with Git", "Git"),
+])
+def test_qualified_mentions_still_match(text, skill):
+    assert skill in skill_matcher.extract(text)
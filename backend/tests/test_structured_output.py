@@ -0,0 +1,75 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import httpx
+import openai
+import pytest
+from services import ai_engine, structured_output
+from services.structured_output import PROJECTS
+
+REQUEST = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+MESSAGES = [{"role": "user", "content": "Suggest projects for a Data Analyst"}]
+REPLY = json.dumps([{"title": "Churn model", "description": "", "tech_stack": ["Python"],
+                     "difficulty": "Intermediate"}])
+
+
+def bad_request(message, param=None):
+    body = {"message": message, "type": "invalid_request_error", "param": param, "code": None}
+    return openai.BadRequestError(message, response=httpx.Response(400, request=REQUEST), body=body)
+
+
+class RejectingGateway:
+    """Refuses every call that carries a response_format with `error`."""
+
+    def __init__(self, error):
+        self.error = error
+        self.formats = []
+
+    async def create(self, purpose=None, **kwargs):
+        self.formats.append(kwargs.get("response_format"))
+        if kwargs.get("response_format") is not None:
+            raise self.error
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=REPLY))])
+
+
+@pytest.fixture(autouse=True)
+def structured_on(monkeypatch):
+    monkeypatch.setattr(structured_output, "STRUCTURED_OUTPUT", True)
+
+
+def complete(monkeypatch, error):
+    gateway = RejectingGateway(error)
+    monkeypatch.setattr(ai_engine, "gateway", gateway)
+    projects = asyncio.run(ai_engine.structured_completion(MESSAGES, PROJECTS))
+    return gateway, projects
+
+
+def test_unsupported_response_format_switches_to_prompt_only_json(monkeypatch):
+    error = bad_request("Invalid parameter: 'response_format' of type 'json_schema' is not supported "
+                        "with this model.", param="response_format")
+
+    gateway, projects = complete(monkeypatch, error)
+
+    assert projects[0]["title"] == "Churn model"
+    assert gateway.formats[0] is not None and gateway.formats[1:] == [None]
+    assert structured_output.STRUCTURED_OUTPUT is False
+
+
+def test_rejected_schema_falls_back_for_that_call_only(monkeypatch):
+    error = bad_request("Invalid schema for response_format 'projects': 'required' is missing.",
+                        param="response_format")
+
+    gateway, projects = complete(monkeypatch, error)
+
+    assert projects[0]["title"] == "Churn model"
+    assert gateway.formats[1:] == [None]
+    assert structured_output.STRUCTURED_OUTPUT is True
+
+
+def test_other_bad_requests_are_raised_and_keep_structured_output(monkeypatch):
+    error = bad_request("This model's maximum context length is 128000 tokens.", param="messages")
+
+    with pytest.raises(openai.BadRequestError):
+        complete(monkeypatch, error)
+
+    assert structured_output.STRUCTURED_OUTPUT is True
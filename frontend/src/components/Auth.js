@@ -12,6 +12,24 @@ import {
     MenuItem,
 } from "@mui/material";
 
+const API_URL = "https://edubridge-lczi.onrender.com";
+const JOB_POLL_MS = 2000;
+const JOB_TIMEOUT_MS = 120000;
+
+// Resume analysis runs as a background job; wait for its suggested roles
+async function waitForJob(jobId, token) {
+    const giveUpAt = Date.now() + JOB_TIMEOUT_MS;
+    while (Date.now() < giveUpAt) {
+        const res = await axios.get(`${API_URL}/jobs/${jobId}`, {
+            headers: { Authorization: `Bearer ${token}` },
+        });
+        if (res.data.status === "done") return res.data.result || {};
+        if (res.data.status === "failed") throw new Error(res.data.error || "Resume analysis failed");
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+    }
+    throw new Error("Resume analysis is taking too long");
+}
+
 export default function Auth({ onAuth }) {
     const [tab, setTab] = useState(0); // 0 = Signup, 1 = Login
     const [form, setForm] = useState({ name: "", email: "", password: "" });
@@ -19,6 +37,7 @@ export default function Auth({ onAuth }) {
     const [suggestedRoles, setSuggestedRoles] = useState([]); // roles from AI
     const [selectedRole, setSelectedRole] = useState("");
     const [loading, setLoading] = useState(false);
+    const [analyzing, setAnalyzing] = useState(false);
 
     // =============================
     //  HANDLE SIGNUP / LOGIN
@@ -37,7 +56,7 @@ export default function Auth({ onAuth }) {
             if (tab === 0) formData.append("name", form.name);
             if (tab === 0 && form.resumeFile) formData.append("file", form.resumeFile);
 
-            const res = await axios.post(`https://edubridge-lczi.onrender.com/${endpoint}`, formData, {
+            const res = await axios.post(`${API_URL}/${endpoint}`, formData, {
                 headers: { "Content-Type": "multipart/form-data" },
             });
 
@@ -49,15 +68,22 @@ export default function Auth({ onAuth }) {
             }
 
             // ✅ SIGNUP SUCCESS
-            if (tab === 0 && res.data.suggested_roles) {
+            if (tab === 0 && res.data.token) {
                 localStorage.setItem("token", res.data.token);
                 localStorage.setItem("email", form.email);
-                setSuggestedRoles(res.data.suggested_roles); // show role picker
+                let roles = res.data.suggested_roles || [];
+                if (res.data.job_id) {
+                    setAnalyzing(true);
+                    const result = await waitForJob(res.data.job_id, res.data.token);
+                    roles = result.suggested_roles || [];
+                }
+                setSuggestedRoles(roles); // show role picker
             }
         } catch (err) {
             console.error(err);
-            setError("Something went wrong. Please try again.");
+            setError(err.response?.data?.detail || err.message || "Something went wrong. Please try again.");
         } finally {
+            setAnalyzing(false);
             setLoading(false);
         }
     };
@@ -75,7 +101,7 @@ export default function Auth({ onAuth }) {
             const formData = new FormData();
             formData.append("role", selectedRole);
 
-            await axios.post("https://edubridge-lczi.onrender.com/select_role", formData, {
+            await axios.post(`${API_URL}/select_role`, formData, {
                 headers: { Authorization: `Bearer ${token}` },
             });
 
@@ -164,11 +190,13 @@ export default function Auth({ onAuth }) {
                             type="submit"
                             disabled={loading}
                         >
-                            {loading
-                                ? "Please wait..."
-                                : tab === 0
-                                    ? "Create Account"
-                                    : "Login"}
+                            {analyzing
+                                ? "Analyzing your resume..."
+                                : loading
+                                    ? "Please wait..."
+                                    : tab === 0
+                                        ? "Create Account"
+                                        : "Login"}
                         </Button>
                     </Box>
                 )}